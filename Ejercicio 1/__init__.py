@@ -0,0 +1 @@
+# Ejercicio 1: creación, carga y replicación de la base de ventas
@@ -2,27 +2,31 @@
 # Este script crea una base de datos llamada 'ventas_origen' y un rol 'bi_user',
 # y define las tablas DimDate, DimCustomerSegment, DimProduct y FactSales con sus
 # respectivas columnas y tipos de datos ajustados según las especificaciones.
-# Requiere la librería psycopg2 para conectarse a PostgreSQL.
+# Requiere la librería psycopg2 para conectarse a PostgreSQL (se importa al ejecutar,
+# no al importar el módulo).
+#
+# Uso:
+#   python create_db.py
 
-import psycopg2
-from psycopg2 import sql
 from dotenv import load_dotenv
 import os
 
-# Cargar variables desde .env
-load_dotenv()  # Busca automáticamente el archivo .env en el directorio actual
-
-# Parámetros de conexión al servidor
-PG_HOST     = os.getenv('PG_HOST')
-PG_PORT     = os.getenv('PG_PORT')
-PG_SUPERDB  = os.getenv('PG_SUPERDB')
-PG_SUPERUSR = os.getenv('PG_SUPERUSR')
-PG_SUPERPW  = os.getenv('PG_SUPERPW')
-
-# Nombre de la nueva base de datos y su dueño
-NEW_DB      = os.getenv('NEW_DB')
-NEW_OWNER   = os.getenv('NEW_OWNER')
-NEW_OW_PW   = os.getenv('NEW_OW_PW')
+def configuracion():
+    """Lee los parámetros de conexión (se llama al ejecutar, no al importar el módulo)."""
+    # Cargar variables desde .env
+    load_dotenv()  # Busca automáticamente el archivo .env en el directorio actual
+    return {
+        # Parámetros de conexión al servidor
+        'PG_HOST':     os.getenv('PG_HOST'),
+        'PG_PORT':     os.getenv('PG_PORT'),
+        'PG_SUPERDB':  os.getenv('PG_SUPERDB'),
+        'PG_SUPERUSR': os.getenv('PG_SUPERUSR'),
+        'PG_SUPERPW':  os.getenv('PG_SUPERPW'),
+        # Nombre de la nueva base de datos y su dueño
+        'NEW_DB':      os.getenv('NEW_DB'),
+        'NEW_OWNER':   os.getenv('NEW_OWNER'),
+        'NEW_OW_PW':   os.getenv('NEW_OW_PW'),
+    }
 
 # DDL para las tablas
 # Las tablas se crean con los tipos de datos ajustados según las especificaciones
@@ -68,12 +72,16 @@ TABLE_DDL = {
     """
 }
 
-def create_database():
+def create_database(cfg):
     """Se conecta al servidor en la base 'postgres' y crea la DB + rol bi_user."""
+    import psycopg2
+    from psycopg2 import sql
+
+    NEW_DB, NEW_OWNER, NEW_OW_PW = cfg['NEW_DB'], cfg['NEW_OWNER'], cfg['NEW_OW_PW']
     conn = psycopg2.connect(
-        host=PG_HOST, port=PG_PORT,
-        dbname=PG_SUPERDB,
-        user=PG_SUPERUSR, password=PG_SUPERPW
+        host=cfg['PG_HOST'], port=cfg['PG_PORT'],
+        dbname=cfg['PG_SUPERDB'],
+        user=cfg['PG_SUPERUSR'], password=cfg['PG_SUPERPW']
     )
     conn.autocommit = True
     cur = conn.cursor()
@@ -105,12 +113,14 @@ def create_database():
     cur.close()
     conn.close()
 
-def create_tables():
+def create_tables(cfg):
     """Se conecta a ventas_origen como bi_user y ejecuta los DDL ajustados."""
+    import psycopg2
+
     conn = psycopg2.connect(
-        host=PG_HOST, port=PG_PORT,
-        dbname=NEW_DB,
-        user=NEW_OWNER, password=NEW_OW_PW
+        host=cfg['PG_HOST'], port=cfg['PG_PORT'],
+        dbname=cfg['NEW_DB'],
+        user=cfg['NEW_OWNER'], password=cfg['NEW_OW_PW']
     )
     cur = conn.cursor()
     for name, ddl in TABLE_DDL.items():
@@ -121,6 +131,10 @@ def create_tables():
     conn.close()
     print("Tablas creadas correctamente.")
 
+def main():
+    cfg = configuracion()
+    create_database(cfg)
+    create_tables(cfg)
+
 if __name__ == "__main__":
-    create_database()
-    create_tables()
+    main()
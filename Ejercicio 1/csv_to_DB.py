@@ -1,32 +1,52 @@
 # Importar librerías necesarias
 
-import pandas as pd
-from sqlalchemy import create_engine
-from dotenv import load_dotenv
+import io
 import os
+import sys
+
+# pandas y SQLAlchemy se importan dentro de las funciones que los usan: importar el
+# módulo (dim_date.py, benchmark_importtime.py) no paga su tiempo de carga.
+from dotenv import load_dotenv
+
+if not __package__:  # ejecutado como script: la raíz del repositorio no está en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun import instrumentacion
 
-# Cargar variables desde .env
-load_dotenv()  # Busca automáticamente el archivo .env en el directorio actual
+if __package__:
+    from .dim_date import FECHA_FIN_DEFAULT, extender_dim_date, id_de_fecha, max_date_id_hechos
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from dim_date import FECHA_FIN_DEFAULT, extender_dim_date, id_de_fecha, max_date_id_hechos
 
-# Variables de conexión a la base de datos
-DB_USER     = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_HOST     = os.getenv('DB_HOST')
-DB_PORT     = os.getenv('DB_PORT')
-DB_NAME     = os.getenv('DB_NAME')
 
 # 📌 Conexión a PostgreSQL
-conexion = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+def cadena_conexion():
+    """Arma la cadena de conexión desde el entorno (se llama al ejecutar, no al importar)."""
+    # Cargar variables desde .env
+    load_dotenv()  # Busca automáticamente el archivo .env en el directorio actual
+
+    # Variables de conexión a la base de datos
+    DB_USER     = os.getenv('DB_USER')
+    DB_PASSWORD = os.getenv('DB_PASSWORD')
+    DB_HOST     = os.getenv('DB_HOST')
+    DB_PORT     = os.getenv('DB_PORT')
+    DB_NAME     = os.getenv('DB_NAME')
+    return f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# 📦 Filas por bloque al validar y cargar la tabla de hechos
+CHUNKSIZE = int(os.getenv('CSV_CHUNKSIZE', '100000'))
 
 #  Función para insertar CSV en PostgreSQL y mapear columnas
 def insertar_csv_en_postgres(csv_path, tabla_destino, mapeo_columnas, conexion_string):
+    import pandas as pd
+    from sqlalchemy import create_engine
+
     try:
         print(f'🔄 Procesando archivo: {csv_path}')
 
         df = pd.read_csv(csv_path)
         df.rename(columns=mapeo_columnas, inplace=True)
 
-        engine = create_engine(conexion_string)
+        engine = instrumentacion.instrumentar_engine(create_engine(conexion_string))
         df.to_sql(tabla_destino, engine, if_exists='append', index=False)
 
         print(f"✅ Datos insertados correctamente en la tabla '{tabla_destino}'\n")
@@ -36,14 +56,181 @@ def insertar_csv_en_postgres(csv_path, tabla_destino, mapeo_columnas, conexion_s
         print(f"❌ Error al insertar datos en '{tabla_destino}': {e}\n")
 
 
-# 📂 Ruta base donde están los archivos CSV
-ruta_base = r'C:/Users/Dario/Desktop/Prueba técnica Sudata/Ejercicio 1' 
+# 🔑 Validación de claves foráneas en memoria (tabla de hechos)
+
+def cargar_claves(engine, item_dimension):
+    """
+    Devuelve el conjunto de claves de una dimensión como pd.Index (hash compacto):
+    desde la tabla en la base y, si no se puede leer, desde su CSV.
+    """
+    import pandas as pd
+    from sqlalchemy import text
+
+    tabla, columna = item_dimension['tabla'], item_dimension['clave']
+    try:
+        with engine.connect() as conn:
+            claves = pd.read_sql(text(f"SELECT {columna} FROM {tabla}"), conn)[columna]
+        origen = 'base'
+    except Exception as e:
+        if 'hasta_id' in item_dimension:
+            print(f"⚠️ No se pudieron leer las claves de '{tabla}' desde la base ({e}); se usa el rango generado")
+            return pd.RangeIndex(1, item_dimension['hasta_id'] + 1)
+        print(f"⚠️ No se pudieron leer las claves de '{tabla}' desde la base ({e}); se usa el CSV")
+        mapeo_inverso = {v: k for k, v in item_dimension['mapeo'].items()}
+        claves = pd.read_csv(item_dimension['path'], usecols=[mapeo_inverso[columna]]).iloc[:, 0]
+        origen = 'CSV'
+    claves = pd.Index(pd.to_numeric(claves, errors='coerce').dropna().astype('int64').unique())
+    print(f"🔑 {tabla}.{columna}: {len(claves)} claves ({origen})")
+    return claves
+
+
+def cargar_dim_date(item, hechos, conexion_string):
+    """
+    Genera dim_date (dim_date.py) en lugar de leer DimDate.csv, extendiéndola de forma
+    incremental hasta el máximo Dateid de los hechos que se van a cargar y corrigiendo
+    las filas existentes que difieran (numeración de días del CSV original).
+    """
+    from sqlalchemy import create_engine
+
+    print(f"🔄 Generando dimensión: {item['tabla']}")
+    mapeo_inverso = {v: k for k, v in hechos['mapeo'].items()}
+    item['hasta_id'] = max(
+        max_date_id_hechos(hechos['path'], mapeo_inverso[item['clave']]), id_de_fecha(FECHA_FIN_DEFAULT)
+    )
+    engine = instrumentacion.instrumentar_engine(create_engine(conexion_string))
+    try:
+        insertadas, corregidas = extender_dim_date(engine, item['hasta_id'], item['tabla'])
+        print(f"✅ {insertadas} fechas nuevas y {corregidas} corregidas en '{item['tabla']}' "
+              f"(hasta date_id {item['hasta_id']})\n")
+    except Exception as e:
+        print(f"❌ Error al generar '{item['tabla']}': {e}\n")
+    finally:
+        engine.dispose()
+
+
+def cargar_ids_existentes(engine, tabla, columna):
+    """Claves primarias ya cargadas en la tabla de hechos (para no chocar con la PK)."""
+    import pandas as pd
+    from sqlalchemy import text
+
+    try:
+        with engine.connect() as conn:
+            return set(pd.read_sql(text(f"SELECT {columna} FROM {tabla}"), conn)[columna].astype(str))
+    except Exception as e:
+        print(f"⚠️ No se pudieron leer los {columna} existentes de '{tabla}': {e}")
+        return set()
+
+
+def validar_bloque(df, claves_foraneas, pk, ids_vistos):
+    """
+    Valida un bloque de la tabla de hechos sin ir a la base.
+
+    Parámetros:
+        df (DataFrame): Bloque con las columnas ya renombradas.
+        claves_foraneas (dict): {columna: pd.Index de claves válidas}.
+        pk (str): Columna clave primaria del hecho.
+        ids_vistos (set): PKs ya existentes en la base o vistas en bloques anteriores (se actualiza).
+
+    Retorna:
+        (validos, cuarentena): DataFrames; cuarentena agrega la columna 'motivo'.
+    """
+    import pandas as pd
+
+    motivo = pd.Series('', index=df.index, dtype=object)
+
+    def marcar(mascara, texto):
+        nonlocal motivo
+        motivo = motivo.mask(mascara, motivo + texto + '; ')
+
+    for columna, claves in claves_foraneas.items():
+        valores = pd.to_numeric(df[columna], errors='coerce')
+        marcar(valores.isna(), f"{columna} nulo o no numérico")
+        marcar(valores.notna() & ~valores.isin(claves), f"{columna} inexistente en la dimensión")
+        df[columna] = valores.astype('Int64')
+
+    ids = df[pk].astype(str)
+    marcar(df[pk].isna(), f"{pk} nulo")
+    marcar(ids.isin(ids_vistos), f"{pk} duplicado (ya cargado)")
+    marcar(ids.duplicated(keep='first'), f"{pk} duplicado en el archivo")
+
+    invalido = motivo != ''
+    validos = df[~invalido]
+    ids_vistos.update(validos[pk].astype(str))
+    cuarentena = df[invalido].assign(motivo=motivo[invalido].str.rstrip('; '))
+    return validos, cuarentena
+
+
+def cargar_hechos_validados(item, dimensiones, conexion_string, ruta_cuarentena, chunksize=CHUNKSIZE):
+    """
+    Carga la tabla de hechos validando las claves foráneas en memoria, bloque por bloque.
+    Las filas válidas se copian con COPY en una única transacción (que no puede fallar por
+    FK o PK duplicada); las inválidas se escriben en el archivo de cuarentena con su motivo.
+    """
+    import pandas as pd
+    from sqlalchemy import create_engine
+
+    print(f"🔄 Procesando archivo: {item['path']}")
+    engine = instrumentacion.instrumentar_engine(create_engine(conexion_string))
+    claves_foraneas = {d['clave']: cargar_claves(engine, d) for d in dimensiones}
+    pk = item['clave']
+    ids_vistos = cargar_ids_existentes(engine, item['tabla'], pk)
+
+    columnas = list(item['mapeo'].values())
+    total_validos = total_cuarentena = 0
+    if os.path.exists(ruta_cuarentena):
+        os.remove(ruta_cuarentena)
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        for bloque in pd.read_csv(item['path'], dtype=str, chunksize=chunksize):
+            bloque = bloque.rename(columns=item['mapeo'])[columnas]
+            with instrumentacion.span("validar bloque", "pandas", filas=len(bloque)):
+                validos, cuarentena = validar_bloque(bloque, claves_foraneas, pk, ids_vistos)
+
+            if len(cuarentena):
+                cuarentena.to_csv(ruta_cuarentena, mode='a', index=False,
+                                  header=not os.path.exists(ruta_cuarentena), encoding='utf-8')
+                total_cuarentena += len(cuarentena)
+
+            if len(validos):
+                buffer = io.StringIO()
+                validos.to_csv(buffer, index=False, header=False)
+                buffer.seek(0)
+                with instrumentacion.span(f"COPY {item['tabla']}", "sql", filas=len(validos)):
+                    cur.copy_expert(
+                        f"COPY {item['tabla']} ({', '.join(columnas)}) FROM STDIN WITH (FORMAT csv)", buffer
+                    )
+                total_validos += len(validos)
+        raw.commit()
+    except Exception as e:
+        raw.rollback()
+        print(f"❌ Error al insertar datos en '{item['tabla']}': {e}\n")
+        raise
+    finally:
+        raw.close()
+        engine.dispose()
+
+    print(f"✅ {total_validos} filas insertadas en '{item['tabla']}'")
+    if total_cuarentena:
+        print(f"⚠️ {total_cuarentena} filas en cuarentena -> {ruta_cuarentena}\n")
+    else:
+        print()
+
+
+# 📂 Ruta base donde están los archivos CSV (la carpeta de este script)
+ruta_base = os.path.dirname(os.path.abspath(__file__))
+
+# 🚧 Filas de FactSales rechazadas por la validación
+RUTA_CUARENTENA = os.path.join(ruta_base, 'cuarentena_fact_sales.csv')
 
 # 📁 Archivos a procesar
 archivos = [
         {
         'archivo': 'DimDate.csv',
         'tabla': 'dim_date',
+        'clave': 'date_id',
+        'generada': True,  # se arma con dim_date.py; el CSV queda solo como referencia
         'mapeo': {
             'dateid': 'date_id',
             'date': 'date',
@@ -60,6 +247,7 @@ archivos = [
     {
         'archivo': 'DimProduct.csv',
         'tabla': 'dim_product',
+        'clave': 'product_id',
         'mapeo': {
             'Productid': 'product_id',
             'Producttype': 'product_type'
@@ -68,6 +256,7 @@ archivos = [
     {
         'archivo': 'DimCustomerSegment.csv',
         'tabla': 'dim_customer_segment',
+        'clave': 'segment_id',
         'mapeo': {
             'Segmentid': 'segment_id',
             'City': 'city'
@@ -76,6 +265,8 @@ archivos = [
         {
         'archivo': 'FactSales.csv',
         'tabla': 'fact_sales',
+        'clave': 'sales_id',
+        'hechos': True,
         'mapeo': {
             'Salesid': 'sales_id',
             'Dateid': 'date_id',
@@ -87,12 +278,30 @@ archivos = [
     }
 ]
 
-# 🔁 Ejecutar proceso para cada archivo
-for item in archivos:
-    path_completo = os.path.join(ruta_base, item['archivo'])
-    insertar_csv_en_postgres(
-        csv_path=path_completo,
-        tabla_destino=item['tabla'],
-        mapeo_columnas=item['mapeo'],
-        conexion_string=conexion
-    )
+
+def main():
+    instrumentacion.iniciar("csv_to_DB")
+    conexion = cadena_conexion()
+    # 🔁 Primero las dimensiones, después los hechos validados contra ellas
+    for item in archivos:
+        item['path'] = os.path.join(ruta_base, item['archivo'])
+    dimensiones = [item for item in archivos if not item.get('hechos')]
+    hechos = [item for item in archivos if item.get('hechos')]
+
+    for item in dimensiones:
+        if item.get('generada'):
+            cargar_dim_date(item, hechos[0], conexion)
+            continue
+        insertar_csv_en_postgres(
+            csv_path=item['path'],
+            tabla_destino=item['tabla'],
+            mapeo_columnas=item['mapeo'],
+            conexion_string=conexion
+        )
+
+    for item in hechos:
+        cargar_hechos_validados(item, dimensiones, conexion, RUTA_CUARENTENA)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+# Generador de la dimensión calendario (dim_date)
+# Reemplaza al DimDate.csv estático: arma las filas de dim_date para cualquier rango de
+# fechas con aritmética de fechas vectorizada (pandas) y las carga con COPY. La numeración
+# de date_id es la del CSV original (2019-03-09 = 1, un id por día) y los días de la
+# semana siguen ISO 8601 (lunes = 1 ... domingo = 7).
+#
+# En modo incremental genera solo los días que faltan: los posteriores al último date_id
+# cargado hasta el pedido (por ejemplo, el máximo Dateid de FactSales.csv) y, con --desde,
+# los anteriores al primero. De los ids ya cargados se regeneran y reescriben solo los que
+# una consulta marca como distintos: así se corrigen las filas que vinieron del
+# DimDate.csv original (con domingo = 1) sin tocar las que ya están bien.
+#
+# Uso:
+#   python dim_date.py                              # extiende hasta el máximo Dateid de FactSales.csv
+#   python dim_date.py --hasta 2040-12-31           # extiende hasta una fecha
+#   python dim_date.py --desde 2015-01-01 --hasta 2040-12-31   # cualquier rango de fechas
+#   python dim_date.py --hasta 2040-12-31 --salida DimDate_generada.csv   # solo CSV, sin base
+
+import argparse
+import io
+import os
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+# numpy y pandas se importan dentro de las funciones que generan o leen filas:
+# csv_to_DB.py importa este módulo solo por las constantes y el cálculo de ids.
+
+if not __package__:  # ejecutado como script: la raíz del repositorio no está en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun import instrumentacion
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+FACTS_CSV_DEFAULT = os.path.join(script_dir, 'FactSales.csv')
+
+# 📅 Fecha con date_id = 1 y última fecha del DimDate.csv original
+FECHA_BASE = date(2019, 3, 9)
+FECHA_FIN_DEFAULT = date(2020, 2, 21)
+
+# Columnas de TABLE_DDL["dim_date"] (create_db.py), en orden
+COLUMNAS = [
+    'date_id', 'date', 'year', 'quarter', 'quarter_name', 'month',
+    'month_name', 'day', 'week_day', 'week_day_name',
+]
+
+# Nombres en inglés como en el CSV original (independiente del locale del sistema)
+MESES = (
+    'January', 'February', 'March', 'April', 'May', 'June', 'July',
+    'August', 'September', 'October', 'November', 'December',
+)
+DIAS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def id_de_fecha(fecha):
+    """date_id correspondiente a una fecha (date, datetime o texto YYYY-MM-DD)."""
+    if isinstance(fecha, str):
+        fecha = date.fromisoformat(fecha)
+    elif isinstance(fecha, datetime):
+        fecha = fecha.date()
+    return (fecha - FECHA_BASE).days + 1
+
+
+def fecha_de_id(date_id):
+    """Fecha correspondiente a un date_id."""
+    return FECHA_BASE + timedelta(days=int(date_id) - 1)
+
+
+def generar_dim_date(desde_id, hasta_id):
+    """
+    Genera las filas de dim_date para los ids [desde_id, hasta_id], sin bucles por fila.
+
+    Retorna:
+        DataFrame con las columnas de COLUMNAS (vacío si el rango está vacío).
+    """
+    import numpy as np
+
+    return generar_filas(np.arange(desde_id, hasta_id + 1, dtype='int64'))
+
+
+def generar_filas(ids):
+    """Genera las filas de dim_date para una lista de date_id (en ese orden)."""
+    import numpy as np
+    import pandas as pd
+
+    ids = np.asarray(ids, dtype='int64')
+    if not len(ids):
+        return pd.DataFrame(columns=COLUMNAS)
+    fechas = pd.DatetimeIndex(np.datetime64(FECHA_BASE, 'D') + (ids - 1).astype('timedelta64[D]'))
+    trimestre = fechas.quarter.to_numpy()
+    mes = fechas.month.to_numpy()
+    dia_semana = fechas.dayofweek.to_numpy()  # lunes = 0
+    return pd.DataFrame({
+        'date_id': ids,
+        'date': fechas.strftime('%Y-%m-%d'),
+        'year': fechas.year.to_numpy(),
+        'quarter': trimestre,
+        'quarter_name': np.char.add('Q', trimestre.astype(str)).astype(object),
+        'month': mes,
+        'month_name': np.array(MESES, dtype=object)[mes - 1],
+        'day': fechas.day.to_numpy(),
+        'week_day': dia_semana + 1,
+        'week_day_name': np.array(DIAS, dtype=object)[dia_semana],
+    }, columns=COLUMNAS)
+
+
+def max_date_id_hechos(csv_path=FACTS_CSV_DEFAULT, columna='Dateid'):
+    """Máximo Dateid del CSV de hechos (0 si no hay filas válidas)."""
+    import pandas as pd
+
+    maximo = 0
+    for bloque in pd.read_csv(csv_path, usecols=[columna], chunksize=100000):
+        valores = pd.to_numeric(bloque[columna], errors='coerce').dropna()
+        if len(valores):
+            maximo = max(maximo, int(valores.max()))
+    return maximo
+
+
+def rango_date_id_cargado(cur, tabla='dim_date'):
+    """Primer y último date_id presentes en la tabla ((None, None) si está vacía)."""
+    cur.execute(f"SELECT MIN(date_id), MAX(date_id) FROM {tabla}")
+    return cur.fetchone()
+
+
+def ids_a_corregir(cur, tabla='dim_date'):
+    """
+    date_id ya cargados cuyas columnas difieren de las que arma generar_dim_date
+    (p. ej. los del DimDate.csv original). Lo calcula la base, sin traer la tabla.
+    """
+    cur.execute(f"""
+        SELECT d.date_id
+        FROM {tabla} d
+        CROSS JOIN LATERAL (SELECT %s::date + (d.date_id - 1) AS f) e
+        WHERE (d.date, d.year, d.quarter, d.quarter_name, d.month, d.month_name,
+               d.day, d.week_day, d.week_day_name)
+          IS DISTINCT FROM
+              (e.f, EXTRACT(YEAR FROM e.f)::int, EXTRACT(QUARTER FROM e.f)::int,
+               'Q' || EXTRACT(QUARTER FROM e.f)::int, EXTRACT(MONTH FROM e.f)::int,
+               to_char(e.f, 'FMMonth'), EXTRACT(DAY FROM e.f)::int,
+               EXTRACT(ISODOW FROM e.f)::int, to_char(e.f, 'FMDay'))
+        ORDER BY d.date_id
+    """, (FECHA_BASE,))
+    return [fila[0] for fila in cur.fetchall()]
+
+
+def copiar_filas(cur, df, tabla='dim_date'):
+    """Carga el DataFrame en la tabla con COPY."""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {tabla} ({', '.join(COLUMNAS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def upsert_filas(cur, df, tabla='dim_date'):
+    """
+    Carga el DataFrame con COPY en una tabla temporal y lo aplica con upsert por date_id:
+    inserta los ids nuevos y reescribe los existentes solo si alguna columna difiere.
+
+    Retorna:
+        (insertadas, corregidas)
+    """
+    stage = f"{tabla}_stage"
+    cur.execute(f"CREATE TEMP TABLE {stage} (LIKE {tabla}) ON COMMIT DROP")
+    copiar_filas(cur, df, stage)
+    datos = COLUMNAS[1:]
+    cur.execute(f"""
+        INSERT INTO {tabla} AS d ({', '.join(COLUMNAS)})
+        SELECT {', '.join(COLUMNAS)} FROM {stage}
+        ON CONFLICT (date_id) DO UPDATE SET {', '.join(f"{c} = EXCLUDED.{c}" for c in datos)}
+        WHERE ({', '.join(f"d.{c}" for c in datos)}) IS DISTINCT FROM ({', '.join(f"EXCLUDED.{c}" for c in datos)})
+        RETURNING (xmax = 0)
+    """)
+    # xmax = 0 solo en las filas recién insertadas; las demás devueltas fueron corregidas
+    nuevas = [fila[0] for fila in cur.fetchall()]
+    insertadas = sum(nuevas)
+    return insertadas, len(nuevas) - insertadas
+
+
+def extender_dim_date(engine, hasta_id, tabla='dim_date', desde_id=None):
+    """
+    Agrega a dim_date los días que faltan hasta hasta_id (y desde desde_id, si se pasa)
+    y corrige los ya cargados que difieren de generar_dim_date (p. ej. los del DimDate.csv
+    original), en una transacción. Solo se generan y escriben esos ids.
+
+    Retorna:
+        (insertadas, corregidas): Cantidad de filas nuevas y reescritas.
+    """
+    import numpy as np
+
+    raw = engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        # Lock para que dos cargas en paralelo no generen los mismos ids
+        cur.execute(f"LOCK TABLE {tabla} IN SHARE ROW EXCLUSIVE MODE")
+        primero, ultimo = rango_date_id_cargado(cur, tabla)
+        if ultimo is None:
+            ids = [np.arange(1 if desde_id is None else desde_id, hasta_id + 1)]
+        else:
+            ids = [np.arange(ultimo + 1, hasta_id + 1)]
+            if desde_id is not None and desde_id < primero:
+                ids.append(np.arange(desde_id, primero))
+            with instrumentacion.span(f"comparar {tabla}", "sql"):
+                ids.append(ids_a_corregir(cur, tabla))
+        ids = np.concatenate(ids)
+        with instrumentacion.span("generar dim_date", "pandas", filas=len(ids)):
+            filas = generar_filas(ids)
+        insertadas = corregidas = 0
+        if len(filas):
+            with instrumentacion.span(f"upsert {tabla}", "sql", filas=len(filas)):
+                insertadas, corregidas = upsert_filas(cur, filas, tabla)
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+    return insertadas, corregidas
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera y carga la dimensión calendario dim_date')
+    parser.add_argument('--desde', help='Primera fecha a generar (YYYY-MM-DD); por defecto, la del id 1 o la primera cargada')
+    parser.add_argument('--hasta', help='Última fecha a generar (YYYY-MM-DD); por defecto, el máximo Dateid de los hechos')
+    parser.add_argument('--hechos', default=FACTS_CSV_DEFAULT, help='CSV de hechos para tomar el máximo Dateid')
+    parser.add_argument('--salida', help='Escribe las filas en este CSV en lugar de cargarlas en la base')
+    args = parser.parse_args()
+    instrumentacion.iniciar("dim_date")
+
+    if args.hasta:
+        hasta_id = id_de_fecha(args.hasta)
+    else:
+        hasta_id = max(max_date_id_hechos(args.hechos), id_de_fecha(FECHA_FIN_DEFAULT))
+    desde_id = id_de_fecha(args.desde) if args.desde else None
+
+    inicio = time.perf_counter()
+    if args.salida:
+        desde = 1 if desde_id is None else desde_id
+        with instrumentacion.span("generar dim_date", "pandas", desde=desde, hasta=hasta_id):
+            filas = generar_dim_date(desde, hasta_id)
+        filas.to_csv(args.salida, index=False)
+        print(f"✅ {len(filas)} fechas escritas en {args.salida} ({time.perf_counter() - inicio:.2f}s)")
+        return
+
+    from sqlalchemy import create_engine
+    if __package__:
+        from .csv_to_DB import cadena_conexion
+    else:  # ejecutado como script desde la carpeta del ejercicio
+        from csv_to_DB import cadena_conexion
+
+    engine = instrumentacion.instrumentar_engine(create_engine(cadena_conexion()))
+    try:
+        insertadas, corregidas = extender_dim_date(engine, hasta_id, desde_id=desde_id)
+    finally:
+        engine.dispose()
+    print(f"✅ dim_date extendida hasta {fecha_de_id(hasta_id)} (id {hasta_id}): "
+          f"{insertadas} fechas nuevas, {corregidas} corregidas ({time.perf_counter() - inicio:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
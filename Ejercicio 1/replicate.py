@@ -7,44 +7,56 @@ Manejo mejorado de errores
 Verificación de dependencias
 """
 
+from __future__ import annotations
+
 import os
-from typing import List, Dict
-from sqlalchemy import create_engine, MetaData, Table, inspect, text
-from sqlalchemy.engine import Engine
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import select
+import sys
+from typing import List, Dict, TYPE_CHECKING
 from dotenv import load_dotenv
 
+# SQLAlchemy se importa dentro de las funciones que lo usan (importar el módulo no lo carga)
+if TYPE_CHECKING:
+    from sqlalchemy import MetaData
+    from sqlalchemy.engine import Engine
+
+if not __package__:  # ejecutado como script: la raíz del repositorio no está en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun import instrumentacion
+
 # -------------------------------------------------------------------
 #  CONFIGURACIÓN DE CONEXIONES
 # -------------------------------------------------------------------
 
-load_dotenv()
-
-ORIGEN = {
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'host': os.getenv('DB_HOST'),
-    'port': int(os.getenv('DB_PORT')),
-    'database': os.getenv('DB_NAME')
-}
-
-DESTINO = {
-    'user': os.getenv('SUPABASE_DB_USER'),
-    'password': os.getenv('SUPABASE_DB_PASSWORD'),
-    'host': os.getenv('SUPABASE_DB_HOST'),
-    'port': os.getenv('SUPABASE_DB_PORT'),
-    'database': os.getenv('SUPABASE_DB_NAME')
-}
+def cargar_configuracion():
+    """Lee las conexiones ORIGEN y DESTINO del entorno (.env incluido) al ejecutar."""
+    load_dotenv()
+
+    origen = {
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'host': os.getenv('DB_HOST'),
+        'port': int(os.getenv('DB_PORT', '5432')),
+        'database': os.getenv('DB_NAME')
+    }
+
+    destino = {
+        'user': os.getenv('SUPABASE_DB_USER'),
+        'password': os.getenv('SUPABASE_DB_PASSWORD'),
+        'host': os.getenv('SUPABASE_DB_HOST'),
+        'port': os.getenv('SUPABASE_DB_PORT'),
+        'database': os.getenv('SUPABASE_DB_NAME')
+    }
+    return origen, destino
 
 def make_engine(cfg: Dict) -> Engine:
     """Construye un engine SQLAlchemy con configuración mejorada."""
+    from sqlalchemy import create_engine
+
     uri = (
         f"postgresql+psycopg2://{cfg['user']}:{cfg['password']}"
         f"@{cfg['host']}:{cfg['port']}/{cfg['database']}"
     )
-    return create_engine(uri, echo=False, pool_pre_ping=True) 
+    return instrumentacion.instrumentar_engine(create_engine(uri, echo=False, pool_pre_ping=True))
 
 # -------------------------------------------------------------------
 #  FUNCIONES PRINCIPALES
@@ -55,6 +67,8 @@ def get_ordered_tables(engine: Engine) -> List[str]:
     Devuelve las tablas en orden de carga correcto (dimensiones primero).
     Usa convención de nombres: dim_* primero, fact_* al final.
     """
+    from sqlalchemy import inspect
+
     inspector = inspect(engine)
     all_tables = inspector.get_table_names()
     
@@ -65,8 +79,12 @@ def get_ordered_tables(engine: Engine) -> List[str]:
     
     return dim_tables + other_tables + fact_tables
 
+@instrumentacion.instrumentar("reflejar esquema")
 def reflect_metadata(engine: Engine) -> MetaData:
     """Refleja metadata con verificación de conexión."""
+    from sqlalchemy import MetaData
+    from sqlalchemy.exc import SQLAlchemyError
+
     try:
         meta = MetaData()
         meta.reflect(bind=engine)
@@ -75,8 +93,11 @@ def reflect_metadata(engine: Engine) -> MetaData:
         print(f"❌ Error al reflejar metadata: {e}")
         raise
 
+@instrumentacion.instrumentar("recrear esquema")
 def recreate_schema(dest_engine: Engine, metadata: MetaData):
     """Recrea esquema con manejo de errores mejorado."""
+    from sqlalchemy.exc import SQLAlchemyError
+
     try:
         print("🔄 Recreando esquema en destino...")
         with dest_engine.begin() as conn:
@@ -89,6 +110,10 @@ def recreate_schema(dest_engine: Engine, metadata: MetaData):
 
 def copy_data(src_engine: Engine, dest_engine: Engine, metadata: MetaData):
     """Copia datos en el orden correcto con manejo transaccional."""
+    from sqlalchemy import select
+    from sqlalchemy.exc import SQLAlchemyError
+    from sqlalchemy.orm import sessionmaker
+
     ordered_tables = get_ordered_tables(src_engine)
     print(f"🔍 Orden de replicación: {ordered_tables}")
     
@@ -103,16 +128,18 @@ def copy_data(src_engine: Engine, dest_engine: Engine, metadata: MetaData):
                 
                 try:
                     # Leer datos
-                    result = src_conn.execute(select(table_obj))
-                    rows = result.mappings().all()
+                    with instrumentacion.span("leer tabla", tabla=table_name):
+                        result = src_conn.execute(select(table_obj))
+                        rows = result.mappings().all()
                     
                     if not rows:
                         print(f"   ⚠ Tabla vacía, omitiendo")
                         continue
                         
                     # Insertar en destino
-                    sess_dest.execute(table_obj.insert(), rows)
-                    sess_dest.commit()
+                    with instrumentacion.span("escribir tabla", tabla=table_name, filas=len(rows)):
+                        sess_dest.execute(table_obj.insert(), rows)
+                        sess_dest.commit()
                     print(f"   ✔ {len(rows)} filas copiadas")
                     
                 except SQLAlchemyError as e:
@@ -128,6 +155,11 @@ def copy_data(src_engine: Engine, dest_engine: Engine, metadata: MetaData):
 # -------------------------------------------------------------------
 
 def main():
+    from sqlalchemy import text
+
+    instrumentacion.iniciar("replicate")
+    ORIGEN, DESTINO = cargar_configuracion()
+    engine_origen = engine_destino = None
     try:
         print("🚀 Iniciando replicación...")
         
@@ -151,7 +183,7 @@ def main():
             print("\n🔍 Diagnóstico:")
             print(f"Origen: postgresql://{ORIGEN['user']}:****@{ORIGEN['host']}:{ORIGEN['port']}/{ORIGEN['database']}")
             print(f"Destino: postgresql://{DESTINO['user']}:****@{DESTINO['host']}:{DESTINO['port']}/{DESTINO['database']}")
-            return
+            return 1
 
         # 2) Reflejar metadata
         meta_origen = reflect_metadata(engine_origen)
@@ -163,13 +195,17 @@ def main():
         copy_data(engine_origen, engine_destino, meta_origen)
         
         print("\n🎉 Replicación completada exitosamente!")
+        return 0
         
     except Exception as e:
         print(f"\n🔥 Error crítico: {e}")
+        # Código de salida distinto de cero para que el Programador de Tareas / orquestador lo detecte
+        return 1
     finally:
         # Cerrar conexiones
-        engine_origen.dispose()
-        engine_destino.dispose()
+        for engine in (engine_origen, engine_destino):
+            if engine is not None:
+                engine.dispose()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
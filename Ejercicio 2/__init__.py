@@ -0,0 +1 @@
+# Ejercicio 2: cotizaciones del BCRA (histórico e incremental)
@@ -0,0 +1,150 @@
+# Benchmark de la ingesta de cotizaciones contra el mock local de la API del BCRA
+# Ejecuta las funciones reales de utils.py (fetch + carga en PostgreSQL) contra
+# mock_bcra_api.py y una base PostgreSQL local, y reporta requests, tiempo total,
+# filas/seg y memoria pico para los modos histórico e incremental.
+#
+# IMPORTANTE: vacía la tabla 'cotizaciones'. Por eso no usa las variables DB_* de
+# producción sino BENCH_DB_HOST, BENCH_DB_PORT, BENCH_DB_NAME, BENCH_DB_USER y
+# BENCH_DB_PASSWORD, y se niega a conectarse si BENCH_DB_HOST no es local.
+#
+# Uso:
+#   python benchmark_ingesta.py --modo ambos --latencia-ms 30 --error-429 0.02
+#   python benchmark_ingesta.py --modo historico --sin-db   # solo la parte HTTP
+
+import argparse
+import os
+import time
+import tracemalloc
+from datetime import timedelta
+
+if __package__:
+    from . import utils
+    from .mock_bcra_api import MockBCRA, start_server
+else:  # ejecutado como script desde la carpeta del ejercicio
+    import utils
+    from mock_bcra_api import MockBCRA, start_server
+
+
+# Hosts aceptados para la base del benchmark (un path es un socket Unix local)
+HOSTS_LOCALES = {"localhost", "127.0.0.1", "::1"}
+
+
+def conectar_base_pruebas():
+    """
+    Conexión a la base del benchmark (variables BENCH_DB_*). Falla antes de ejecutar
+    nada si no están definidas o si el host no es local.
+    """
+    host = os.getenv("BENCH_DB_HOST")
+    if not host:
+        raise SystemExit("❌ Definir BENCH_DB_HOST (y BENCH_DB_*) con una base local de pruebas, o usar --sin-db")
+    if host not in HOSTS_LOCALES and not host.startswith("/"):
+        raise SystemExit(f"❌ BENCH_DB_HOST={host} no es local: el benchmark vacía 'cotizaciones' "
+                         f"y solo corre contra {', '.join(sorted(HOSTS_LOCALES))} o un socket Unix")
+    return utils.connect_db("BENCH_DB_")
+
+
+def medir(nombre, mock, funcion):
+    """Ejecuta funcion() midiendo requests al mock, tiempo y memoria pico."""
+    requests_antes = mock.stats["requests"]
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    filas = funcion()
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "modo": nombre,
+        "requests": mock.stats["requests"] - requests_antes,
+        "filas": filas,
+        "segundos": duracion,
+        "filas_seg": filas / duracion if duracion else 0.0,
+        "memoria_pico_mb": pico / 1024 / 1024,
+    }
+
+
+def run_historico(conn):
+    """Descarga todo el histórico y, si hay conexión, lo carga desde cero."""
+    data = utils.fetch_all_historical()
+    if conn is not None:
+        with conn.cursor() as cur:
+            cur.execute("TRUNCATE cotizaciones;")
+        utils.insert_data_to_db(conn, data)
+    return len(data)
+
+
+def preparar_incremental(conn, mock, dias):
+    """Deja la tabla cargada salvo los últimos 'dias' días (fuera de la medición)."""
+    if conn is None:
+        return mock.fechas[-1] - timedelta(days=dias)
+    with conn.cursor() as cur:
+        cur.execute("SELECT COUNT(*) FROM cotizaciones;")
+        if cur.fetchone()[0] == 0:
+            run_historico(conn)
+        cur.execute(
+            "DELETE FROM cotizaciones WHERE fecha > (SELECT MAX(fecha) FROM cotizaciones) - %s;",
+            (dias,)
+        )
+    return utils.get_last_date(conn)
+
+
+def run_incremental(conn, last_date):
+    """Reproduce incremental.py: trae desde la última fecha y carga lo nuevo."""
+    new_data = utils.fetch_from_date(last_date)
+    if conn is not None and new_data:
+        utils.insert_data_to_db(conn, new_data)
+    return len(new_data)
+
+
+def imprimir_reporte(resultados):
+    print("\n📊 Resultados del benchmark")
+    print(f"{'modo':<12}{'requests':>10}{'filas':>10}{'segundos':>11}{'filas/seg':>12}{'mem MB':>9}")
+    for r in resultados:
+        print(f"{r['modo']:<12}{r['requests']:>10}{r['filas']:>10}{r['segundos']:>11.2f}"
+              f"{r['filas_seg']:>12.0f}{r['memoria_pico_mb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de ingesta BCRA contra un mock local")
+    parser.add_argument("--modo", choices=["historico", "incremental", "ambos"], default="ambos")
+    parser.add_argument("--latencia-ms", type=int, default=20)
+    parser.add_argument("--error-400", type=float, default=0.0)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-5xx", type=float, default=0.0)
+    parser.add_argument("--max-rango-dias", type=int, default=None)
+    parser.add_argument("--dias-incremental", type=int, default=7,
+                        help="Días a borrar antes de medir el modo incremental")
+    parser.add_argument("--sin-db", action="store_true", help="Medir solo la parte HTTP")
+    args = parser.parse_args()
+
+    utils.configurar_entorno()
+    # La base se valida antes de levantar el mock y de ejecutar cualquier sentencia
+    conn = None
+    if not args.sin_db:
+        conn = conectar_base_pruebas()
+        utils.create_table(conn)
+
+    mock = MockBCRA(args.latencia_ms, args.error_400, args.error_429, args.error_5xx,
+                    args.max_rango_dias)
+    server, api_base = start_server(mock)
+    utils.API_BASE = api_base
+    print(f"🧪 Mock BCRA en {api_base}")
+
+    resultados = []
+    try:
+        if args.modo in ("historico", "ambos"):
+            resultados.append(medir("historico", mock, lambda: run_historico(conn)))
+        if args.modo in ("incremental", "ambos"):
+            last_date = preparar_incremental(conn, mock, args.dias_incremental)
+            resultados.append(medir("incremental", mock, lambda: run_incremental(conn, last_date)))
+    finally:
+        server.shutdown()
+        if conn is not None:
+            conn.close()
+
+    imprimir_reporte(resultados)
+    print(f"\nErrores inyectados por el mock: 400={mock.stats['400']} "
+          f"429={mock.stats['429']} 5xx={mock.stats['5xx']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,19 +4,19 @@
 
 # Importar las librerías necesarias
 
-import os
-import requests
-from datetime import date
-import ssl
-import urllib3
-import psycopg2
-from psycopg2.extras import execute_values
-from dotenv import load_dotenv
-from utils import connect_db, fetch_all_historical, insert_data_to_db, create_table
+if __package__:
+    from .utils import (configurar_entorno, connect_db, fetch_all_historical, insert_data_to_db,
+                        create_table, instrumentacion)
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from utils import (configurar_entorno, connect_db, fetch_all_historical, insert_data_to_db,
+                       create_table, instrumentacion)
 
 # Función principal para ejecutar el script
 
-if __name__ == "__main__":
+def main():
+    configurar_entorno()
+    instrumentacion.iniciar("data_historica")
+
     # 1. Obtener todos los datos históricos desde la API del BCRA
     data = fetch_all_historical()
     print(f"\n✅ Total histórico: {len(data)} registros")
@@ -43,3 +43,6 @@ if __name__ == "__main__":
     # Cerrar la conexión a la base de datos
     conn.close()
 
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,221 @@
 # Replicación incremental de datos históricos
-# Importar las librerías necesarias
+# Modo por defecto: una ejecución (pensado para el cron job de Render).
+# Modo --daemon: proceso de larga duración con un scheduler interno que mantiene
+# la conexión a la base y la sesión HTTP abiertas entre ejecuciones, y expone
+# un endpoint de salud/métricas.
+#
+# Uso:
+#   python incremental.py
+#   python incremental.py --daemon --intervalo-min 60 --solo-habiles --puerto-health 8080
 
+# Importar las librerías necesarias
+import argparse
+import json
 import os
-import requests
-from datetime import date
-import ssl
-import urllib3
-import psycopg2
-from psycopg2.extras import execute_values
-from dotenv import load_dotenv
-from utils import connect_db, insert_data_to_db, get_last_date, fetch_from_date
+import signal
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-# Función principal para ejecutar el script
+if __package__:
+    from .utils import (configurar_entorno, connect_db, create_table, insert_data_to_db, get_last_date,
+                        fetch_from_date, instrumentacion)
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from utils import (configurar_entorno, connect_db, create_table, insert_data_to_db, get_last_date,
+                       fetch_from_date, instrumentacion)
 
-if __name__ == "__main__":
-    print("🚀 Iniciando replicación incremental...")
+# Métricas del proceso (las lee el endpoint de salud)
+METRICAS = {
+    "inicio": datetime.now().isoformat(timespec="seconds"),
+    "ejecuciones": 0,
+    "errores": 0,
+    "registros_insertados": 0,
+    "registros_revisados": 0,
+    "ultima_ejecucion": None,
+    "ultima_duracion_seg": None,
+    "ultima_fecha_db": None,
+    "ultimo_error": None,
+    "proxima_ejecucion": None,
+}
+METRICAS_LOCK = threading.Lock()
 
-    # 1. Conexión a la base
-    conn = connect_db()
 
-    # 2. Obtener última fecha en la base
+@instrumentacion.instrumentar("ciclo incremental")
+def actualizar(conn):
+    """
+    Ejecuta un ciclo incremental: última fecha en DB → API → inserción.
+    Devuelve (nuevas, revisadas): filas insertadas y actualizadas en la base.
+    """
+    # 1. Obtener última fecha en la base
     last_date = get_last_date(conn)
     print(f"🕒 Última fecha registrada en DB: {last_date}")
+    if last_date is None:
+        print("⚠ La tabla está vacía: ejecutar primero data_historica.py")
+        return 0, 0
 
-    # 4. Traer sólo los nuevos registros
+    # 2. Traer sólo los nuevos registros
     new_data = fetch_from_date(last_date)
     print(f"📈 Nuevos registros a insertar: {len(new_data)}")
 
-    # 5. Insertar nuevos datos
+    # 3. Insertar nuevos datos
+    nuevas = revisadas = 0
     if new_data:
-        insert_data_to_db(conn, new_data)
+        nuevas, revisadas = insert_data_to_db(conn, new_data)
     else:
         print("✅ La base de datos ya está actualizada.")
+
+    with METRICAS_LOCK:
+        METRICAS["ultima_fecha_db"] = str(get_last_date(conn))
+    return nuevas, revisadas
+
+
+def proxima_ejecucion(ahora, intervalo_min, solo_habiles):
+    """Calcula el próximo horario de ejecución (saltando fines de semana si corresponde)."""
+    siguiente = ahora + timedelta(minutes=intervalo_min)
+    while solo_habiles and siguiente.weekday() >= 5:
+        siguiente = (siguiente + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return siguiente
+
+
+def make_health_handler():
+    """Handler HTTP con /health (JSON) y /metrics (formato texto de Prometheus)."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with METRICAS_LOCK:
+                metricas = dict(METRICAS)
+            if self.path == "/health":
+                metricas["status"] = "degradado" if metricas["ultimo_error"] else "ok"
+                body = json.dumps(metricas).encode("utf-8")
+                tipo = "application/json"
+            elif self.path == "/metrics":
+                body = (
+                    f"incremental_ejecuciones_total {metricas['ejecuciones']}\n"
+                    f"incremental_errores_total {metricas['errores']}\n"
+                    f"incremental_registros_insertados_total {metricas['registros_insertados']}\n"
+                    f"incremental_registros_revisados_total {metricas['registros_revisados']}\n"
+                    f"incremental_ultima_duracion_segundos {metricas['ultima_duracion_seg'] or 0}\n"
+                ).encode("utf-8")
+                tipo = "text/plain; version=0.0.4"
+            else:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", tipo)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def run_daemon(intervalo_min, solo_habiles, puerto_health):
+    """
+    Bucle del scheduler: ejecuta actualizar() en cada horario programado,
+    reutilizando la misma conexión (se reconecta solo si se cayó).
+    """
+    import psycopg2
+
+    detener = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: detener.set())
+    signal.signal(signal.SIGINT, lambda *_: detener.set())
+
+    server = ThreadingHTTPServer(("0.0.0.0", puerto_health), make_health_handler())
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🩺 Endpoint de salud en http://0.0.0.0:{puerto_health}/health")
+
+    conn = None
+    tabla_lista = False
+    # Con --solo-habiles, un arranque en fin de semana espera hasta el lunes
+    siguiente = proxima_ejecucion(datetime.now(), 0, solo_habiles)
+    try:
+        while not detener.is_set():
+            espera = (siguiente - datetime.now()).total_seconds()
+            if espera > 0:
+                with METRICAS_LOCK:
+                    METRICAS["proxima_ejecucion"] = siguiente.isoformat(timespec="seconds")
+                print(f"⏭ Próxima ejecución: {siguiente:%Y-%m-%d %H:%M}")
+                if detener.wait(espera):
+                    break
+
+            inicio = datetime.now()
+            try:
+                # La conexión y la tabla se preparan dentro del ciclo: si la base está caída
+                # al arrancar (o se cae después) se reintenta en el próximo horario
+                if conn is None or conn.closed:
+                    print("🔌 Conectando a la base de datos...")
+                    conn = connect_db()
+                    tabla_lista = False
+                if not tabla_lista:
+                    create_table(conn)
+                    tabla_lista = True
+                nuevas, revisadas = actualizar(conn)
+                with METRICAS_LOCK:
+                    METRICAS["registros_insertados"] += nuevas
+                    METRICAS["registros_revisados"] += revisadas
+                    METRICAS["ultimo_error"] = None
+            except Exception as e:
+                print(f"❌ Error en la ejecución incremental: {e}")
+                with METRICAS_LOCK:
+                    METRICAS["errores"] += 1
+                    METRICAS["ultimo_error"] = str(e)
+                # Si el error fue de conexión, la descartamos para reconectar en el próximo ciclo
+                if isinstance(e, psycopg2.OperationalError) and conn is not None:
+                    conn.close()
+            fin = datetime.now()
+
+            siguiente = proxima_ejecucion(fin, intervalo_min, solo_habiles)
+            with METRICAS_LOCK:
+                METRICAS["ejecuciones"] += 1
+                METRICAS["ultima_ejecucion"] = inicio.isoformat(timespec="seconds")
+                METRICAS["ultima_duracion_seg"] = round((fin - inicio).total_seconds(), 3)
+            # Con INSTRUMENTACION=1, una traza por ciclo (los spans no se acumulan en memoria)
+            instrumentacion.volcar()
+    finally:
+        server.shutdown()
+        if conn is not None and not conn.closed:
+            conn.close()
+        print("👋 Daemon detenido.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Actualización incremental de cotizaciones del BCRA")
+    parser.add_argument("--daemon", action="store_true",
+                        help="Quedar en ejecución con un scheduler interno")
+    parser.add_argument("--intervalo-min", type=int,
+                        default=int(os.getenv("INCREMENTAL_INTERVALO_MIN", "60")),
+                        help="Minutos entre ejecuciones en modo daemon")
+    parser.add_argument("--solo-habiles", action="store_true",
+                        help="En modo daemon, no ejecutar sábados ni domingos")
+    parser.add_argument("--puerto-health", type=int, default=int(os.getenv("PORT", "8080")),
+                        help="Puerto del endpoint de salud/métricas")
+    args = parser.parse_args()
+    configurar_entorno()
+    instrumentacion.iniciar("incremental")
+
+    if args.daemon:
+        run_daemon(args.intervalo_min, args.solo_habiles, args.puerto_health)
+        return
+
+    print("🚀 Iniciando replicación incremental...")
+
+    # 1. Conexión a la base
+    conn = connect_db()
+    try:
+        # Asegura columnas/tablas nuevas (hash de contenido y auditoría de revisiones)
+        create_table(conn)
+
+        # 2. Traer e insertar los nuevos registros
+        actualizar(conn)
+    finally:
+        conn.close()
+
+
+# Función principal para ejecutar el script
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# Servidor local que imita la API de Estadísticas Cambiarias del BCRA
+# Sirve /estadisticascambiarias/v1.0/Cotizaciones/{moneda} con fechaDesde/fechaHasta/limit/offset,
+# con datos sintéticos (días hábiles desde 1992), latencia configurable e inyección de errores.
+# Permite medir la ingesta (data_historica.py / incremental.py) sin depender de api.bcra.gob.ar.
+#
+# Uso:
+#   python mock_bcra_api.py --puerto 8765 --latencia-ms 50 --error-429 0.05
+#   BCRA_API_BASE=http://127.0.0.1:8765/estadisticascambiarias/v1.0 python incremental.py
+
+import argparse
+import json
+import random
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+PREFIJO = "/estadisticascambiarias/v1.0/Cotizaciones/"
+
+
+def generar_serie(desde=date(1992, 1, 2), hasta=None, semilla=42):
+    """
+    Genera una serie sintética de cotizaciones en días hábiles (lunes a viernes).
+    Devuelve dos listas paralelas ordenadas: fechas (date) y valores (float).
+    """
+    hasta = hasta or date.today()
+    rnd = random.Random(semilla)
+    fechas, valores = [], []
+    valor = 1.0
+    dia = desde
+    while dia <= hasta:
+        if dia.weekday() < 5:
+            # Caminata aleatoria con deriva positiva (devaluación)
+            valor = round(valor * (1 + rnd.gauss(0.0004, 0.004)), 4)
+            fechas.append(dia)
+            valores.append(valor)
+        dia += timedelta(days=1)
+    return fechas, valores
+
+
+class MockBCRA:
+    """Estado del servidor: datos, configuración de latencia/errores y contadores."""
+
+    def __init__(self, latencia_ms=0, error_400=0.0, error_429=0.0, error_5xx=0.0,
+                 max_rango_dias=None, semilla=42, error_400_antes_de_serie=False):
+        self.fechas, self.valores = generar_serie(semilla=semilla)
+        self.latencia_ms = latencia_ms
+        self.error_400 = error_400
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.max_rango_dias = max_rango_dias
+        self.error_400_antes_de_serie = error_400_antes_de_serie
+        self.rnd = random.Random(semilla)
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "400": 0, "429": 0, "5xx": 0, "registros_servidos": 0}
+
+    def _contar(self, clave, n=1):
+        with self.lock:
+            self.stats[clave] += n
+
+    def responder(self, moneda, params):
+        """Devuelve (status, payload) para una consulta de cotizaciones."""
+        self._contar("requests")
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms / 1000)
+
+        with self.lock:
+            sorteo = self.rnd.random()
+        if sorteo < self.error_429:
+            self._contar("429")
+            return 429, {"status": 429, "errorMessages": ["Too Many Requests"]}
+        if sorteo < self.error_429 + self.error_5xx:
+            self._contar("5xx")
+            return 503, {"status": 503, "errorMessages": ["Service Unavailable"]}
+
+        try:
+            desde = date.fromisoformat(params.get("fechaDesde", ["1992-01-01"])[0])
+            hasta = date.fromisoformat(params.get("fechaHasta", [date.today().isoformat()])[0])
+            limit = int(params.get("limit", ["1000"])[0])
+            offset = int(params.get("offset", ["0"])[0])
+        except ValueError:
+            self._contar("400")
+            return 400, {"status": 400, "errorMessages": ["Parámetros inválidos"]}
+
+        rango_invalido = desde > hasta or not (10 <= limit <= 1000)
+        if self.max_rango_dias and (hasta - desde).days + 1 > self.max_rango_dias:
+            rango_invalido = True
+        if self.error_400_antes_de_serie and desde < self.fechas[0]:
+            # Como la API real: un rango que empieza antes de la serie responde 400
+            rango_invalido = True
+        if rango_invalido or sorteo < self.error_429 + self.error_5xx + self.error_400:
+            self._contar("400")
+            return 400, {"status": 400, "errorMessages": ["Rango de fechas inválido"]}
+
+        # La API real devuelve las cotizaciones de la más reciente a la más antigua
+        i = bisect_left(self.fechas, desde)
+        j = bisect_right(self.fechas, hasta)
+        count = j - i
+        indices = range(j - 1 - offset, max(i - 1, j - 1 - offset - limit), -1)
+        results = [
+            {
+                "fecha": self.fechas[k].isoformat(),
+                "detalle": [{
+                    "codigoMoneda": moneda,
+                    "descripcion": "DOLAR E.E.U.U.",
+                    "tipoPase": 1.0,
+                    "tipoCotizacion": self.valores[k],
+                }],
+            }
+            for k in indices
+        ]
+        self._contar("registros_servidos", len(results))
+        return 200, {
+            "status": 200,
+            "metadata": {"resultset": {"count": count, "offset": offset, "limit": limit}},
+            "results": results,
+        }
+
+
+def make_handler(mock):
+    """Crea la clase handler HTTP ligada a una instancia de MockBCRA."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _enviar(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == "/__stats":
+                with mock.lock:
+                    self._enviar(200, dict(mock.stats))
+                return
+            if url.path.startswith(PREFIJO):
+                moneda = url.path[len(PREFIJO):] or "USD"
+                status, payload = mock.responder(moneda, parse_qs(url.query))
+                self._enviar(status, payload)
+                return
+            self._enviar(404, {"status": 404, "errorMessages": ["No encontrado"]})
+
+        def log_message(self, format, *args):
+            # Silenciar el log por request (ensucia la salida de los benchmarks)
+            pass
+
+    return Handler
+
+
+def start_server(mock, host="127.0.0.1", puerto=0):
+    """
+    Levanta el servidor en un hilo daemon y devuelve (server, api_base).
+    Con puerto=0 el sistema asigna un puerto libre.
+    """
+    server = ThreadingHTTPServer((host, puerto), make_handler(mock))
+    server.daemon_threads = True
+    hilo = threading.Thread(target=server.serve_forever, daemon=True)
+    hilo.start()
+    api_base = f"http://{host}:{server.server_address[1]}/estadisticascambiarias/v1.0"
+    return server, api_base
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock local de la API de cotizaciones del BCRA")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--latencia-ms", type=int, default=0, help="Latencia agregada por request")
+    parser.add_argument("--error-400", type=float, default=0.0, help="Probabilidad de responder 400")
+    parser.add_argument("--error-429", type=float, default=0.0, help="Probabilidad de responder 429")
+    parser.add_argument("--error-5xx", type=float, default=0.0, help="Probabilidad de responder 503")
+    parser.add_argument("--max-rango-dias", type=int, default=None,
+                        help="Responder 400 si el rango pedido supera estos días")
+    parser.add_argument("--error-400-antes-de-serie", action="store_true",
+                        help="Responder 400 si el rango empieza antes de la primera cotización")
+    args = parser.parse_args()
+
+    mock = MockBCRA(args.latencia_ms, args.error_400, args.error_429, args.error_5xx,
+                    args.max_rango_dias, error_400_antes_de_serie=args.error_400_antes_de_serie)
+    server, api_base = start_server(mock, args.host, args.puerto)
+    print(f"🧪 Mock BCRA escuchando en {api_base} ({len(mock.fechas)} cotizaciones sintéticas)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+        print(f"Estadísticas: {mock.stats}")
+
+
+if __name__ == "__main__":
+    main()
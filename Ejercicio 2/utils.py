@@ -1,130 +1,326 @@
 # Archivo con todas las funciones necesarias para la conexión a la base de datos, la obtención de datos históricos
 # y la inserción de datos en la base de datos.
+# Importarlo no tiene efectos: el .env y la configuración SSL se aplican con configurar_entorno()
+# (lo llaman los scripts al arrancar), y requests / psycopg2 se importan recién al usarse.
 
 # Importar las librerías necesarias
 import os
-import requests
+import sys
+import hashlib
 from datetime import date, datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
 import ssl
-import urllib3
-import psycopg2
-from psycopg2.extras import execute_values
 from dotenv import load_dotenv
 
-# Cargar variables de entorno
-load_dotenv()
-
-# ─── CONFIGuración SSL (solo para desarrollo) ───────────────────────────────
-ssl._create_default_https_context = ssl._create_unverified_context
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
-# ────────────────────────────────────────────────────────────────────────────
+if not __package__:  # ejecutado como script: la raíz del repositorio no está en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun import instrumentacion
 
 # Configuración de la API del BCRA
-API_BASE = "https://api.bcra.gob.ar/estadisticascambiarias/v1.0"
+# BCRA_API_BASE permite apuntar a otro servidor (p. ej. el mock local de mock_bcra_api.py)
+API_BASE = os.getenv("BCRA_API_BASE", "https://api.bcra.gob.ar/estadisticascambiarias/v1.0")
 MONEDA = "USD"
+# Reintentos ante un 400 que no se puede resolver partiendo el rango
+REINTENTOS_400 = 2
+# Ventanas de hasta estos días no se parten más: un 400 de entrada es "sin datos"
+# (p. ej. fechas anteriores al inicio de la serie). Debe ser menor al rango máximo de la API.
+VENTANA_MINIMA_DIAS = 7
 
-# Variables de entorno
-DB_USER = os.getenv('DB_USER')
-DB_PASSWORD = os.getenv('DB_PASSWORD')
-DB_HOST = os.getenv('DB_HOST')
-DB_PORT = os.getenv('DB_PORT')
-DB_NAME = os.getenv('DB_NAME')
+# Sesión HTTP compartida (se crea con el primer request, ver get_session)
+SESSION = None
 
 # ──────────────────────── Funciones  ────────────────────────
 
-def connect_db():
+def configurar_entorno():
+    """
+    Carga las variables del .env y aplica la configuración SSL de desarrollo.
+    Se llama desde el main() de cada script, nunca al importar el módulo.
+    """
+    global API_BASE
+    import urllib3
+
+    # Cargar variables de entorno
+    load_dotenv()
+    API_BASE = os.getenv("BCRA_API_BASE", API_BASE)
+
+    # ─── CONFIGuración SSL (solo para desarrollo) ───────────────────────────
+    ssl._create_default_https_context = ssl._create_unverified_context
+    urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+    # ────────────────────────────────────────────────────────────────────────
+
+def get_session():
+    """
+    Sesión HTTP compartida: reutiliza la conexión TLS entre páginas y ventanas.
+    Se crea (e importa requests) la primera vez que se usa.
+    """
+    global SESSION
+    if SESSION is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import Retry
+
+        session = instrumentacion.instrumentar_sesion(requests.Session())
+        session.headers.update({"Accept": "application/json"})
+        # Reintentos con backoff ante 429/5xx (la API responde 429 si se la satura)
+        session.mount("https://", HTTPAdapter(max_retries=Retry(
+            total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"], raise_on_status=False
+        )))
+        session.mount("http://", session.adapters["https://"])
+        SESSION = session
+    return SESSION
+
+def connect_db(prefijo='DB_'):
     """
     Crea una conexión a la base de datos PostgreSQL en Supabase.
+    Con otro prefijo (p. ej. 'BENCH_DB_') lee las variables <prefijo>HOST, <prefijo>USER, etc.
     """
+    import psycopg2
+
     conn = psycopg2.connect(
-        user=DB_USER,
-        password=DB_PASSWORD,
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME
+        user=os.getenv(f'{prefijo}USER'),
+        password=os.getenv(f'{prefijo}PASSWORD'),
+        host=os.getenv(f'{prefijo}HOST'),
+        port=os.getenv(f'{prefijo}PORT'),
+        dbname=os.getenv(f'{prefijo}NAME'),
+        cursor_factory=instrumentacion.cursor_psycopg2()  # None = cursor por defecto
     )
     conn.autocommit = True
     return conn
 
 def create_table(conn):
     """
-    Crea la tabla cotizaciones si no existe.
+    Crea la tabla cotizaciones si no existe, junto con la columna de hash de
+    contenido, la transacción que escribió cada fila (txid_cambio, la usa la
+    normalización de precios del Ejercicio 3) y la tabla de auditoría de revisiones.
     """
     sql = '''
     CREATE TABLE IF NOT EXISTS cotizaciones (
         fecha DATE PRIMARY KEY,
         moneda TEXT,
         tipo_cambio NUMERIC(10,4),
-        fuente TEXT
+        fuente TEXT,
+        hash_contenido TEXT,
+        txid_cambio BIGINT DEFAULT txid_current()
+    );
+    ALTER TABLE cotizaciones ADD COLUMN IF NOT EXISTS hash_contenido TEXT;
+    ALTER TABLE cotizaciones ADD COLUMN IF NOT EXISTS txid_cambio BIGINT DEFAULT txid_current();
+
+    CREATE TABLE IF NOT EXISTS cotizaciones_revisiones (
+        id SERIAL PRIMARY KEY,
+        fecha DATE NOT NULL,
+        tipo_cambio_anterior NUMERIC(10,4),
+        tipo_cambio_nuevo NUMERIC(10,4),
+        revisado_en TIMESTAMPTZ NOT NULL DEFAULT now()
     );
     '''
     with conn.cursor() as cur:
         cur.execute(sql)
+        # Filas cargadas antes de existir el hash: se calcula igual que en Python
+        cur.execute('''
+            UPDATE cotizaciones
+            SET hash_contenido = md5(concat_ws('|', moneda, tipo_cambio::text, fuente))
+            WHERE hash_contenido IS NULL;
+        ''')
+
+def _to_date(valor):
+    """Acepta un date o un string ISO (YYYY-MM-DD) y devuelve un date."""
+    if isinstance(valor, date):
+        return valor
+    return date.fromisoformat(valor)
+
+def _request_page(fecha_desde, fecha_hasta, limit, offset):
+    """
+    Hace una única request a la API.
+    Devuelve (results, count) o None si la API responde 400 para el rango.
+    'count' es el total informado en metadata.resultset (None si no viene).
+    """
+    resp = get_session().get(
+        f"{API_BASE}/Cotizaciones/{MONEDA}",
+        params={
+            "fechaDesde": fecha_desde,
+            "fechaHasta": fecha_hasta,
+            "limit": limit,
+            "offset": offset
+        },
+        verify=False
+    )
+    if resp.status_code == 400:
+        return None
+    resp.raise_for_status()
+    payload = resp.json()
+    results = payload.get("results", [])
+    count = ((payload.get("metadata") or {}).get("resultset") or {}).get("count")
+    return results, count
+
+def fetch_range(fecha_desde, fecha_hasta, limit=1000, reintentos_400=REINTENTOS_400,
+                ventana_minima=VENTANA_MINIMA_DIAS):
+    """
+    Trae todas las cotizaciones entre fecha_desde y fecha_hasta.
+    Usa el 'count' de la metadata para cortar sin hacer una request vacía al final
+    (si la API no lo informa, corta con la primera página incompleta).
+    Si la API responde 400 para el rango, lo divide a la mitad y consulta cada mitad,
+    hasta ventanas de 'ventana_minima' días: en una ventana así un 400 de entrada se
+    toma como "sin datos" (p. ej. fechas anteriores al inicio de la serie), sin
+    reintentos ni avisos. Un 400 a mitad de la paginación se reintenta primero; si
+    persiste, el rango se re-consulta por mitades descartando lo parcial (o lanza
+    RuntimeError si ya es una ventana mínima, para no devolverla incompleta).
+    """
+    desde = _to_date(fecha_desde)
+    hasta = _to_date(fecha_hasta)
+    if desde > hasta:
+        return []
 
-def fetch_range(fecha_desde, fecha_hasta, limit=1000):
-    """Trae una página de cotizaciones entre fecha_desde y fecha_hasta."""
     results = []
     offset = 0
     while True:
-        resp = requests.get(
-            f"{API_BASE}/Cotizaciones/{MONEDA}",
-            params={
-                "fechaDesde": fecha_desde,
-                "fechaHasta": fecha_hasta,
-                "limit": limit,
-                "offset": offset
-            },
-            headers={"Accept": "application/json"},
-            verify=False
-        )
-        # Si el rango no existe o es inválido, cortamos
-        if resp.status_code == 400:
-            break
-        resp.raise_for_status()
-        page = resp.json().get("results", [])
-        if not page:
+        page = _request_page(desde.isoformat(), hasta.isoformat(), limit, offset)
+        # A mitad de la paginación el 400 puede ser transitorio
+        intentos = 0
+        while page is None and offset > 0 and intentos < reintentos_400:
+            intentos += 1
+            page = _request_page(desde.isoformat(), hasta.isoformat(), limit, offset)
+        if page is None:
+            if (hasta - desde).days + 1 > ventana_minima:
+                # Rango inválido: se parte a la mitad (descartando lo parcial) y se consulta cada mitad
+                if offset > 0:
+                    print(f"⚠ 400 persistente en {desde} → {hasta} (offset {offset}): se re-consulta por mitades")
+                medio = desde + (hasta - desde) // 2
+                return (fetch_range(desde, medio, limit, reintentos_400, ventana_minima)
+                        + fetch_range(medio + timedelta(days=1), hasta, limit, reintentos_400, ventana_minima))
+            if offset > 0:
+                raise RuntimeError(
+                    f"La API respondió 400 para {desde} → {hasta} (offset {offset}) tras "
+                    f"{reintentos_400} reintentos; se descarta la ventana incompleta"
+                )
+            return []
+
+        rows, count = page
+        results.extend(rows)
+        offset += len(rows)
+        if count is not None:
+            # Con el total informado se pagina hasta alcanzarlo, aunque llegue una página corta
+            if offset >= count:
+                break
+            if not rows:
+                print(f"⚠ La API informó {count} registros para {desde} → {hasta} "
+                      f"pero dejó de devolver filas en el offset {offset}")
+                break
+        elif not rows or len(rows) < limit:
+            # Sin 'count': una página incompleta indica que no hay más
             break
-        results.extend(page)
-        offset += limit
     return results
 
-def fetch_all_historical(start_year=1992):
-    """Recorre año a año desde start_year hasta hoy y acumula todo el histórico."""
+@instrumentacion.instrumentar(categoria="etapa")
+def fetch_all_historical(start_year=1992, limit=1000):
+    """
+    Recorre el histórico desde start_year hasta hoy en ventanas de fechas.
+    El tamaño de cada ventana se ajusta según la densidad de registros observada
+    (registros por día) para que cada ventana entre en una sola página de 'limit'.
+    """
     today = date.today()
+    desde = date(start_year, 1, 2)
+    dias_ventana = 365
     all_data = []
-    for year in range(start_year, today.year + 1):
-        desde = f"{year}-01-02"
-        hasta = f"{year}-12-31" if year < today.year else today.isoformat()
-        print(f"🔄 Obteniendo {year}: {desde} → {hasta}")
-        page = fetch_range(desde, hasta)
+    while desde <= today:
+        hasta = min(desde + timedelta(days=dias_ventana - 1), today)
+        print(f"🔄 Obteniendo {desde.isoformat()} → {hasta.isoformat()}")
+        page = fetch_range(desde, hasta, limit)
         print(f"   • Registros: {len(page)}")
         all_data.extend(page)
+
+        # Recalcular la ventana con un margen del 10% para no pasarnos de una página
+        densidad = len(page) / ((hasta - desde).days + 1)
+        if densidad > 0:
+            dias_ventana = max(30, min(3650, int(limit * 0.9 / densidad)))
+        desde = hasta + timedelta(days=1)
     return all_data
 
+def hash_contenido(moneda, valor, fuente):
+    """
+    Hash del contenido de una cotización. El valor se normaliza a 4 decimales
+    (como NUMERIC(10,4)) para que coincida con el calculado en SQL.
+    """
+    valor_txt = str(Decimal(str(valor)).quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP))
+    return hashlib.md5(f"{moneda}|{valor_txt}|{fuente}".encode("utf-8")).hexdigest()
+
+@instrumentacion.instrumentar(categoria="etapa")
 def insert_data_to_db(conn, data):
     """
     Inserta los datos de cotizaciones en la base de datos.
-    Si la fecha ya existe, ignora el registro.
+    Las fechas nuevas se insertan; las existentes solo se actualizan si cambió
+    su contenido (hash), dejando registro en cotizaciones_revisiones.
+    Todo se hace en bloque a través de una tabla temporal y en una transacción.
+    Devuelve (nuevas, revisadas): filas insertadas y filas actualizadas.
     """
-    with conn.cursor() as cur:
-        for entry in data:
-            fecha = entry["fecha"]
-            valor = entry["detalle"][0]["tipoCotizacion"]
-
-            try:
-                cur.execute(
-                    '''
-                    INSERT INTO cotizaciones (fecha, moneda, tipo_cambio, fuente)
-                    VALUES (%s, %s, %s, %s)
-                    ON CONFLICT (fecha) DO NOTHING;
-                    ''',
-                    (fecha, "Dólar", valor, "BCRA")
-                )
-            except Exception as e:
-                print(f"❌ Error insertando {fecha}: {e}")
+    from psycopg2.extras import execute_values
+
+    records = {}
+    for entry in data:
+        fecha = entry["fecha"]
+        valor = entry["detalle"][0]["tipoCotizacion"]
+        records[fecha] = (fecha, "Dólar", valor, "BCRA", hash_contenido("Dólar", valor, "BCRA"))
+
+    if not records:
+        print("No hay registros para insertar.")
+        return 0, 0
 
+    autocommit = conn.autocommit
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cur:
+            cur.execute('''
+                CREATE TEMP TABLE cotizaciones_stage (LIKE cotizaciones) ON COMMIT DROP;
+            ''')
+            execute_values(
+                cur,
+                "INSERT INTO cotizaciones_stage (fecha, moneda, tipo_cambio, fuente, hash_contenido) VALUES %s",
+                list(records.values()),
+                page_size=1000
+            )
+
+            # 1. Auditoría de revisiones (antes de pisar el valor anterior)
+            cur.execute('''
+                INSERT INTO cotizaciones_revisiones (fecha, tipo_cambio_anterior, tipo_cambio_nuevo)
+                SELECT c.fecha, c.tipo_cambio, s.tipo_cambio
+                FROM cotizaciones c
+                JOIN cotizaciones_stage s USING (fecha)
+                WHERE c.hash_contenido IS DISTINCT FROM s.hash_contenido;
+            ''')
+            revisadas = cur.rowcount
+
+            # 2. Actualizar solo las filas cuyo contenido cambió
+            cur.execute('''
+                UPDATE cotizaciones c
+                SET moneda = s.moneda,
+                    tipo_cambio = s.tipo_cambio,
+                    fuente = s.fuente,
+                    hash_contenido = s.hash_contenido,
+                    txid_cambio = txid_current()
+                FROM cotizaciones_stage s
+                WHERE c.fecha = s.fecha
+                  AND c.hash_contenido IS DISTINCT FROM s.hash_contenido;
+            ''')
+
+            # 3. Insertar las fechas nuevas
+            cur.execute('''
+                INSERT INTO cotizaciones (fecha, moneda, tipo_cambio, fuente, hash_contenido)
+                SELECT fecha, moneda, tipo_cambio, fuente, hash_contenido
+                FROM cotizaciones_stage
+                ON CONFLICT (fecha) DO NOTHING;
+            ''')
+            nuevas = cur.rowcount
         conn.commit()
-        print("✅ Todos los datos fueron insertados correctamente.")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Error insertando cotizaciones: {e}")
+        raise
+    finally:
+        conn.autocommit = autocommit
+
+    print(f"✅ Carga completa: {nuevas} nuevas, {revisadas} revisadas, "
+          f"{len(records) - nuevas - revisadas} sin cambios.")
+    return nuevas, revisadas
 
 
 def get_last_date(conn):
@@ -137,6 +333,7 @@ def get_last_date(conn):
         return result[0]  # Puede ser None si la tabla está vacía
     
 
+@instrumentacion.instrumentar(categoria="etapa")
 def fetch_from_date(last_date):
     """
     Consulta la API del BCRA desde la última fecha registrada hasta hoy.
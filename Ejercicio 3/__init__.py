@@ -0,0 +1 @@
+# Ejercicio 3: scraping de terrenos en Argenprop y carga a Supabase
@@ -0,0 +1,115 @@
+# Benchmark de la limpieza de csv_to_db_supabase.py sobre un CSV grande
+# Genera un CSV sintético de varios millones de filas (a partir de terrenos_posadas.csv,
+# con placeholders de moneda y precios no numéricos mezclados) y compara:
+#   - antes:   lectura completa + Series.apply fila por fila (versión anterior)
+#   - después: lectura por bloques + operaciones vectorizadas (iter_bloques_limpios)
+# Reporta tiempo, filas/seg y pico de memoria (tracemalloc) de cada variante.
+# No se conecta a la base: solo mide la etapa de transformación.
+#
+# Uso:
+#   python benchmark_limpieza.py --filas 2000000
+#   python benchmark_limpieza.py --filas 5000000 --chunksize 100000 --sin-antes
+
+import argparse
+import os
+import random
+import re
+import time
+import tracemalloc
+
+import pandas as pd
+
+if __package__:
+    from .csv_to_db_supabase import COLUMNAS_CSV, CHUNKSIZE, nuevo_reporte, imprimir_reporte, iter_bloques_limpios
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from csv_to_db_supabase import COLUMNAS_CSV, CHUNKSIZE, nuevo_reporte, imprimir_reporte, iter_bloques_limpios
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CSV_BASE = os.path.join(script_dir, "terrenos_posadas.csv")
+CSV_BENCH = os.path.join(script_dir, "benchmark_limpieza.csv")
+
+
+def generar_csv(destino, filas, semilla=42):
+    """Escribe un CSV de 'filas' filas replicando el CSV base con variaciones."""
+    base = pd.read_csv(CSV_BASE, dtype=str, usecols=COLUMNAS_CSV)
+    rng = random.Random(semilla)
+    monedas = ["USD", "$", "USD", "Missing value", "", "null"]
+    escritas = 0
+    with open(destino, "w", encoding="utf-8", newline="") as f:
+        while escritas < filas:
+            n = min(100_000, filas - escritas)
+            bloque = base.sample(n, replace=True, random_state=rng.randrange(2**31)).reset_index(drop=True)
+            bloque["moneda"] = [rng.choice(monedas) for _ in range(n)]
+            bloque["precio"] = [
+                f"{rng.randrange(5, 900) * 1000:,}".replace(",", ".") if rng.random() > 0.02 else "Consultar"
+                for _ in range(n)
+            ]
+            bloque.to_csv(f, index=False, header=(escritas == 0))
+            escritas += n
+    print(f"🧪 CSV generado: {destino} ({filas:,} filas, {os.path.getsize(destino) / 2**20:.0f} MB)")
+
+
+def limpiar_antes(csv_path):
+    """Versión anterior: todo el CSV en memoria y apply con funciones Python por fila."""
+    df = pd.read_csv(csv_path, dtype=str)
+
+    def is_missing(x):
+        if pd.isna(x):
+            return True
+        s = str(x).strip().lower()
+        return s == "" or s in {"missing value", "missing", "nan", "none", "null"}
+    leidas = len(df)
+    df = df[~df["moneda"].apply(is_missing)].copy()
+    df["moneda"] = df["moneda"].astype(str).str.strip()
+
+    def parse_price(x):
+        if pd.isna(x):
+            return pd.NA
+        digits = re.sub(r"[^\d]", "", str(x).strip())
+        return int(digits) if digits else pd.NA
+    df["precio"] = df["precio"].apply(parse_price).astype("Int64")
+    df = df.reset_index(drop=True)
+    df.insert(0, "id", (df.index + 1).astype(int))
+    return {"filas_leidas": leidas, "filas_descartadas": leidas - len(df),
+            "precios_invalidos": int(df["precio"].isna().sum())}
+
+
+def limpiar_despues(csv_path, chunksize):
+    """Versión actual: bloques + operaciones vectorizadas (los bloques se descartan al procesarse)."""
+    stats = nuevo_reporte()
+    for _ in iter_bloques_limpios(csv_path, stats, chunksize):
+        pass
+    return stats
+
+
+def medir(nombre, funcion, filas):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    stats = funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"\n[{nombre}] {segundos:.1f} s · {filas / segundos:,.0f} filas/s · pico de memoria {pico / 2**20:.0f} MB")
+    imprimir_reporte({**nuevo_reporte(), **stats})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la limpieza del CSV de terrenos")
+    parser.add_argument("--filas", type=int, default=2_000_000)
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--csv", default=CSV_BENCH, help="CSV a usar (se genera si no existe)")
+    parser.add_argument("--regenerar", action="store_true")
+    parser.add_argument("--sin-antes", action="store_true", help="No medir la versión anterior")
+    args = parser.parse_args()
+
+    if args.regenerar or not os.path.exists(args.csv):
+        generar_csv(args.csv, args.filas)
+    filas = sum(1 for _ in open(args.csv, encoding="utf-8")) - 1
+
+    if not args.sin_antes:
+        medir("antes", lambda: limpiar_antes(args.csv), filas)
+    medir(f"después, bloques de {args.chunksize:,}", lambda: limpiar_despues(args.csv, args.chunksize), filas)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+# Benchmark del camino Selenium
+# Sirve páginas de prueba (fixtures_argenprop.py) desde un servidor HTTP local y compara:
+#
+# esperas: recorre el listado con Chrome dos veces
+#   - antes:   esperas fijas de la versión anterior (sleeps en scroll, cookies y 'Siguiente')
+#   - después: esperas por condición de scraping.py (cantidad de tarjetas estable,
+#              selector de cookies único sin espera, cambio de URL / staleness)
+#   y reporta la latencia por página de cada variante.
+#
+# perfil: abre las mismas páginas con el perfil completo y con el liviano (recursos
+#   bloqueados, page load 'eager') y reporta arranque, tiempo de carga, KB transferidos
+#   y memoria del navegador. Con --url se mide contra el sitio real.
+#
+# Uso:
+#   python benchmark_selenium.py --paginas 5 --latencia-ms 50
+#   python benchmark_selenium.py --comparar perfil --url https://www.argenprop.com/terrenos/venta/posadas
+#   python benchmark_selenium.py --no-headless                # ver el navegador
+
+import argparse
+import random
+import statistics
+import time
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+if __package__:
+    from . import scraping
+    from .fixtures_argenprop import build_pages, load_rows, start_fixture_server, PATH_LISTADO
+    from .parser_tarjetas import parse_cards
+else:  # ejecutado como script desde la carpeta del ejercicio
+    import scraping
+    from fixtures_argenprop import build_pages, load_rows, start_fixture_server, PATH_LISTADO
+    from parser_tarjetas import parse_cards
+
+
+# ----------------- Esperas fijas de la versión anterior ("antes") -----------------
+
+def legacy_close_cookies(driver):
+    xpaths = [
+        "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'acept')]",
+        "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'consent')]",
+        "//button[contains(translate(., 'abcdefghijklmnopqrstuvwxyz','ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'ACEPTAR')]"
+    ]
+    for xp in xpaths:
+        try:
+            btn = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.XPATH, xp)))
+            btn.click()
+            time.sleep(0.6)
+            break
+        except Exception:
+            continue
+
+
+def legacy_scroll(driver):
+    driver.execute_script("window.scrollTo(0, 0);")
+    time.sleep(0.5)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.25);")
+    time.sleep(0.8)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.5);")
+    time.sleep(0.8)
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    time.sleep(1.0 + random.random() * 0.6)
+
+
+def legacy_click_next(driver):
+    next_btn = driver.find_element(By.XPATH, "//a[@aria-label='Siguiente' or @rel='next']")
+    driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", next_btn)
+    time.sleep(0.4)
+    next_btn.click()
+    time.sleep(1.0 + random.random() * 1.0)
+    WebDriverWait(driver, scraping.TIMEOUT).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+    # pausa extra que hacía main() después del click
+    time.sleep(1.5)
+    return True
+
+
+# ----------------------------------------------------------------------------------
+
+def recorrer(driver, url, paginas, close_cookies, scroll, click_next):
+    """Recorre 'paginas' páginas midiendo el tiempo de cada una (extracción + avance)."""
+    driver.get(url)
+    tiempos, tarjetas = [], 0
+    for n in range(paginas):
+        inicio = time.perf_counter()
+        WebDriverWait(driver, scraping.TIMEOUT).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        close_cookies(driver)
+        scroll(driver)
+        tarjetas += len(parse_cards(driver.page_source, driver.current_url))
+        if n < paginas - 1 and not click_next(driver):
+            break
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos, tarjetas
+
+
+def resumen(nombre, tiempos, tarjetas):
+    print(f"{nombre:<10}{len(tiempos):>8}{tarjetas:>10}{statistics.mean(tiempos):>12.2f}"
+          f"{statistics.median(tiempos):>12.2f}{max(tiempos):>10.2f}")
+
+
+def medir_perfil(url, paginas, headless, liviano):
+    """Abre 'paginas' páginas con el perfil indicado y devuelve (arranque_seg, [métricas por página])."""
+    inicio = time.perf_counter()
+    driver = scraping.init_driver(headless, liviano=liviano)
+    arranque = time.perf_counter() - inicio
+    metricas = []
+    try:
+        driver.get(url)
+        for n in range(paginas):
+            WebDriverWait(driver, scraping.TIMEOUT).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, scraping.SELECTOR_TARJETAS))
+            )
+            m = scraping.metricas_pagina(driver)
+            if m is not None:
+                metricas.append(m)
+            if n < paginas - 1 and not scraping.click_next_page(driver):
+                break
+    finally:
+        driver.quit()
+    return arranque, metricas
+
+
+def resumen_perfil(nombre, arranque, metricas):
+    media = lambda campo: statistics.mean(m[campo] for m in metricas) if metricas else float("nan")
+    rss = [m["rss_mb"] for m in metricas if m["rss_mb"] is not None]
+    rss_txt = f"{max(rss):>10.0f}" if rss else f"{'-':>10}"
+    print(f"{nombre:<10}{arranque:>10.2f}{media('dcl_ms'):>12.0f}{media('kb'):>10.0f}"
+          f"{media('recursos'):>10.1f}{rss_txt}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del camino Selenium")
+    parser.add_argument("--comparar", choices=["esperas", "perfil", "ambos"], default="ambos")
+    parser.add_argument("--paginas", type=int, default=5)
+    parser.add_argument("--latencia-ms", type=int, default=0, help="Latencia agregada por request")
+    parser.add_argument("--imagen-kb", type=int, default=40, help="Tamaño de cada foto de las tarjetas")
+    parser.add_argument("--url", help="Medir el perfil contra esta URL en lugar de las páginas de prueba")
+    parser.add_argument("--headless", action=argparse.BooleanOptionalAction, default=True,
+                        help="Chrome sin ventana (--no-headless para ver el navegador)")
+    args = parser.parse_args()
+
+    repetir = -(-args.paginas * 20 // 40)
+    pages = build_pages(load_rows(repetir=repetir))
+    server, base = start_fixture_server(pages, args.latencia_ms, args.imagen_kb)
+    url = base + PATH_LISTADO
+    print(f"🧪 Sirviendo {len(pages)} páginas en {url}")
+
+    try:
+        if args.comparar in ("esperas", "ambos"):
+            driver = scraping.init_driver(args.headless)
+            try:
+                antes = recorrer(driver, url, args.paginas, legacy_close_cookies, legacy_scroll, legacy_click_next)
+                despues = recorrer(driver, url, args.paginas, scraping.close_cookies_if_present,
+                                   scraping.scroll_page, scraping.click_next_page)
+            finally:
+                driver.quit()
+
+            print("\n📊 Latencia por página (segundos)")
+            print(f"{'variante':<10}{'páginas':>8}{'tarjetas':>10}{'media':>12}{'mediana':>12}{'máx':>10}")
+            resumen("antes", *antes)
+            resumen("después", *despues)
+
+        if args.comparar in ("perfil", "ambos"):
+            destino = args.url or url
+            completo = medir_perfil(destino, args.paginas, args.headless, liviano=False)
+            liviano = medir_perfil(destino, args.paginas, args.headless, liviano=True)
+
+            print(f"\n📊 Perfil del navegador ({destino})")
+            print(f"{'perfil':<10}{'arranque':>10}{'DOM (ms)':>12}{'KB/pág':>10}{'recursos':>10}{'RSS (MB)':>10}")
+            resumen_perfil("completo", *completo)
+            resumen_perfil("liviano", *liviano)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
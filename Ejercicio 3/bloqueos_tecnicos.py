@@ -1,14 +1,81 @@
 # Comprobar bloqueos técnicos con requests
+# Además de usarse como script, expone detectar_bloqueo(), que scraping.py usa para
+# decidir si una página descargada por HTTP sirve o si hay que pasar a Selenium.
+#
+# Uso:
+#   python bloqueos_tecnicos.py --url "https://www.argenprop.com/terrenos/venta/posadas"
+
+import argparse
+import sys
 
 import requests
 
+URL_DEFAULT = "https://www.argenprop.com/terrenos/venta/posadas"
 headers = {"User-Agent": "Mozilla/5.0 (compatible; MiBot/1.0; +https://miweb.example)"}
-r = requests.get("https://www.argenprop.com/terrenos/venta/posadas", headers=headers, timeout=10, allow_redirects=True)
-
-# Imprimir información de la respuesta
-print("status_code: ", r.status_code)
-print("Encabezados: ",r.headers.get("Server"))
-print("Tiene Cloudflare?: ",r.headers.get("CF-Ray"))   # Si existe, indica Cloudflare
-print(len(r.text))
-# mirar parte del HTML para notar "Attention required" (Cloudflare) o formularios de captcha
-print(r.text[:800])
\ No newline at end of file
+
+# Códigos HTTP típicos de bloqueo / rate limit
+STATUS_BLOQUEO = {403, 429, 503}
+
+# Frases que aparecen en páginas de challenge de Cloudflare o de CAPTCHA
+MARCADORES_BLOQUEO = (
+    "attention required",
+    "just a moment...",
+    "cf-browser-verification",
+    "cf-challenge",
+    "challenge-form",
+    "cf-turnstile",
+    "h-captcha",
+    "are you a robot",
+    "verify you are human",
+)
+
+
+def detectar_bloqueo(status_code, headers_resp, html):
+    """
+    Analiza una respuesta HTTP y devuelve el motivo del bloqueo, o None si la
+    página parece contenido normal.
+
+    Parámetros:
+        status_code (int): Código HTTP de la respuesta.
+        headers_resp (Mapping): Cabeceras de la respuesta.
+        html (str): Cuerpo de la respuesta.
+    """
+    cloudflare = headers_resp.get("CF-Ray") is not None
+    if status_code in STATUS_BLOQUEO:
+        origen = "Cloudflare" if cloudflare else "servidor"
+        return f"HTTP {status_code} ({origen})"
+
+    # Solo se mira el comienzo del HTML: los challenges son páginas cortas
+    inicio = (html or "")[:20000].lower()
+    for marcador in MARCADORES_BLOQUEO:
+        if marcador in inicio:
+            return f"marcador '{marcador}' en el HTML"
+    if "<title>" in inicio and "captcha" in inicio.split("<title>", 1)[1].split("</title>", 1)[0]:
+        return "CAPTCHA en el título de la página"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detectar Cloudflare / CAPTCHA / rate limits")
+    parser.add_argument("--url", default=URL_DEFAULT)
+    args = parser.parse_args()
+
+    r = requests.get(args.url, headers=headers, timeout=10, allow_redirects=True)
+
+    # Imprimir información de la respuesta
+    print("status_code: ", r.status_code)
+    print("Encabezados: ",r.headers.get("Server"))
+    print("Tiene Cloudflare?: ",r.headers.get("CF-Ray"))   # Si existe, indica Cloudflare
+    print(len(r.text))
+    # mirar parte del HTML para notar "Attention required" (Cloudflare) o formularios de captcha
+    print(r.text[:800])
+
+    motivo = detectar_bloqueo(r.status_code, r.headers, r.text)
+    print("Bloqueo detectado: ", motivo or "no")
+
+    # Código de salida distinto de cero si hay bloqueo (útil para encadenar pasos)
+    return 1 if motivo else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
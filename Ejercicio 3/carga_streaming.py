@@ -0,0 +1,197 @@
+# Carga en streaming: de scraping.py directo a la base, página por página
+# En lugar de juntar todo en memoria, escribir terrenos_posadas.csv y volver a leerlo con
+# csv_to_db_supabase.py, cada página extraída se encola y un hilo escritor la limpia
+# (mismas transformaciones vectorizadas) y la carga con COPY + upsert por listing_id,
+# confirmando la transacción por página. Así el crawl y la carga se solapan y, si el
+# proceso se corta, lo ya extraído quedó guardado.
+#
+# Opcionalmente cada página se agrega también a un spool local (append-only) para poder
+# re-cargarla después con csv_to_db_supabase.py:
+#   - *.csv:      un único CSV al que se agregan filas (flush + fsync por página)
+#   - *.parquet:  un directorio con un archivo Parquet por página (requiere pyarrow)
+#
+# Se usa desde scraping.py:
+#   python scraping.py --db
+#   python scraping.py --db --spool spool_terrenos.csv
+#   python scraping.py --spool spool_terrenos.parquet     # solo spool, sin base
+
+import os
+import threading
+from queue import Queue
+
+import pandas as pd
+
+if __package__:
+    from .csv_to_db_supabase import (
+        COLUMNAS_CSV, nuevo_reporte, imprimir_reporte, limpiar_bloque,
+        conectar_destino, create_table_if_not_exists, crear_staging, upsert_bloque, refrescar_normalizados,
+    )
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from csv_to_db_supabase import (
+        COLUMNAS_CSV, nuevo_reporte, imprimir_reporte, limpiar_bloque,
+        conectar_destino, create_table_if_not_exists, crear_staging, upsert_bloque, refrescar_normalizados,
+    )
+
+# Páginas encoladas como máximo: si la base es más lenta que el crawl, el crawl espera
+MAX_PENDIENTES = int(os.getenv("STREAMING_MAX_PENDIENTES", "64"))
+
+_FIN = object()
+
+
+class SpoolPaginas:
+    """Spool append-only de las tarjetas crudas, una escritura por página."""
+
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith(".parquet")
+        self.paginas = 0
+        if self.parquet:
+            os.makedirs(path, exist_ok=True)
+            self.paginas = len([f for f in os.listdir(path) if f.endswith(".parquet")])
+
+    def agregar(self, df):
+        self.paginas += 1
+        if self.parquet:
+            destino = os.path.join(self.path, f"pagina-{self.paginas:06d}.parquet")
+            df.to_parquet(destino + ".tmp", index=False)
+            os.replace(destino + ".tmp", destino)
+            return
+        encabezado = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            df.to_csv(f, index=False, header=encabezado)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class CargaStreaming:
+    """
+    Escritor en segundo plano: recibe las tarjetas de cada página con emitir(cards)
+    y las limpia, las agrega al spool y las carga en la base en su propio hilo.
+
+    Uso:
+        with CargaStreaming(spool="spool.csv") as carga:
+            crawl(..., emitir=carga.emitir)
+    """
+
+    def __init__(self, table_name="terrenos_posadas", cargar_db=True, spool=None,
+                 max_pendientes=MAX_PENDIENTES):
+        self.table_name = table_name
+        self.cargar_db = cargar_db
+        self.spool = SpoolPaginas(spool) if spool else None
+        self.cola = Queue(maxsize=max_pendientes)
+        self.stats = nuevo_reporte()
+        self.stats.update({"paginas": 0, "paginas_con_error": 0})
+        self.engine = None
+        self.raw = None
+        self.hilo = None
+
+    def iniciar(self):
+        if self.cargar_db:
+            self.engine = conectar_destino()
+            create_table_if_not_exists(self.engine, self.table_name)
+        self.hilo = threading.Thread(target=self._escritor, name="carga-streaming", daemon=True)
+        self.hilo.start()
+        return self
+
+    def emitir(self, cards, al_confirmar=None):
+        """
+        Encola las tarjetas de una página (bloquea si hay MAX_PENDIENTES páginas sin cargar).
+        Si se pasa al_confirmar, el escritor lo llama con True cuando la página quedó
+        guardada (commit en la base o escrita en el spool) y con False si falló.
+        """
+        if cards:
+            self.cola.put((list(cards), al_confirmar))
+        elif al_confirmar is not None:
+            al_confirmar(True)
+
+    def cerrar(self, exito=True):
+        """
+        Espera a que se carguen las páginas pendientes e imprime el reporte.
+        Los precios normalizados se refrescan solo si el crawl terminó bien (exito) y
+        todas las páginas se cargaron; si no, quedan para la próxima corrida.
+        """
+        if self.hilo is not None:
+            self.cola.put(_FIN)
+            self.hilo.join()
+            self.hilo = None
+        if self.engine is not None:
+            try:
+                if exito and not self.stats["paginas_con_error"]:
+                    # Al final del crawl, precios normalizados a USD / ARS (refresco incremental)
+                    refrescar_normalizados(self.engine, self.table_name)
+                else:
+                    print("[Advertencia] Carga incompleta: no se refrescan los precios normalizados.")
+            finally:
+                self.engine.dispose()
+                self.engine = None
+        print(f"[Streaming] Páginas procesadas: {self.stats['paginas']} "
+              f"(con error: {self.stats['paginas_con_error']})")
+        if self.spool is not None:
+            print(f"[Streaming] Spool: {self.spool.path}")
+        if self.cargar_db:
+            imprimir_reporte(self.stats)
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cerrar(exito=exc_type is None)
+
+    def _conexion(self):
+        """Conexión del hilo escritor (se reabre si una página anterior la dejó inutilizable)."""
+        if self.raw is None:
+            self.raw = self.engine.raw_connection()
+        return self.raw
+
+    def _descartar_conexion(self):
+        try:
+            self.raw.rollback()
+        except Exception:
+            try:
+                self.raw.close()
+            except Exception:
+                pass
+            self.raw = None
+
+    def _escritor(self):
+        try:
+            while True:
+                item = self.cola.get()
+                if item is _FIN:
+                    break
+                cards, al_confirmar = item
+                try:
+                    self._procesar(cards)
+                except Exception as e:
+                    # La página queda en el spool (si hay) para re-cargarla; se sigue con la próxima.
+                    # Quien la emitió se entera (no la registra como vista en el índice incremental)
+                    self.stats["paginas_con_error"] += 1
+                    print(f"[Advertencia] Error cargando una página ({len(cards)} avisos): {e}")
+                    if self.raw is not None:
+                        self._descartar_conexion()
+                    if al_confirmar is not None:
+                        al_confirmar(False)
+                else:
+                    if al_confirmar is not None:
+                        al_confirmar(True)
+        finally:
+            if self.raw is not None:
+                self.raw.close()
+                self.raw = None
+
+    def _procesar(self, cards):
+        crudo = pd.DataFrame(cards, columns=COLUMNAS_CSV)
+        self.stats["paginas"] += 1
+        if self.spool is not None:
+            self.spool.agregar(crudo)
+        if not self.cargar_db:
+            return
+        bloque = limpiar_bloque(crudo.astype("string"), self.stats)
+        # Una transacción por página: lo cargado queda confirmado aunque el crawl se corte
+        raw = self._conexion()
+        cur = raw.cursor()
+        crear_staging(cur, self.table_name)
+        resultado = upsert_bloque(cur, self.table_name, bloque)
+        raw.commit()
+        for clave, valor in resultado.items():
+            self.stats[clave] += valor
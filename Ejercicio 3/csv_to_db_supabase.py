@@ -1,172 +1,324 @@
 # Lee el CSV de terrenos en Posadas, Misiones. Luego limpia/transforma las columnas y carga los datos
 # a una tabla Postgres en Supabase usando SQLAlchemy (con SSL requerido).
+# El CSV se lee por bloques (CSV_CHUNKSIZE filas) y cada bloque se limpia con operaciones
+# vectorizadas y se inserta, así la memoria no depende del tamaño del archivo.
+# La clave de cada fila es el id del aviso (el número al final de detalle_url): cada bloque
+# se copia con COPY a una tabla temporal y se fusiona con INSERT ... ON CONFLICT (listing_id)
+# DO UPDATE solo si cambió algo, así las cargas repetidas son idempotentes.
+# También acepta el spool de scraping.py --spool (CSV o directorio .parquet) para re-cargarlo.
+# Al terminar refresca la tabla terrenos_normalizados (precios en USD y ARS, ver
+# normalizacion_moneda.py), salvo que se pase --sin-normalizar.
+#
+# Uso:
+#   python csv_to_db_supabase.py                        # terrenos_posadas.csv junto al script
+#   python csv_to_db_supabase.py spool_terrenos.csv --tabla terrenos_posadas
 
 # Importar las librerías necesarias
+# SQLAlchemy y psycopg2 se importan dentro de las funciones de base: la limpieza
+# (benchmark_limpieza.py, spool sin base) no paga su tiempo de carga.
+from __future__ import annotations
+
+import argparse
+import glob
+import io
 import os
-import re
 import sys
-from typing import Dict
+from typing import Dict, TYPE_CHECKING
 from dotenv import load_dotenv
 
 import pandas as pd
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, text
-from sqlalchemy.engine import Engine
-from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Engine
+
+if __package__:
+    from .parser_tarjetas import LISTING_ID_RE
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from parser_tarjetas import LISTING_ID_RE
+
+if not __package__:  # ejecutado como script: la raíz del repositorio no está en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun import instrumentacion
 
 
-# CONFIG: Ruta CSV por defecto
-CSV_DEFAULT = r"C:/Users/Dario/Desktop/Prueba técnica Sudata/Ejercicio 3/terrenos_posadas.csv"
+# CONFIG: Ruta CSV por defecto (el CSV que genera scraping.py, en este mismo directorio)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CSV_DEFAULT = os.path.join(script_dir, "terrenos_posadas.csv")
+# Filas por bloque al leer el CSV
+CHUNKSIZE = int(os.getenv("CSV_CHUNKSIZE", "50000"))
 
-# Cargar .env y configurar conexiones
-load_dotenv()
+COLUMNAS_CSV = ["precio", "moneda", "ubicacion", "titulo", "detalle_url"]
+COLUMNAS_TABLA = ["listing_id", "precio", "moneda", "ubicacion", "titulo", "detalle_url"]
+PLACEHOLDERS_MONEDA = ["", "missing value", "missing", "nan", "none", "null"]
 
-DESTINO = {
-    'user': os.getenv('SUPABASE_DB_USER'),
-    'password': os.getenv('SUPABASE_DB_PASSWORD'),
-    'host': os.getenv('SUPABASE_DB_HOST'),
-    'port': os.getenv('SUPABASE_DB_PORT', '5432'),
-    'database': os.getenv('SUPABASE_DB_NAME')
-}
+def config_destino() -> Dict:
+    """Carga el .env y arma la configuración de la conexión destino (al conectar, no al importar)."""
+    load_dotenv()
+    return {
+        'user': os.getenv('SUPABASE_DB_USER'),
+        'password': os.getenv('SUPABASE_DB_PASSWORD'),
+        'host': os.getenv('SUPABASE_DB_HOST'),
+        'port': os.getenv('SUPABASE_DB_PORT', '5432'),
+        'database': os.getenv('SUPABASE_DB_NAME')
+    }
 
-# Validación mínima de variables
-if not all([DESTINO.get(k) for k in ('user','password','host','port','database')]):
-    print("❌ Faltan variables SUPABASE_* en el .env. Revisá SUPABASE_DB_USER, _PASSWORD, _HOST, _PORT, _NAME")
-    sys.exit(1)
+def validar_destino(cfg: Dict):
+    """Validación mínima de variables (se hace al cargar, no al importar el módulo)."""
+    if not all([cfg.get(k) for k in ('user','password','host','port','database')]):
+        raise RuntimeError("Faltan variables SUPABASE_* en el .env. "
+                           "Revisá SUPABASE_DB_USER, _PASSWORD, _HOST, _PORT, _NAME")
 
 def make_engine(cfg: Dict) -> Engine:
     """
     Construye un engine SQLAlchemy para Postgres (psycopg2).
     Incluye sslmode='require' en connect_args (importante para Supabase).
     """
+    from sqlalchemy import create_engine
+
     uri = f"postgresql+psycopg2://{cfg['user']}:{cfg['password']}@{cfg['host']}:{cfg['port']}/{cfg['database']}"
     engine = create_engine(uri, echo=False, pool_pre_ping=True, connect_args={"sslmode": "require"})
-    return engine
+    return instrumentacion.instrumentar_engine(engine)
+
 
+# Funciones de transformación (vectorizadas: se aplican bloque por bloque)
 
-# Funciones de transformación
+def nuevo_reporte() -> Dict:
+    """Contadores de la limpieza, acumulados entre bloques."""
+    return {"bloques": 0, "filas_leidas": 0, "filas_descartadas": 0, "precios_invalidos": 0,
+            "sin_listing_id": 0, "duplicados": 0, "insertadas": 0, "actualizadas": 0, "sin_cambios": 0}
 
-def clean_moneda(df: pd.DataFrame) -> pd.DataFrame:
+def imprimir_reporte(stats: Dict):
+    print(f"Filas antes del filtro moneda: {stats['filas_leidas']} -> después: "
+          f"{stats['filas_leidas'] - stats['filas_descartadas']} (se eliminaron {stats['filas_descartadas']})")
+    print(f"Precios no convertibles a int: {stats['precios_invalidos']} filas (serán NULL en DB)")
+    print(f"Filas sin id de aviso en detalle_url (descartadas): {stats['sin_listing_id']}; "
+          f"avisos repetidos en el bloque: {stats['duplicados']}")
+    if stats["insertadas"] or stats["actualizadas"] or stats["sin_cambios"]:
+        print(f"Carga: {stats['insertadas']} insertadas, {stats['actualizadas']} actualizadas, "
+              f"{stats['sin_cambios']} sin cambios")
+
+def clean_moneda(df: pd.DataFrame, stats: Dict = None) -> pd.DataFrame:
     """Elimina filas donde 'moneda' sea nula o placeholder (Missing value, etc.)."""
-    def is_missing(x):
-        if pd.isna(x):
-            return True
-        s = str(x).strip().lower()
-        return s == "" or s in {"missing value", "missing", "nan", "none", "null"}
-    mask_valid = ~df["moneda"].apply(is_missing)
-    before = len(df)
+    moneda = df["moneda"].str.strip()
+    mask_valid = moneda.notna() & ~moneda.str.lower().isin(PLACEHOLDERS_MONEDA)
     df = df[mask_valid].copy()
-    after = len(df)
-    print(f"Filas antes del filtro moneda: {before} -> después: {after} (se eliminaron {before-after})")
-    df["moneda"] = df["moneda"].astype(str).str.strip()
+    df["moneda"] = moneda[mask_valid]
+    descartadas = int((~mask_valid).sum())
+    if stats is None:
+        print(f"Filas antes del filtro moneda: {len(mask_valid)} -> después: {len(df)} (se eliminaron {descartadas})")
+    else:
+        stats["filas_leidas"] += len(mask_valid)
+        stats["filas_descartadas"] += descartadas
     return df
 
-def clean_precio(df: pd.DataFrame) -> pd.DataFrame:
+def clean_precio(df: pd.DataFrame, stats: Dict = None) -> pd.DataFrame:
     """
     Quita caracteres no numéricos y convierte a int (nullable).
     Ej: "140.000" -> 140000
     """
-    def parse_price(x):
-        if pd.isna(x):
-            return pd.NA
-        s = str(x).strip()
-        digits = re.sub(r"[^\d]", "", s)
-        if digits == "":
-            return pd.NA
-        try:
-            return int(digits)
-        except:
-            return pd.NA
-    df["precio"] = df["precio"].apply(parse_price)
-    df["precio"] = df["precio"].astype("Int64")  # entero nullable
-    n_null = df["precio"].isna().sum()
-    print(f"Precios no convertibles a int: {n_null} filas (serán NULL en DB)")
+    digitos = df["precio"].str.replace(r"\D", "", regex=True).replace("", pd.NA)
+    df["precio"] = pd.to_numeric(digitos, errors="coerce").astype("Int64")  # entero nullable
+    n_null = int(df["precio"].isna().sum())
+    if stats is None:
+        print(f"Precios no convertibles a int: {n_null} filas (serán NULL en DB)")
+    else:
+        stats["precios_invalidos"] += n_null
     return df
 
-def add_sequential_id(df: pd.DataFrame) -> pd.DataFrame:
-    """Agrega columna id incremental empezando en 1 (después de filtrar)."""
-    df = df.reset_index(drop=True)
-    df.insert(0, "id", (df.index + 1).astype(int))
-    return df
+def add_listing_id(df: pd.DataFrame, stats: Dict = None) -> pd.DataFrame:
+    """
+    Agrega la columna listing_id (id del aviso, tomado de detalle_url). Descarta las
+    filas sin id y, si un aviso aparece más de una vez, se queda con la última aparición.
+    """
+    df = df.copy()
+    df["listing_id"] = pd.to_numeric(
+        df["detalle_url"].str.extract(LISTING_ID_RE, expand=False), errors="coerce"
+    ).astype("Int64")
+    sin_id = df["listing_id"].isna()
+    df = df[~sin_id]
+    repetidos = df["listing_id"].duplicated(keep="last")
+    df = df[~repetidos]
+    if stats is None:
+        print(f"Filas sin id de aviso: {int(sin_id.sum())}; avisos repetidos: {int(repetidos.sum())}")
+    else:
+        stats["sin_listing_id"] += int(sin_id.sum())
+        stats["duplicados"] += int(repetidos.sum())
+    return df.reset_index(drop=True)
+
+@instrumentacion.instrumentar("limpiar bloque", "pandas")
+def limpiar_bloque(df: pd.DataFrame, stats: Dict) -> pd.DataFrame:
+    """Aplica todas las transformaciones a un bloque de tarjetas crudas."""
+    stats["bloques"] += 1
+    df = clean_moneda(df, stats)
+    df = clean_precio(df, stats)
+    return add_listing_id(df, stats)
+
+def leer_bloques(path: str, chunksize: int = CHUNKSIZE):
+    """
+    Lee el archivo de entrada por bloques de texto crudo: un CSV, o un spool Parquet
+    (directorio con un archivo por página, ver carga_streaming.py).
+    """
+    if path.endswith(".parquet") and os.path.isdir(path):
+        for archivo in sorted(glob.glob(os.path.join(path, "*.parquet"))):
+            yield pd.read_parquet(archivo, columns=COLUMNAS_CSV).astype("string")
+    else:
+        yield from pd.read_csv(path, dtype=str, usecols=COLUMNAS_CSV, chunksize=chunksize)
+
+def iter_bloques_limpios(csv_path: str, stats: Dict, chunksize: int = CHUNKSIZE):
+    """
+    Lee el CSV por bloques y devuelve cada bloque ya limpio y con su listing_id.
+    Los contadores se acumulan en 'stats'.
+    """
+    for bloque in leer_bloques(csv_path, chunksize):
+        yield limpiar_bloque(bloque, stats)
 
 
-# DB: crear tabla e insertar con upsert (ON CONFLICT DO NOTHING)
+# DB: crear tabla y cargar con COPY + upsert por listing_id
 
 def create_table_if_not_exists(engine: Engine, table_name: str = "terrenos_posadas"):
-    """Crea la tabla con el esquema pedido si no existe."""
+    """
+    Crea la tabla con el esquema pedido si no existe (id autoincremental y listing_id único)
+    y migra tablas creadas por versiones anteriores del script.
+    """
+    from sqlalchemy import MetaData, Table, Column, Index, Integer, BigInteger, String, DateTime, func
+
     metadata = MetaData()
     table = Table(
         table_name, metadata,
-        Column("id", Integer, primary_key=True),
+        Column("id", Integer, primary_key=True, autoincrement=True),
+        Column("listing_id", BigInteger, nullable=True),
         Column("precio", Integer, nullable=True),
         Column("moneda", String(10), nullable=True),
         Column("ubicacion", String(200), nullable=True),
         Column("titulo", String(200), nullable=True),
         Column("detalle_url", String(300), nullable=True),
+        # Cuándo se vio el aviso con estos datos (se actualiza solo si cambió algo)
+        Column("fecha_scrape", DateTime(timezone=True), nullable=False, server_default=func.now()),
+        # Transacción que escribió la fila por última vez: marca de cambios para normalizacion_moneda.py
+        Column("txid_cambio", BigInteger, nullable=False, server_default=func.txid_current()),
+        Index(f"ux_{table_name}_listing_id", "listing_id", unique=True),
+        Index(f"ix_{table_name}_fecha_scrape", "fecha_scrape"),
+        Index(f"ix_{table_name}_txid_cambio", "txid_cambio"),
     )
     metadata.create_all(engine, checkfirst=True)
+    migrar_listing_id(engine, table_name)
     print(f"Tabla '{table_name}' creada.")
     return table, metadata
 
-def insert_dataframe(engine: Engine, table: Table, df: pd.DataFrame):
-    """
-    Inserta rows del DataFrame usando INSERT ... ON CONFLICT DO NOTHING para evitar
-    errores si el id ya existe.
-    """
-    # preparar lista de diccionarios
-    records = []
-    for _, r in df.iterrows():
-        records.append({
-            "id": int(r["id"]),
-            "precio": None if pd.isna(r["precio"]) else int(r["precio"]),
-            "moneda": None if pd.isna(r["moneda"]) else str(r["moneda"]),
-            "ubicacion": None if pd.isna(r["ubicacion"]) else str(r["ubicacion"]),
-            "titulo": None if pd.isna(r["titulo"]) else str(r["titulo"]),
-            "detalle_url": None if pd.isna(r["detalle_url"]) else str(r["detalle_url"])
-        })
-
-    if not records:
-        print("No hay registros para insertar.")
-        return
-
-    conn = engine.connect()
-    trans = conn.begin()
-    try:
-        # pg_insert permite on_conflict_do_nothing
-        stmt = pg_insert(table).values(records)
-        stmt = stmt.on_conflict_do_nothing(index_elements=["id"])
-        result = conn.execute(stmt)
-        trans.commit()
-        print(f"Insertadas {len(records)} filas.")
-    except SQLAlchemyError as e:
-        trans.rollback()
-        print("❌ Error insertando registros:", e)
-        raise
-    finally:
-        conn.close()
+def migrar_listing_id(engine: Engine, table_name: str):
+    """
+    Para tablas creadas antes de usar listing_id: agrega la columna, la completa desde
+    detalle_url, elimina avisos repetidos (queda el de id más alto), crea el índice único
+    y ajusta la secuencia de id (antes los ids se insertaban a mano). También agrega
+    fecha_scrape y txid_cambio (las filas existentes quedan con la fecha y la transacción
+    de la migración).
+    """
+    from sqlalchemy import text
 
+    regex = LISTING_ID_RE.pattern
+    with engine.begin() as conn:
+        conn.execute(text(f'ALTER TABLE "{table_name}" ADD COLUMN IF NOT EXISTS listing_id BIGINT'))
+        conn.execute(text(
+            f'ALTER TABLE "{table_name}" ADD COLUMN IF NOT EXISTS fecha_scrape TIMESTAMPTZ NOT NULL DEFAULT now()'
+        ))
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_fecha_scrape" ON "{table_name}" (fecha_scrape)'
+        ))
+        conn.execute(text(
+            f'ALTER TABLE "{table_name}" ADD COLUMN IF NOT EXISTS txid_cambio BIGINT NOT NULL DEFAULT txid_current()'
+        ))
+        conn.execute(text(
+            f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_txid_cambio" ON "{table_name}" (txid_cambio)'
+        ))
+        conn.execute(text(f"""
+            UPDATE "{table_name}"
+            SET listing_id = substring(detalle_url from :regex)::bigint
+            WHERE listing_id IS NULL AND detalle_url ~ :regex
+        """), {"regex": regex})
+        borrados = conn.execute(text(f"""
+            DELETE FROM "{table_name}" a USING "{table_name}" b
+            WHERE a.listing_id = b.listing_id AND a.id < b.id
+        """)).rowcount
+        if borrados:
+            print(f"Migración: {borrados} filas repetidas por listing_id eliminadas.")
+        conn.execute(text(
+            f'CREATE UNIQUE INDEX IF NOT EXISTS "ux_{table_name}_listing_id" ON "{table_name}" (listing_id)'
+        ))
+        conn.execute(text(f"""
+            SELECT setval(pg_get_serial_sequence(:tabla, 'id'),
+                          GREATEST(MAX(id), 1), MAX(id) IS NOT NULL)
+            FROM "{table_name}"
+        """), {"tabla": f'"{table_name}"'})
 
-# MAIN
+def crear_staging(cur, table_name: str):
+    """Tabla temporal con las columnas de carga; se borra al confirmar la transacción."""
+    from psycopg2 import sql
 
-def main(csv_path: str = None, table_name: str = "terrenos_posadas"):
-    # Usar csv_path proporcionado o la ruta por defecto
-    csv_path = csv_path or CSV_DEFAULT
-    print("Leyendo CSV:", csv_path)
-    df = pd.read_csv(csv_path, dtype=str)
+    cur.execute(sql.SQL("""
+        CREATE TEMP TABLE staging_terrenos ON COMMIT DROP AS
+        SELECT {cols} FROM {tabla} WITH NO DATA
+    """).format(
+        cols=sql.SQL(", ").join(map(sql.Identifier, COLUMNAS_TABLA)),
+        tabla=sql.Identifier(table_name),
+    ))
 
-    # Transformaciones
-    df = clean_moneda(df)
-    df = clean_precio(df)
-    df = add_sequential_id(df)
+def upsert_bloque(cur, table_name: str, df: pd.DataFrame) -> Dict:
+    """
+    Copia el bloque a la tabla temporal con COPY y lo fusiona en la tabla destino:
+    inserta los avisos nuevos y actualiza los existentes solo si cambió algún campo.
 
-    # Seleccionar columnas finales en orden
-    final_cols = ["id", "precio", "moneda", "ubicacion", "titulo", "detalle_url"]
-    df_final = df[final_cols].copy()
+    Retorna:
+        dict con insertadas, actualizadas y sin_cambios.
+    """
+    from psycopg2 import sql
 
-    # Conectar a la DB destino (Supabase)
+    if df.empty:
+        return {"insertadas": 0, "actualizadas": 0, "sin_cambios": 0}
+
+    buffer = io.StringIO()
+    df[COLUMNAS_TABLA].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cur.execute("TRUNCATE staging_terrenos")
+    with instrumentacion.span("COPY staging_terrenos", "sql", filas=len(df)):
+        cur.copy_expert("COPY staging_terrenos FROM STDIN WITH (FORMAT csv)", buffer)
+
+    cols = sql.SQL(", ").join(map(sql.Identifier, COLUMNAS_TABLA))
+    datos = [c for c in COLUMNAS_TABLA if c != "listing_id"]
+    with instrumentacion.span(f"UPSERT {table_name}", "sql", filas=len(df)):
+        cur.execute(sql.SQL("""
+            INSERT INTO {tabla} AS t ({cols})
+            SELECT {cols} FROM staging_terrenos
+            ON CONFLICT (listing_id) DO UPDATE SET {asignaciones}, fecha_scrape = now(),
+                txid_cambio = txid_current()
+            WHERE ({actuales}) IS DISTINCT FROM ({nuevos})
+            RETURNING (xmax = 0) AS insertada
+        """).format(
+            tabla=sql.Identifier(table_name),
+            cols=cols,
+            asignaciones=sql.SQL(", ").join(
+                sql.SQL("{c} = EXCLUDED.{c}").format(c=sql.Identifier(c)) for c in datos
+            ),
+            actuales=sql.SQL(", ").join(sql.SQL("t.{}").format(sql.Identifier(c)) for c in datos),
+            nuevos=sql.SQL(", ").join(sql.SQL("EXCLUDED.{}").format(sql.Identifier(c)) for c in datos),
+        ))
+    filas = cur.fetchall()
+    insertadas = sum(1 for (insertada,) in filas if insertada)
+    return {
+        "insertadas": insertadas,
+        "actualizadas": len(filas) - insertadas,
+        "sin_cambios": len(df) - len(filas),
+    }
+
+
+def conectar_destino() -> Engine:
+    """Valida las variables SUPABASE_*, crea el engine y verifica la conexión."""
+    from sqlalchemy import text
+
+    destino = config_destino()
+    validar_destino(destino)
     print("Conectando a Supabase/Postgres (DESTINO)...")
     try:
-        engine_dest = make_engine(DESTINO)
+        engine_dest = make_engine(destino)
         # chequeo simple
         with engine_dest.connect() as c:
             c.execute(text("SELECT 1")).fetchone()
@@ -174,14 +326,82 @@ def main(csv_path: str = None, table_name: str = "terrenos_posadas"):
     except Exception as e:
         print("❌ Error conectando al destino:", e)
         raise
+    return engine_dest
+
+
+# MAIN
+
+def refrescar_normalizados(engine_dest: Engine, table_name: str):
+    """Refresco incremental de terrenos_normalizados; si falla (p. ej. no hay cotizaciones) solo avisa."""
+    if __package__:
+        from .normalizacion_moneda import refrescar, engine_cotizaciones
+    else:  # ejecutado como script desde la carpeta del ejercicio
+        from normalizacion_moneda import refrescar, engine_cotizaciones
+    engine_cot = engine_cotizaciones(engine_dest)
+    try:
+        refrescar(engine_dest, engine_cot, tabla_terrenos=table_name)
+    except Exception as e:
+        print("⚠️ No se pudo normalizar precios (¿existe la tabla cotizaciones?):", e)
+    finally:
+        if engine_cot is not engine_dest:
+            engine_cot.dispose()
+
 
-    # Crear tabla si no existe e insertar
+def main(csv_path: str = None, table_name: str = "terrenos_posadas", chunksize: int = CHUNKSIZE,
+         normalizar: bool = True):
+    instrumentacion.iniciar("csv_to_db_supabase")
+    # Usar csv_path proporcionado o la ruta por defecto
+    csv_path = csv_path or CSV_DEFAULT
+
+    # Conectar a la DB destino (Supabase)
+    engine_dest = conectar_destino()
+
+    # Crear tabla si no existe
     table_obj, metadata = create_table_if_not_exists(engine_dest, table_name)
-    insert_dataframe(engine_dest, table_obj, df_final)
+
+    # Leer, transformar y cargar bloque por bloque (toda la carga en una transacción)
+    print("Leyendo CSV:", csv_path)
+    stats = nuevo_reporte()
+    raw = engine_dest.raw_connection()
+    try:
+        cur = raw.cursor()
+        crear_staging(cur, table_name)
+        for bloque in iter_bloques_limpios(csv_path, stats, chunksize):
+            for clave, valor in upsert_bloque(cur, table_name, bloque).items():
+                stats[clave] += valor
+        raw.commit()
+    except Exception as e:
+        raw.rollback()
+        print("❌ Error cargando registros:", e)
+        raise
+    finally:
+        raw.close()
+    imprimir_reporte(stats)
+
+    # Precios normalizados a USD / ARS con la cotización BCRA
+    if normalizar:
+        refrescar_normalizados(engine_dest, table_name)
 
     # Cerrar engine
     engine_dest.dispose()
     print("Proceso finalizado.")
 
+def cli(argv=None):
+    """Punto de entrada de línea de comandos (también como console script)."""
+    parser = argparse.ArgumentParser(description="Limpia el CSV de terrenos y lo carga en Supabase/Postgres")
+    parser.add_argument("csv", nargs="?", default=CSV_DEFAULT,
+                        help="CSV de scraping.py o spool (CSV / directorio .parquet)")
+    parser.add_argument("--tabla", default="terrenos_posadas")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE)
+    parser.add_argument("--sin-normalizar", action="store_true",
+                        help="No refrescar terrenos_normalizados al terminar")
+    args = parser.parse_args(argv)
+    try:
+        main(args.csv, args.tabla, args.chunksize, not args.sin_normalizar)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
@@ -0,0 +1,227 @@
+# Enriquecimiento de avisos con datos de su página de detalle
+# Lee el CSV generado por scraping.py y, para cada detalle_url, descarga la página de
+# detalle en paralelo (respetando robots.txt y la tasa por host de politica_crawl.py)
+# para agregar superficie (m²), coordenadas y fecha de publicación.
+#
+# - Caché HTTP en disco con requests condicionales (ETag / Last-Modified): si la página
+#   no cambió, el servidor responde 304 y se reutiliza el HTML guardado.
+# - Reanudable: cada aviso procesado se guarda en el índice local (SQLite) junto con el
+#   hash de su tarjeta; los avisos cuya tarjeta no cambió no se vuelven a descargar.
+#
+# Uso:
+#   python enriquecimiento.py
+#   python enriquecimiento.py --csv terrenos_posadas.csv --salida terrenos_posadas_detalle.csv --workers 4
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+import requests
+
+if __package__:
+    from .indice_listados import INDICE_DEFAULT, hash_card
+    from .parser_tarjetas import listing_id, parse_detail
+    from .politica_crawl import PoliticaCrawl
+    from .scraping import init_session, TIMEOUT, CSV_OUTPUT
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from indice_listados import INDICE_DEFAULT, hash_card
+    from parser_tarjetas import listing_id, parse_detail
+    from politica_crawl import PoliticaCrawl
+    from scraping import init_session, TIMEOUT, CSV_OUTPUT
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("SCRAPING_CACHE_DETALLE", os.path.join(script_dir, "cache_detalle"))
+CSV_DETALLE = os.path.join(script_dir, "terrenos_posadas_detalle.csv")
+WORKERS = int(os.getenv("ENRIQUECIMIENTO_WORKERS", "4"))
+
+CAMPOS_DETALLE = ["superficie_m2", "latitud", "longitud", "fecha_publicacion"]
+
+
+class CacheHTTP:
+    """
+    Caché HTTP en disco: por cada URL guarda el cuerpo y los validadores
+    (ETag / Last-Modified) para hacer requests condicionales.
+    """
+
+    def __init__(self, directorio=CACHE_DIR):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+        self.stats = {"200": 0, "304": 0, "error": 0}
+        self.lock = threading.Lock()
+
+    def _rutas(self, url):
+        clave = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.directorio, clave)
+        return base + ".json", base + ".html"
+
+    def _contar(self, clave):
+        with self.lock:
+            self.stats[clave] += 1
+
+    def get(self, session, url):
+        """
+        Devuelve el HTML de la URL, usando la copia en caché si el servidor responde 304.
+        Lanza requests.HTTPError si no se obtiene un 200 (o un 304 con copia en caché).
+        """
+        meta_path, body_path = self._rutas(url)
+        headers = {}
+        meta = None
+        if os.path.exists(meta_path) and os.path.exists(body_path):
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        resp = session.get(url, headers=headers, timeout=TIMEOUT)
+        if resp.status_code == 304:
+            if meta is not None:
+                self._contar("304")
+                with open(body_path, encoding="utf-8") as f:
+                    return f.read()
+            # 304 sin copia en caché (no se mandaron validadores): se pide de nuevo sin usar cachés
+            resp = session.get(url, headers={"Cache-Control": "no-cache"}, timeout=TIMEOUT)
+        if resp.status_code != 200:
+            # raise_for_status() no lanza con 3xx: cualquier respuesta sin cuerpo utilizable es error
+            self._contar("error")
+            raise requests.HTTPError(f"HTTP {resp.status_code} para {url}", response=resp)
+
+        self._contar("200")
+        with open(body_path, "w", encoding="utf-8") as f:
+            f.write(resp.text)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "url": url,
+                "etag": resp.headers.get("ETag"),
+                "last_modified": resp.headers.get("Last-Modified"),
+                "descargado_en": datetime.now().isoformat(timespec="seconds"),
+            }, f)
+        return resp.text
+
+
+class DetallesDB:
+    """Tabla 'detalles' en el índice local: datos enriquecidos por aviso + hash de la tarjeta."""
+
+    def __init__(self, path=INDICE_DEFAULT):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS detalles (
+                listing_id         TEXT PRIMARY KEY,
+                hash_tarjeta       TEXT NOT NULL,
+                superficie_m2      REAL,
+                latitud            REAL,
+                longitud           REAL,
+                fecha_publicacion  TEXT,
+                actualizado_en     TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def cargar(self):
+        """Devuelve {listing_id: (hash_tarjeta, dict de campos)} de todos los avisos enriquecidos."""
+        cur = self.conn.execute(
+            f"SELECT listing_id, hash_tarjeta, {', '.join(CAMPOS_DETALLE)} FROM detalles"
+        )
+        return {fila[0]: (fila[1], dict(zip(CAMPOS_DETALLE, fila[2:]))) for fila in cur.fetchall()}
+
+    def guardar(self, lid, hash_tarjeta, datos):
+        # Se confirma aviso por aviso: si el proceso se corta, lo hecho queda guardado
+        self.conn.execute(f"""
+            INSERT OR REPLACE INTO detalles (listing_id, hash_tarjeta, {', '.join(CAMPOS_DETALLE)}, actualizado_en)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, (lid, hash_tarjeta, *[datos.get(c) for c in CAMPOS_DETALLE],
+              datetime.now().isoformat(timespec="seconds")))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def enriquecer(df, workers=WORKERS, cache=None, db=None):
+    """
+    Agrega al DataFrame las columnas de detalle. Solo descarga los avisos que no
+    fueron enriquecidos antes o cuya tarjeta cambió (hash distinto).
+    """
+    cache = cache or CacheHTTP()
+    db = db or DetallesDB()
+    guardados = db.cargar()
+
+    registros = df.to_dict("records")
+    pendientes = []
+    for r in registros:
+        lid = listing_id(r.get("detalle_url"))
+        if lid is None:
+            continue
+        h = hash_card({k: (None if pd.isna(v) else str(v)) for k, v in r.items()})
+        if lid not in guardados or guardados[lid][0] != h:
+            pendientes.append((lid, h, r["detalle_url"]))
+    print(f"[Info] Avisos a enriquecer: {len(pendientes)} (ya enriquecidos sin cambios: "
+          f"{len(registros) - len(pendientes)})")
+
+    local = threading.local()
+    politica = PoliticaCrawl()
+
+    def procesar(lid, h, url):
+        if not hasattr(local, "session"):
+            local.session = init_session(workers)
+        if not politica.permitido(url):
+            raise PermissionError(f"{url} no permitido por robots.txt")
+        politica.esperar(url)
+        html = cache.get(local.session, url)
+        return lid, h, parse_detail(html)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(procesar, *p) for p in pendientes]
+        for future in as_completed(futures):
+            try:
+                lid, h, datos = future.result()
+            except Exception as e:
+                print(f"[Advertencia] Error enriqueciendo un aviso: {e}")
+                continue
+            # SQLite se usa solo desde este hilo
+            db.guardar(lid, h, datos)
+            guardados[lid] = (h, datos)
+
+    print(f"[Info] Respuestas: {cache.stats['200']} descargadas, {cache.stats['304']} sin cambios (304), "
+          f"{cache.stats['error']} con error")
+
+    detalles = pd.DataFrame(
+        [{"listing_id": lid, **campos} for lid, (_, campos) in guardados.items()],
+        columns=["listing_id"] + CAMPOS_DETALLE
+    )
+    df = df.copy()
+    df["listing_id"] = df["detalle_url"].map(listing_id)
+    return df.merge(detalles, on="listing_id", how="left").drop(columns="listing_id")
+
+
+def main(csv_path=CSV_OUTPUT, salida=CSV_DETALLE, workers=WORKERS):
+    print("Leyendo CSV:", csv_path)
+    df = pd.read_csv(csv_path, dtype=str)
+    db = DetallesDB()
+    try:
+        df = enriquecer(df, workers, db=db)
+    finally:
+        db.close()
+    df.to_csv(salida, index=False, encoding="utf-8")
+    print(f"[OK] Guardado CSV -> {salida} (Filas: {len(df)})")
+
+
+def cli(argv=None):
+    """Punto de entrada de línea de comandos (también como console script)."""
+    parser = argparse.ArgumentParser(description="Enriquece los avisos con datos de su página de detalle")
+    parser.add_argument("--csv", default=CSV_OUTPUT)
+    parser.add_argument("--salida", default=CSV_DETALLE)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args(argv)
+    main(args.csv, args.salida, args.workers)
+
+
+if __name__ == "__main__":
+    cli()
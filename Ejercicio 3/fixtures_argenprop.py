@@ -0,0 +1,170 @@
+# Generador de páginas HTML de prueba con el markup de los listados de Argenprop
+# Arma páginas de listado (tarjetas + paginación) a partir de un CSV generado por
+# scraping.py, para probar la extracción y medir el scraper sin salir a internet.
+#
+# Uso:
+#   python fixtures_argenprop.py                       # usa terrenos_posadas.csv
+#   python fixtures_argenprop.py --repetir 50 --salida fixtures
+
+import argparse
+import csv
+import html
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+CSV_DEFAULT = os.path.join(script_dir, "terrenos_posadas.csv")
+PATH_LISTADO = "/terrenos/venta/posadas"
+POR_PAGINA = 20
+
+
+def page_path(pagina, path_listado=PATH_LISTADO):
+    """Path de la página N del listado (la 1 no lleva parámetro, como en el sitio)."""
+    return path_listado if pagina == 1 else f"{path_listado}?pagina-{pagina}"
+
+
+def render_card(row):
+    """Renderiza una tarjeta con los mismos selectores que usa el scraper."""
+    e = lambda v: html.escape(v or "", quote=True)
+    moneda = (row.get("moneda") or "").strip()
+    precio = (row.get("precio") or "").strip()
+    if moneda:
+        precio_html = f'<span class="card__currency">{e(moneda)}</span> {e(precio)}'
+    else:
+        precio_html = e(precio)
+    href = urlparse(row.get("detalle_url") or "").path or "#"
+    return f"""
+      <div class="listing__item">
+        <a class="card" href="{e(href)}">
+          <div class="card__photos-box"><img src="/img/{e(href.rsplit('--', 1)[-1])}.jpg" alt=""></div>
+          <div class="card__details-box">
+            <p class="card__price">{precio_html}</p>
+            <p class="card__address" data-card-direccion="{e(row.get('ubicacion'))}">
+              {e(row.get('ubicacion'))}
+            </p>
+            <p class="card__title--primary">{e(row.get('titulo'))}</p>
+          </div>
+        </a>
+      </div>"""
+
+
+def render_pagination(pagina, total_paginas, path_listado=PATH_LISTADO):
+    """Renderiza el paginador (números + 'Siguiente')."""
+    items = []
+    for n in range(1, total_paginas + 1):
+        clase = ' class="pagination__page--current"' if n == pagina else ""
+        items.append(f'<li{clase}><a href="{page_path(n, path_listado)}">{n}</a></li>')
+    if pagina < total_paginas:
+        items.append(
+            f'<li><a href="{page_path(pagina + 1, path_listado)}" rel="next" '
+            f'aria-label="Siguiente">Siguiente</a></li>'
+        )
+    return '<ul class="pagination">' + "".join(items) + "</ul>"
+
+
+def render_listing_page(rows, pagina, total_paginas, path_listado=PATH_LISTADO):
+    """Renderiza una página de listado completa."""
+    cards = "".join(render_card(r) for r in rows)
+    return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="utf-8"><title>Terrenos en venta en Posadas - Página {pagina}</title></head>
+<body>
+  <div id="cookies-banner"><button type="button" onclick="this.parentNode.remove()">Aceptar</button></div>
+  <div class="listing__items">{cards}
+  </div>
+  {render_pagination(pagina, total_paginas, path_listado)}
+</body>
+</html>"""
+
+
+def load_rows(csv_path=CSV_DEFAULT, repetir=1):
+    """
+    Lee el CSV y opcionalmente lo replica 'repetir' veces con ids distintos,
+    para simular listados más grandes.
+    """
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        base = list(csv.DictReader(f))
+    rows = []
+    for i in range(repetir):
+        for row in base:
+            row = dict(row)
+            if i and row.get("detalle_url"):
+                row["detalle_url"] = f"{row['detalle_url']}{i:03d}"
+            rows.append(row)
+    return rows
+
+
+def build_pages(rows, por_pagina=POR_PAGINA, path_listado=PATH_LISTADO):
+    """Devuelve un dict {path: html} con todas las páginas del listado."""
+    total = max(1, -(-len(rows) // por_pagina))
+    return {
+        page_path(n, path_listado): render_listing_page(
+            rows[(n - 1) * por_pagina:n * por_pagina], n, total, path_listado
+        )
+        for n in range(1, total + 1)
+    }
+
+
+def start_fixture_server(pages, latencia_ms=0, imagen_kb=0, host="127.0.0.1", puerto=0):
+    """
+    Sirve las páginas {path: html} en un servidor HTTP local (hilo daemon).
+    Con imagen_kb > 0, las fotos de las tarjetas (/img/...) se responden con un cuerpo
+    de ese tamaño, para medir el ancho de banda del navegador.
+    Devuelve (server, base_url). Los demás paths desconocidos responden 404.
+    """
+    imagen = b"\xff\xd8\xff" + b"\0" * (imagen_kb * 1024)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if latencia_ms:
+                time.sleep(latencia_ms / 1000)
+            if imagen_kb and self.path.startswith("/img/"):
+                self.send_response(200)
+                self.send_header("Content-Type", "image/jpeg")
+                self.send_header("Content-Length", str(len(imagen)))
+                self.end_headers()
+                self.wfile.write(imagen)
+                return
+            body = pages.get(self.path)
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, puerto), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera páginas HTML de prueba tipo Argenprop")
+    parser.add_argument("--csv", default=CSV_DEFAULT)
+    parser.add_argument("--salida", default=os.path.join(script_dir, "fixtures"))
+    parser.add_argument("--repetir", type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.salida, exist_ok=True)
+    pages = build_pages(load_rows(args.csv, args.repetir))
+    for n, contenido in enumerate(pages.values(), start=1):
+        destino = os.path.join(args.salida, f"pagina_{n}.html")
+        with open(destino, "w", encoding="utf-8") as f:
+            f.write(contenido)
+    print(f"[OK] {len(pages)} páginas generadas en {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Índice local de avisos ya vistos (SQLite) para el scraping incremental
+# Guarda por id de aviso el hash de su contenido y cuándo se vio por primera y última vez.
+# scraping.py lo usa para emitir solo avisos nuevos, modificados y dados de baja,
+# y para cortar la paginación cuando encuentra una racha de avisos ya conocidos.
+
+import hashlib
+import os
+import sqlite3
+from datetime import datetime
+
+if __package__:
+    from .parser_tarjetas import listing_id
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from parser_tarjetas import listing_id
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+INDICE_DEFAULT = os.getenv("SCRAPING_INDICE", os.path.join(script_dir, "indice_listados.sqlite"))
+
+CAMPOS_HASH = ("precio", "moneda", "ubicacion", "titulo")
+
+NUEVO = "nuevo"
+MODIFICADO = "modificado"
+SIN_CAMBIOS = "sin_cambios"
+BAJA = "baja"
+
+
+def hash_card(card):
+    """Hash del contenido de una tarjeta (los campos que pueden cambiar en un aviso)."""
+    contenido = "|".join((card.get(c) or "").strip() for c in CAMPOS_HASH)
+    return hashlib.sha1(contenido.encode("utf-8")).hexdigest()
+
+
+class IndiceListados:
+    """Índice persistente listing_id → hash de contenido, primera y última vez visto."""
+
+    def __init__(self, path=INDICE_DEFAULT):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS listados (
+                listing_id   TEXT PRIMARY KEY,
+                hash         TEXT NOT NULL,
+                busqueda     TEXT,
+                detalle_url  TEXT,
+                primera_vez  TEXT NOT NULL,
+                ultima_vez   TEXT NOT NULL,
+                activo       INTEGER NOT NULL DEFAULT 1
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ix_listados_busqueda ON listados (busqueda, activo)")
+        self.conn.commit()
+
+    def hashes(self, ids):
+        """Devuelve {listing_id: hash} de los ids que ya están en el índice (consulta en bloque)."""
+        ids = list(ids)
+        encontrados = {}
+        # SQLite limita la cantidad de parámetros por sentencia
+        for i in range(0, len(ids), 900):
+            lote = ids[i:i + 900]
+            marcas = ",".join("?" * len(lote))
+            cur = self.conn.execute(
+                f"SELECT listing_id, hash FROM listados WHERE listing_id IN ({marcas})", lote
+            )
+            encontrados.update(cur.fetchall())
+        return encontrados
+
+    def clasificar(self, cards):
+        """
+        Clasifica cada tarjeta contra el índice.
+
+        Retorna:
+            list[str]: estado de cada tarjeta (nuevo / modificado / sin_cambios), en el mismo orden.
+        """
+        ids = [listing_id(c.get("detalle_url")) for c in cards]
+        guardados = self.hashes(i for i in ids if i)
+        estados = []
+        for card, lid in zip(cards, ids):
+            if lid is None or lid not in guardados:
+                estados.append(NUEVO)
+            elif guardados[lid] != hash_card(card):
+                estados.append(MODIFICADO)
+            else:
+                estados.append(SIN_CAMBIOS)
+        return estados
+
+    def registrar(self, cards, busqueda, visto_en=None):
+        """Inserta o actualiza las tarjetas vistas (hash y última vez visto)."""
+        visto_en = visto_en or datetime.now().isoformat(timespec="seconds")
+        filas = [
+            (lid, hash_card(c), busqueda, c.get("detalle_url"), visto_en, visto_en)
+            for c in cards
+            for lid in [listing_id(c.get("detalle_url"))]
+            if lid
+        ]
+        self.conn.executemany("""
+            INSERT INTO listados (listing_id, hash, busqueda, detalle_url, primera_vez, ultima_vez, activo)
+            VALUES (?, ?, ?, ?, ?, ?, 1)
+            ON CONFLICT (listing_id) DO UPDATE SET
+                hash = excluded.hash,
+                busqueda = excluded.busqueda,
+                detalle_url = excluded.detalle_url,
+                ultima_vez = excluded.ultima_vez,
+                activo = 1
+        """, filas)
+        self.conn.commit()
+
+    def marcar_bajas(self, busqueda, inicio_corrida):
+        """
+        Marca como inactivos los avisos de la búsqueda que no se vieron en esta corrida.
+        Solo tiene sentido después de recorrer la búsqueda completa.
+
+        Retorna:
+            list[dict]: avisos dados de baja (listing_id, detalle_url, ultima_vez).
+        """
+        cur = self.conn.execute(
+            "SELECT listing_id, detalle_url, ultima_vez FROM listados "
+            "WHERE busqueda = ? AND activo = 1 AND ultima_vez < ?",
+            (busqueda, inicio_corrida)
+        )
+        bajas = [dict(zip(("listing_id", "detalle_url", "ultima_vez"), fila)) for fila in cur.fetchall()]
+        self.conn.executemany(
+            "UPDATE listados SET activo = 0 WHERE listing_id = ?",
+            [(b["listing_id"],) for b in bajas]
+        )
+        self.conn.commit()
+        return bajas
+
+    def close(self):
+        self.conn.close()
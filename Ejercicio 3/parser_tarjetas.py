@@ -0,0 +1,241 @@
+# Extracción de tarjetas de Argenprop a partir del HTML de la página
+# En lugar de consultar cada campo con WebDriver (varias idas y vueltas por tarjeta),
+# se toma el HTML completo una sola vez (driver.page_source o la respuesta HTTP)
+# y se parsean todas las tarjetas en memoria con BeautifulSoup, usando los mismos
+# selectores que scraping.py.
+#
+# También sirve para probar la extracción offline contra HTML guardados:
+#   python parser_tarjetas.py pagina1.html pagina2.html
+
+import json
+import re
+import sys
+import time
+from datetime import date, timedelta
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+# lxml es bastante más rápido; si no está instalado se usa el parser de la stdlib
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+BASE_URL = "https://www.argenprop.com"
+
+# El id del aviso está al final de la URL de detalle: ...-en-posadas--17780048
+LISTING_ID_RE = re.compile(r"--(\d+)(?:[/?#]|$)")
+PAGINA_RE = re.compile(r"pagina-(\d+)")
+SUPERFICIE_RE = re.compile(r"(\d[\d.,]*)\s*m(?:²|2|ts?2?)\b", re.IGNORECASE)
+PUBLICADO_RE = re.compile(r"publicado\s+(hoy|ayer|hace\s+(\d+)\s+(d[ií]as?|semanas?|mes(?:es)?))", re.IGNORECASE)
+
+
+def listing_id(detalle_url):
+    """Devuelve el id del aviso (str) a partir de su URL de detalle, o None."""
+    if not detalle_url:
+        return None
+    m = LISTING_ID_RE.search(detalle_url)
+    return m.group(1) if m else None
+
+
+def _texto(elemento):
+    """Texto visible del elemento con los espacios normalizados (como .text de Selenium)."""
+    if elemento is None:
+        return None
+    return " ".join(elemento.get_text(" ").split())
+
+
+def parse_card(card, base_url=BASE_URL):
+    """
+    Extrae los datos de una tarjeta (div.card__details-box ya parseado).
+
+    Retorna:
+        dict con precio, moneda, ubicacion, titulo y detalle_url.
+    """
+    # --- PRECIO ---
+    price_number = None
+    currency = None
+    p_price = card.select_one("p.card__price")
+    if p_price is not None:
+        full_price = _texto(p_price)
+        currency = _texto(p_price.select_one("span.card__currency"))
+        price_number = full_price.replace(currency, "").strip() if currency else full_price
+
+    # --- UBICACIÓN ---
+    ubicacion = None
+    p_address = card.select_one("p.card__address")
+    if p_address is not None:
+        addr_data = (p_address.get("data-card-direccion") or "").strip()
+        ubicacion = addr_data or _texto(p_address)
+
+    # --- TÍTULO PRINCIPAL ---
+    titulo_primary = _texto(card.select_one("p.card__title--primary"))
+
+    # --- LINK DETALLE ---
+    # El link suele ser el <a> que envuelve la tarjeta; si no, el primero que tenga adentro
+    a = card.find_parent("a", href=True) or card.select_one("a[href]")
+    link = urljoin(base_url, a["href"]) if a is not None else None
+
+    return {
+        "precio": price_number,
+        "moneda": currency,
+        "ubicacion": ubicacion,
+        "titulo": titulo_primary,
+        "detalle_url": link
+    }
+
+
+def parse_cards(html, base_url=BASE_URL):
+    """
+    Extrae todas las tarjetas de propiedades de un HTML de listado.
+
+    Parámetros:
+        html (str): HTML completo de la página.
+        base_url (str): URL de la página, para resolver links relativos.
+
+    Retorna:
+        results (list[dict]): Lista de diccionarios con datos de cada tarjeta.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    cards = soup.select("div.card__details-box") or soup.select("article, div.card")
+
+    results = []
+    for idx, card in enumerate(cards, start=1):
+        try:
+            results.append(parse_card(card, base_url))
+        except Exception as e:
+            print(f"[Advertencia] Error extrayendo tarjeta #{idx}: {e}")
+    return results
+
+
+def find_total_pages(html):
+    """
+    Devuelve la cantidad total de páginas del listado según los links del
+    paginador (?pagina-N). Si no hay paginador, el listado tiene una sola página.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    paginas = [1]
+    for a in soup.select(".pagination a[href], a[rel=next][href]"):
+        m = PAGINA_RE.search(a["href"])
+        if m:
+            paginas.append(int(m.group(1)))
+    return max(paginas)
+
+
+def _numero(texto):
+    """Convierte '1.250,5' / '1250.5' / '600' a float (o None)."""
+    if texto is None:
+        return None
+    t = str(texto).strip()
+    if "," in t:
+        t = t.replace(".", "").replace(",", ".")
+    elif t.count(".") > 1 or re.fullmatch(r"\d{1,3}\.\d{3}", t):
+        t = t.replace(".", "")
+    try:
+        return float(t)
+    except ValueError:
+        return None
+
+
+def _json_ld(soup):
+    """Devuelve los objetos JSON-LD de la página (aplanando listas y @graph)."""
+    objetos = []
+    for script in soup.select('script[type="application/ld+json"]'):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        pila = data if isinstance(data, list) else [data]
+        while pila:
+            obj = pila.pop()
+            if isinstance(obj, dict):
+                objetos.append(obj)
+                pila.extend(obj.get("@graph", []))
+            elif isinstance(obj, list):
+                pila.extend(obj)
+    return objetos
+
+
+def parse_detail(html, hoy=None):
+    """
+    Extrae datos de la página de detalle de un aviso.
+
+    Retorna:
+        dict con superficie_m2, latitud, longitud y fecha_publicacion (ISO),
+        con None en los campos que no se encuentren.
+    """
+    hoy = hoy or date.today()
+    soup = BeautifulSoup(html, HTML_PARSER)
+    datos = {"superficie_m2": None, "latitud": None, "longitud": None, "fecha_publicacion": None}
+
+    # 1. Datos estructurados (JSON-LD), si la página los trae
+    for obj in _json_ld(soup):
+        geo = obj.get("geo") or {}
+        datos["latitud"] = datos["latitud"] or _numero(geo.get("latitude"))
+        datos["longitud"] = datos["longitud"] or _numero(geo.get("longitude"))
+        area = obj.get("floorSize") or obj.get("lotSize") or {}
+        if isinstance(area, dict):
+            datos["superficie_m2"] = datos["superficie_m2"] or _numero(area.get("value"))
+        publicado = obj.get("datePublished")
+        if publicado and not datos["fecha_publicacion"]:
+            datos["fecha_publicacion"] = str(publicado)[:10]
+
+    # 2. Coordenadas en atributos del mapa o meta tags
+    if datos["latitud"] is None:
+        mapa = soup.select_one("[data-latitude][data-longitude], [data-lat][data-lng]")
+        if mapa is not None:
+            datos["latitud"] = _numero(mapa.get("data-latitude") or mapa.get("data-lat"))
+            datos["longitud"] = _numero(mapa.get("data-longitude") or mapa.get("data-lng"))
+    if datos["latitud"] is None:
+        lat = soup.select_one('meta[property="place:location:latitude"]')
+        lng = soup.select_one('meta[property="place:location:longitude"]')
+        if lat is not None and lng is not None:
+            datos["latitud"], datos["longitud"] = _numero(lat.get("content")), _numero(lng.get("content"))
+
+    # 3. Superficie en la lista de características (priorizando "Sup. Total/Terreno")
+    if datos["superficie_m2"] is None:
+        items = [_texto(li) for li in soup.select(".property-main-features li, .property-features li")]
+        items.sort(key=lambda t: "sup" not in t.lower())
+        for texto in items:
+            m = SUPERFICIE_RE.search(texto)
+            if m:
+                datos["superficie_m2"] = _numero(m.group(1))
+                break
+
+    # 4. Fecha de publicación relativa ("Publicado hace 3 días")
+    if datos["fecha_publicacion"] is None:
+        m = PUBLICADO_RE.search(soup.get_text(" "))
+        if m:
+            cuando = m.group(1).lower()
+            if cuando == "hoy":
+                dias = 0
+            elif cuando == "ayer":
+                dias = 1
+            else:
+                unidad = m.group(3).lower()
+                dias = int(m.group(2)) * (30 if unidad.startswith("mes") else 7 if unidad.startswith("semana") else 1)
+            datos["fecha_publicacion"] = (hoy - timedelta(days=dias)).isoformat()
+
+    return datos
+
+
+def main(paths):
+    """Parsea archivos HTML guardados e informa tarjetas extraídas y tiempo por página."""
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        inicio = time.perf_counter()
+        cards = parse_cards(html)
+        ms = (time.perf_counter() - inicio) * 1000
+        print(f"[Info] {path}: {len(cards)} tarjetas en {ms:.1f} ms")
+        for card in cards[:5]:
+            print("   ", card)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python parser_tarjetas.py pagina.html [pagina2.html ...]")
+        sys.exit(1)
+    main(sys.argv[1:])
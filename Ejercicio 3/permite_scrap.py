@@ -1,20 +1,45 @@
 # Comprobar robots.txt y permiso de crawling
+# Usa la misma política que el scraper (politica_crawl.py): mismo user-agent que se
+# envía realmente, y muestra Crawl-delay / Request-rate y la tasa que se va a usar.
+#
+# Uso:
+#   python permite_scrap.py --url "https://www.argenprop.com/terrenos/venta/posadas"
 
-import urllib.robotparser
-from urllib.parse import urljoin
+import argparse
+import sys
 
-base = "https://www.argenprop.com"
-rp = urllib.robotparser.RobotFileParser()
-rp.set_url(urljoin(base, "/robots.txt"))
-rp.read()
+if __package__:
+    from .politica_crawl import PoliticaCrawl, USER_AGENT
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from politica_crawl import PoliticaCrawl, USER_AGENT
 
-user_agent = "mi-scraper/1.0"
-url_a_testear = "https://www.argenprop.com/terrenos/venta/posadas"
+URL_DEFAULT = "https://www.argenprop.com/terrenos/venta/posadas"
 
-# Si el resultado es True, se puede hacer scraping
-print("robots.txt consultado:", rp.url)
-print("Se puede fetchear con este user-agent?", rp.can_fetch(user_agent, url_a_testear))
-if rp.can_fetch(user_agent, url_a_testear):
-    print(f"Se puede hacer scraping de {url_a_testear} con el user-agent '{user_agent}'")
-else:
-    print(f"No se puede hacer scraping de {url_a_testear} con el user-agent '{user_agent}'")
\ No newline at end of file
+
+def main():
+    parser = argparse.ArgumentParser(description="Comprobar robots.txt para la URL a scrapear")
+    parser.add_argument("--url", default=URL_DEFAULT)
+    args = parser.parse_args()
+    url_a_testear = args.url
+
+    politica = PoliticaCrawl()
+    rp = politica.robots.get(url_a_testear)
+    permitido = politica.permitido(url_a_testear)
+
+    # Si el resultado es True, se puede hacer scraping
+    print("robots.txt consultado:", rp.url)
+    print("User-agent:", USER_AGENT)
+    print("Se puede fetchear con este user-agent?", permitido)
+    print("Crawl-delay:", politica.robots.crawl_delay(url_a_testear))
+    print("Request-rate:", politica.robots.request_rate(url_a_testear))
+    if permitido:
+        print(f"Se puede hacer scraping de {url_a_testear} con el user-agent del scraper")
+    else:
+        print(f"No se puede hacer scraping de {url_a_testear} con el user-agent del scraper")
+
+    # Código de salida distinto de cero si no está permitido (útil para encadenar pasos)
+    return 0 if permitido else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+# Política de cortesía compartida por el scraper y el enriquecimiento
+# - Cachea el robots.txt de cada host (con TTL) y responde can_fetch para el
+#   user-agent que realmente se envía.
+# - Arma un token bucket por host a partir de Crawl-delay / Request-rate (o de una
+#   tasa por defecto si robots.txt no los define) del que toman turno todos los workers.
+# Así se crawlea tan rápido como el sitio lo permite, y no más.
+
+import os
+import threading
+import time
+import urllib.robotparser
+from urllib.parse import urlparse
+
+import requests
+
+# User-agent único: el mismo para robots.txt, las requests HTTP y Chrome
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+ROBOTS_TTL = int(os.getenv("SCRAPING_ROBOTS_TTL", "3600"))               # segundos
+TASA_POR_DEFECTO = float(os.getenv("SCRAPING_TASA_POR_DEFECTO", "1.0"))  # requests/seg por host
+RAFAGA = int(os.getenv("SCRAPING_RAFAGA", "2"))                          # requests seguidas permitidas
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe: se reponen 'tasa' tokens por segundo hasta 'capacidad'.
+    acquire() bloquea hasta que haya un token disponible.
+    """
+
+    def __init__(self, tasa, capacidad=1):
+        self.tasa = tasa
+        self.capacidad = max(1, capacidad)
+        self.tokens = float(self.capacidad)
+        self.actualizado = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                ahora = time.monotonic()
+                self.tokens = min(self.capacidad, self.tokens + (ahora - self.actualizado) * self.tasa)
+                self.actualizado = ahora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.tasa
+            time.sleep(espera)
+
+
+class RobotsCache:
+    """robots.txt parseado por host, con vencimiento."""
+
+    def __init__(self, user_agent=USER_AGENT, ttl=ROBOTS_TTL, timeout=10):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.timeout = timeout
+        self.cache = {}
+        self.lock = threading.Lock()
+
+    def _descargar(self, origen):
+        """
+        Descarga y parsea robots.txt: 401/403 prohíbe todo, otro 4xx permite todo
+        (como urllib.robotparser.read()); si no se puede leer (5xx o error de red)
+        se asume que no está permitido, como indica RFC 9309.
+        """
+        rp = urllib.robotparser.RobotFileParser(f"{origen}/robots.txt")
+        try:
+            resp = requests.get(rp.url, headers={"User-Agent": self.user_agent}, timeout=self.timeout)
+        except requests.RequestException as e:
+            print(f"[Advertencia] No se pudo leer {rp.url}: {e}")
+            rp.disallow_all = True
+            return rp
+        if resp.status_code in (401, 403) or resp.status_code >= 500:
+            rp.disallow_all = True
+        elif resp.status_code >= 400:
+            rp.allow_all = True
+        else:
+            rp.parse(resp.text.splitlines())
+        return rp
+
+    def get(self, url):
+        """Devuelve el RobotFileParser del host de la URL (descargándolo si venció)."""
+        partes = urlparse(url)
+        origen = f"{partes.scheme}://{partes.netloc}"
+        with self.lock:
+            rp, vence = self.cache.get(origen, (None, 0))
+            if rp is None or time.monotonic() >= vence:
+                rp = self._descargar(origen)
+                self.cache[origen] = (rp, time.monotonic() + self.ttl)
+            return rp
+
+    def can_fetch(self, url):
+        return self.get(url).can_fetch(self.user_agent, url)
+
+    def crawl_delay(self, url):
+        return self.get(url).crawl_delay(self.user_agent)
+
+    def request_rate(self, url):
+        return self.get(url).request_rate(self.user_agent)
+
+
+class PoliticaCrawl:
+    """
+    Punto único de cortesía: permitido(url) según robots.txt y esperar(url)
+    para tomar turno del token bucket del host.
+    """
+
+    def __init__(self, user_agent=USER_AGENT, tasa_por_defecto=TASA_POR_DEFECTO, rafaga=RAFAGA):
+        self.robots = RobotsCache(user_agent)
+        self.tasa_por_defecto = tasa_por_defecto
+        self.rafaga = rafaga
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+        if bucket is not None:
+            return bucket
+
+        delay = self.robots.crawl_delay(url)
+        rate = self.robots.request_rate(url)
+        if rate is not None and rate.seconds:
+            bucket = TokenBucket(rate.requests / rate.seconds, rate.requests)
+        elif delay:
+            bucket = TokenBucket(1 / float(delay), 1)
+        else:
+            bucket = TokenBucket(self.tasa_por_defecto, self.rafaga)
+        print(f"[Info] {host}: {bucket.tasa:.2f} req/s (ráfaga {bucket.capacidad})")
+        with self.lock:
+            return self.buckets.setdefault(host, bucket)
+
+    def permitido(self, url):
+        return self.robots.can_fetch(url)
+
+    def esperar(self, url):
+        self._bucket(url).acquire()
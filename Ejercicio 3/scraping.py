@@ -1,22 +1,55 @@
-# Ejercicio 3: Scraper de terrenos en Argenprop (2 páginas)
-# Este script raspa terrenos en venta en Posadas desde Argenprop, extrayendo
+# Ejercicio 3: Scraper de terrenos en Argenprop
+# Este script raspa terrenos en venta desde Argenprop (por defecto, Posadas), extrayendo
 # información de las tarjetas de propiedades y guardándola en un CSV.
-# Utiliza Selenium para navegar y extraer datos de la web.
+# Por defecto (modo 'auto') descarga las páginas por HTTP y las parsea directamente;
+# Selenium solo se usa para las páginas que el detector de bloqueos marca.
+# Recorre todas las páginas de cada búsqueda: lee la cantidad de páginas del paginador,
+# arma las URLs (?pagina-N) y las descarga en paralelo con un límite de requests por host.
+#
+# Uso:
+#   python scraping.py                  # auto: HTTP primero, Selenium como fallback
+#   python scraping.py --modo http      # nunca abrir el navegador
+#   python scraping.py --modo selenium  # recorrido con Chrome y el botón 'Siguiente'
+#   python scraping.py --url https://www.argenprop.com/terrenos/venta/obera --workers 4
+#   python scraping.py --incremental    # solo avisos nuevos, modificados y dados de baja
+#   python scraping.py --db             # cargar cada página a la base a medida que se extrae
 
 # Importar librerías necesarias
-import time
-import random
+import argparse
+import json
+import threading
+from datetime import datetime
 import os
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import sys
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from queue import Queue
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+# Selenium, webdriver-manager, pandas y psutil se importan dentro de las funciones que los
+# usan: el modo http (y quien importe este módulo) no paga su tiempo de carga.
+if __package__:
+    from .parser_tarjetas import parse_cards, find_total_pages, listing_id
+    from .bloqueos_tecnicos import detectar_bloqueo
+    from .indice_listados import IndiceListados, NUEVO, SIN_CAMBIOS
+    from .politica_crawl import PoliticaCrawl, USER_AGENT
+else:  # ejecutado como script desde la carpeta del ejercicio
+    from parser_tarjetas import parse_cards, find_total_pages, listing_id
+    from bloqueos_tecnicos import detectar_bloqueo
+    from indice_listados import IndiceListados, NUEVO, SIN_CAMBIOS
+    from politica_crawl import PoliticaCrawl, USER_AGENT
+
+if not __package__:  # ejecutado como script: la raíz del repositorio no está en el path
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun import instrumentacion
 
 # -------------------------------- CONFIG --------------------------------
 URL = "https://www.argenprop.com/terrenos/venta/posadas"
+
+# Búsquedas a recorrer (ciudades / tipos de propiedad), separadas por coma en SCRAPING_URLS
+SEARCH_URLS = [u.strip() for u in os.getenv("SCRAPING_URLS", URL).split(",") if u.strip()]
 HEADLESS = True   # False para ver el navegador
 
 # Ruta absoluta al directorio donde está este script
@@ -24,20 +57,99 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 
 # Nombre del archivo CSV dentro del mismo directorio
 CSV_OUTPUT = os.path.join(script_dir, "terrenos_posadas.csv")
+# En modo incremental, avisos que dejaron de aparecer
+CSV_BAJAS = os.path.join(script_dir, "terrenos_posadas_bajas.csv")
 
 TIMEOUT = 12
+
+# Esperas por condición en el camino Selenium
+SELECTOR_TARJETAS = "div.card__details-box"
+SCROLL_ESPERA = float(os.getenv("SCRAPING_SCROLL_ESPERA", "0.5"))  # seg. sin tarjetas nuevas = fin del scroll
+SCROLL_MAX_INTENTOS = 10
+# Un solo XPath para todas las variantes de botón de cookies (aceptar / consent)
+XPATH_COOKIES = (
+    "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'acept')"
+    " or contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'consent')]"
+)
+
+# Perfil liviano del navegador: sin imágenes, fuentes, media ni analytics
+# (SCRAPING_NAVEGADOR_LIVIANO=0 vuelve al perfil completo)
+NAVEGADOR_LIVIANO = os.getenv("SCRAPING_NAVEGADOR_LIVIANO", "1") == "1"
+URLS_BLOQUEADAS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+    "*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*googlesyndication.com*", "*facebook.net*", "*hotjar.com*", "*clarity.ms*",
+]
+
+# Chromedriver local y fijado a una versión: el arranque no consulta internet.
+# CHROMEDRIVER_PATH tiene prioridad; si no, se usa la ruta resuelta en una corrida anterior.
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+CHROMEDRIVER_VERSION = os.getenv("CHROMEDRIVER_VERSION")  # None = la del Chrome instalado
+CHROMEDRIVER_CACHE = os.path.join(script_dir, ".chromedriver.json")
+
+# Modo de scraping: 'auto' (HTTP + fallback a Selenium), 'http' o 'selenium'
+MODO = os.getenv("SCRAPING_MODO", "auto")
+
+# Concurrencia (la frecuencia de requests por host la define politica_crawl.py)
+WORKERS = int(os.getenv("SCRAPING_WORKERS", "4"))            # descargas HTTP en paralelo
+MAX_DRIVERS = int(os.getenv("SCRAPING_MAX_DRIVERS", "2"))    # navegadores para el fallback
+MAX_PAGINAS = int(os.getenv("SCRAPING_MAX_PAGINAS", "0"))    # 0 = todas las páginas
+
+# Scraping incremental: orden "más nuevos primero" y corte tras N avisos conocidos seguidos
+ORDEN_RECIENTES = os.getenv("SCRAPING_ORDEN_RECIENTES", "orden-masnuevos")  # "" = sin corte anticipado
+CORTE_CONOCIDOS = int(os.getenv("SCRAPING_CORTE_CONOCIDOS", "20"))
+# Motivo que devuelve scrape_page para una URL que robots.txt no permite
+NO_PERMITIDA = "no permitida por robots.txt"
 # ------------------------------------------------------------------------
 
-def init_driver(headless=True):
+def resolver_chromedriver(usar_cache=True):
+    """
+    Devuelve la ruta del chromedriver sin salir a internet si ya se conoce:
+    1. CHROMEDRIVER_PATH, si está definida.
+    2. La ruta guardada en .chromedriver.json (si existe y es de la versión pedida).
+    3. Recién entonces webdriver-manager la resuelve (con red) y se guarda para las próximas corridas.
+    """
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+    if usar_cache:
+        try:
+            with open(CHROMEDRIVER_CACHE, encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") == CHROMEDRIVER_VERSION and os.path.exists(cache["path"]):
+                return cache["path"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    path = ChromeDriverManager(driver_version=CHROMEDRIVER_VERSION).install()
+    with open(CHROMEDRIVER_CACHE, "w", encoding="utf-8") as f:
+        json.dump({
+            "path": path,
+            "version": CHROMEDRIVER_VERSION,
+            "resuelto_en": datetime.now().isoformat(timespec="seconds"),
+        }, f)
+    return path
+
+@instrumentacion.instrumentar("iniciar navegador", "selenium")
+def init_driver(headless=True, liviano=NAVEGADOR_LIVIANO):
     """
     Inicializa y configura el driver de Chrome para Selenium.
     
     Parámetros:
         headless (bool): Si es True, ejecuta Chrome en modo 'sin ventana' (headless).
+        liviano (bool): Si es True, bloquea imágenes, fuentes, media y analytics y
+            no espera a que terminen de cargar los recursos (page load 'eager').
     
     Retorna:
         driver (webdriver.Chrome): Instancia de Chrome lista para navegar.
     """
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
     options = webdriver.ChromeOptions()
     if headless:
         options.add_argument("--headless=new")
@@ -46,10 +158,20 @@ def init_driver(headless=True):
     options.add_argument("--disable-dev-shm-usage")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    options.add_argument(f"user-agent={USER_AGENT}")
+    if liviano:
+        # El DOM alcanza para extraer las tarjetas: no esperar imágenes ni iframes
+        options.page_load_strategy = "eager"
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        options.add_argument("--blink-settings=imagesEnabled=false")
 
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    try:
+        driver = webdriver.Chrome(service=Service(resolver_chromedriver()), options=options)
+    except SessionNotCreatedException:
+        # El driver guardado no coincide con el Chrome instalado (se actualizó): resolver de nuevo
+        if CHROMEDRIVER_PATH:
+            raise
+        driver = webdriver.Chrome(service=Service(resolver_chromedriver(usar_cache=False)), options=options)
 
     # Ocultar propiedad 'navigator.webdriver' para evitar detección de bots
     try:
@@ -60,46 +182,116 @@ def init_driver(headless=True):
     except Exception:
         pass
 
+    # Bloquear en la capa de red lo que no aporta a la extracción
+    if liviano:
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": URLS_BLOQUEADAS})
+        except Exception as e:
+            print(f"[Advertencia] No se pudo activar el bloqueo de recursos: {e}")
+
     return driver
 
+def metricas_pagina(driver):
+    """
+    Métricas de la página actual según la Performance API del navegador, más la
+    memoria del navegador (RSS de chromedriver + Chrome) si psutil está instalado.
+
+    Retorna:
+        dict con dcl_ms, carga_ms (None si no terminó de cargar), kb (transferidos),
+        recursos y rss_mb (None si no está disponible); None si el navegador no las expone.
+    """
+    try:
+        datos = driver.execute_script("""
+            const t = performance.timing;
+            const nav = performance.getEntriesByType('navigation')[0];
+            const recursos = performance.getEntriesByType('resource');
+            let bytes = nav ? nav.transferSize : 0;
+            for (const r of recursos) { bytes += r.transferSize || 0; }
+            return {
+                dcl_ms: t.domContentLoadedEventEnd - t.navigationStart,
+                carga_ms: t.loadEventEnd > 0 ? t.loadEventEnd - t.navigationStart : null,
+                bytes: bytes,
+                recursos: recursos.length
+            };
+        """)
+    except Exception:
+        return None
+    rss_mb = None
+    try:
+        import psutil  # opcional: solo se usa para informar la memoria del navegador
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            proceso = psutil.Process(driver.service.process.pid)
+            procesos = [proceso] + proceso.children(recursive=True)
+            rss_mb = sum(p.memory_info().rss for p in procesos) / 2**20
+        except (psutil.Error, AttributeError):
+            pass
+    return {
+        "dcl_ms": datos["dcl_ms"],
+        "carga_ms": datos["carga_ms"],
+        "kb": datos["bytes"] / 1024,
+        "recursos": datos["recursos"],
+        "rss_mb": rss_mb,
+    }
+
+def formatear_metricas(m):
+    """Resumen de una línea de metricas_pagina()."""
+    if m is None:
+        return "sin métricas"
+    texto = f"DOM listo {m['dcl_ms']} ms · {m['kb']:.0f} KB en {m['recursos']} recursos"
+    if m["rss_mb"] is not None:
+        texto += f" · RSS navegador {m['rss_mb']:.0f} MB"
+    return texto
+
 def close_cookies_if_present(driver):
     """
     Busca y cierra banners o popups de cookies si están presentes.
+    Usa un único selector combinado sin espera: si no hay banner no se pierde tiempo.
     
     Parámetros:
         driver (webdriver.Chrome): Driver de Selenium activo.
     """
-    # XPaths que buscan variaciones de botones de aceptación de cookies
-    xpaths = [
-        "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'acept')]",
-        "//button[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'), 'consent')]",
-        "//button[contains(translate(., 'abcdefghijklmnopqrstuvwxyz','ABCDEFGHIJKLMNOPQRSTUVWXYZ'), 'ACEPTAR')]"
-    ]
-    for xp in xpaths:
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    for btn in driver.find_elements(By.XPATH, XPATH_COOKIES):
         try:
-            btn = WebDriverWait(driver, 2).until(EC.element_to_be_clickable((By.XPATH, xp)))
+            if not (btn.is_displayed() and btn.is_enabled()):
+                continue
             btn.click()
-            time.sleep(0.6)
+            # Esperar a que el banner desaparezca (no un tiempo fijo)
+            WebDriverWait(driver, 2).until(EC.invisibility_of_element(btn))
             break
         except Exception:
             continue
 
 def scroll_page(driver):
     """
-    Realiza un scroll progresivo por la página para asegurar carga de contenido dinámico.
+    Hace scroll hasta el final de la página mientras sigan apareciendo tarjetas
+    nuevas (contenido dinámico). Corta apenas la cantidad de tarjetas deja de crecer.
     
     Parámetros:
         driver (webdriver.Chrome): Driver de Selenium activo.
     """
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
-        driver.execute_script("window.scrollTo(0, 0);")
-        time.sleep(0.5)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.25);")
-        time.sleep(0.8)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight * 0.5);")
-        time.sleep(0.8)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(1.0 + random.random() * 0.6)
+        cantidad = len(driver.find_elements(By.CSS_SELECTOR, SELECTOR_TARJETAS))
+        for _ in range(SCROLL_MAX_INTENTOS):
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            try:
+                WebDriverWait(driver, SCROLL_ESPERA, poll_frequency=0.1).until(
+                    lambda d: len(d.find_elements(By.CSS_SELECTOR, SELECTOR_TARJETAS)) > cantidad
+                )
+            except TimeoutException:
+                break
+            cantidad = len(driver.find_elements(By.CSS_SELECTOR, SELECTOR_TARJETAS))
     except Exception as e:
         print("[warn] scroll_page error:", e)
 
@@ -107,6 +299,8 @@ def scroll_page(driver):
 def extract_cards_on_page(driver):
     """
     Extrae información de todas las tarjetas de propiedades encontradas en la página actual.
+    Toma el HTML una sola vez (driver.page_source) y lo parsea en memoria con
+    parser_tarjetas.parse_cards, en lugar de consultar cada campo por WebDriver.
     
     Datos extraídos:
         - precio_raw: Texto del precio sin símbolo de moneda.
@@ -121,7 +315,9 @@ def extract_cards_on_page(driver):
     Retorna:
         results (list[dict]): Lista de diccionarios con datos de cada tarjeta.
     """
-    results = []
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
 
     # Esperar que el body esté cargado
     try:
@@ -135,98 +331,32 @@ def extract_cards_on_page(driver):
     # Scroll para cargar contenido dinámico
     scroll_page(driver)
 
-    # Intentar encontrar tarjetas por selectores conocidos
-    try:
-        cards = driver.find_elements(By.CSS_SELECTOR, "div.card__details-box")
-    except Exception:
-        cards = []
-
-    if not cards:
-        try:
-            cards = driver.find_elements(By.CSS_SELECTOR, "article, div.card")
-        except Exception:
-            cards = []
-
-    print(f"[Info] Tarjetas encontradas en la página: {len(cards)}")
-
-    # Recorrer cada tarjeta encontrada
-    for idx, card in enumerate(cards, start=1):
-        try:
-            # --- PRECIO ---
-            price_number = None
-            currency = None
-            try:
-                p_price = card.find_element(By.CSS_SELECTOR, "p.card__price")
-                full_price = p_price.text.strip()
-                try:
-                    currency = p_price.find_element(By.CSS_SELECTOR, "span.card__currency").text.strip()
-                    price_number = full_price.replace(currency, "").strip()
-                except Exception:
-                    price_number = full_price
-            except Exception:
-                price_number = None
-                currency = None
-
-            # --- UBICACIÓN ---
-            ubicacion = None
-            try:
-                p_address = card.find_element(By.CSS_SELECTOR, "p.card__address")
-                addr_data = p_address.get_attribute("data-card-direccion")
-                addr_text = p_address.text.strip()
-                ubicacion = addr_data.strip() if addr_data and addr_data.strip() else addr_text
-            except Exception:
-                ubicacion = None
-
-            # --- TÍTULO PRINCIPAL ---
-            titulo_primary = None
-            try:
-                titulo_primary = card.find_element(By.CSS_SELECTOR, "p.card__title--primary").text.strip()
-            except Exception:
-                titulo_primary = None
-
-            # --- LINK DETALLE ---
-            link = None
-            try:
-                a = card.find_element(By.XPATH, ".//ancestor::a[1]")
-                if a:
-                    link = a.get_attribute("href")
-            except Exception:
-                # intentar buscar 'a' dentro del contenedor principal
-                try:
-                    a2 = card.find_element(By.CSS_SELECTOR, "a[href]")
-                    link = a2.get_attribute("href")
-                except Exception:
-                    link = None
-
-            # Guardar datos de la tarjeta
-            results.append({
-                "precio": price_number,
-                "moneda": currency,
-                "ubicacion": ubicacion,
-                "titulo": titulo_primary,
-                "detalle_url": link
-            })
-
-            # Pequeña pausa aleatoria para simular comportamiento humano
-            time.sleep(random.uniform(0.3, 0.6))
-
-        except Exception as e:
-            print(f"[Advertencia] Error extrayendo tarjeta #{idx}: {e}")
-            continue
-
+    # Un solo round trip al navegador: el resto del parseo es local
+    results = parse_cards(driver.page_source, driver.current_url)
+    print(f"[Info] Tarjetas encontradas en la página: {len(results)}")
     return results
 
 
-def click_next_page(driver):
+@instrumentacion.instrumentar("página siguiente", "selenium")
+def click_next_page(driver, politica=None):
     """
     Intenta hacer clic en el botón o enlace 'Siguiente' para pasar a la próxima página.
+    Espera a que la página cambie (cambio de URL o primera tarjeta anterior ya
+    fuera del DOM) en lugar de dormir un tiempo fijo.
     
     Parámetros:
         driver (webdriver.Chrome): Driver de Selenium activo.
+        politica (PoliticaCrawl | None): si se pasa, la página destino debe estar permitida
+            por robots.txt y se toma turno del token bucket antes del clic.
     
     Retorna:
-        bool: True si se hizo clic y la página cambió, False si no se encontró o no se pudo.
+        bool: True si se hizo clic y la página cambió, False si no se encontró, no está
+        permitida o no se pudo.
     """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
         # Primero intentar por aria-label
         next_btn = None
@@ -240,16 +370,31 @@ def click_next_page(driver):
                 next_btn = None
 
         if next_btn:
+            url_anterior = driver.current_url
+            if politica is not None:
+                destino = next_btn.get_attribute("href") or url_anterior
+                if not politica.permitido(destino):
+                    print(f"[Advertencia] {destino}: {NO_PERMITIDA}, no se avanza de página")
+                    return False
+                politica.esperar(destino)
+            tarjetas = driver.find_elements(By.CSS_SELECTOR, SELECTOR_TARJETAS)
+            primera_anterior = tarjetas[0] if tarjetas else None
+
             # Hacer scroll para que el botón sea visible
             driver.execute_script("arguments[0].scrollIntoView({behavior: 'auto', block: 'center'});", next_btn)
-            time.sleep(0.4)
             try:
                 next_btn.click()
             except Exception:
                 # fallback click via JS
                 driver.execute_script("arguments[0].click();", next_btn)
-            # Esperar que cambie la URL o que el body vuelva a cargarse
-            time.sleep(1.0 + random.random()*1.0)
+
+            # Esperar que cambie la URL o que la tarjeta anterior deje de existir
+            def pagina_cambio(d):
+                if d.current_url != url_anterior:
+                    return True
+                return primera_anterior is not None and EC.staleness_of(primera_anterior)(d)
+
+            WebDriverWait(driver, TIMEOUT, poll_frequency=0.1).until(pagina_cambio)
             WebDriverWait(driver, TIMEOUT).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
             print("[Info] Click en 'Siguiente' realizado.")
             return True
@@ -261,46 +406,573 @@ def click_next_page(driver):
         return False
 
 
-def main():
+class DriverPool:
     """
-    Función principal:
-        - Abre la URL inicial.
-        - Extrae tarjetas de la primera y segunda página (máx. 40 registros).
-        - Guarda resultados en un CSV.
+    Pool chico de navegadores para el fallback con Selenium. Los drivers se crean
+    recién cuando se necesitan, hasta 'max_drivers'; cada uno lo usa un worker a la vez.
+    """
+
+    def __init__(self, max_drivers=MAX_DRIVERS, headless=HEADLESS):
+        self.max_drivers = max_drivers
+        self.headless = headless
+        self.libres = Queue()
+        self.creados = []
+        self.cantidad = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def driver(self):
+        with self.lock:
+            crear = self.libres.empty() and self.cantidad < self.max_drivers
+            if crear:
+                self.cantidad += 1
+        if crear:
+            try:
+                driver = init_driver(self.headless)
+            except Exception:
+                with self.lock:
+                    self.cantidad -= 1
+                raise
+            with self.lock:
+                self.creados.append(driver)
+        else:
+            driver = self.libres.get()
+        try:
+            yield driver
+        finally:
+            self.libres.put(driver)
+
+    def quit(self):
+        for driver in self.creados:
+            driver.quit()
+        self.creados = []
+
+
+def init_session(pool_size=4):
+    """
+    Crea una sesión HTTP con pool de conexiones (keep-alive) y reintentos con
+    backoff ante errores transitorios.
+    """
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "Accept": "text/html,application/xhtml+xml",
+        "Accept-Language": "es-AR,es;q=0.9",
+    })
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size,
+        max_retries=Retry(total=2, backoff_factor=1.0, status_forcelist=[500, 502, 504],
+                          allowed_methods=["GET"])
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return instrumentacion.instrumentar_sesion(session)
+
+
+def fetch_page_http(session, url):
+    """
+    Descarga una página por HTTP.
+
+    Retorna:
+        (html, bloqueo, error): bloqueo es el motivo que detectó detectar_bloqueo (solo
+        en ese caso vale la pena pasar a Selenium) y error el de red o HTTP (404, 500...);
+        ambos None si la página es utilizable.
+    """
+    try:
+        resp = session.get(url, timeout=TIMEOUT, allow_redirects=True)
+    except requests.RequestException as e:
+        return None, None, f"error de red: {e}"
+    bloqueo = detectar_bloqueo(resp.status_code, resp.headers, resp.text)
+    if bloqueo is None and resp.status_code >= 400:
+        return resp.text, None, f"HTTP {resp.status_code}"
+    return resp.text, bloqueo, None
+
+
+def scrape_page(url, session, drivers, politica=None):
+    """
+    Extrae las tarjetas de una página de listado: primero por HTTP y, solo si
+    detectar_bloqueo marca la respuesta, con Selenium. Un error HTTP (404, 500...)
+    o de red no abre el navegador, y una página sin tarjetas se toma como vacía.
+    Nunca lanza: un error de red o del navegador se informa en 'error'.
+
+    Parámetros:
+        url (str): URL de la página de listado.
+        session (requests.Session | None): Sesión HTTP (None = solo Selenium).
+        drivers (DriverPool | None): Pool de navegadores para el fallback (None = sin fallback).
+        politica (PoliticaCrawl | None): robots.txt y token bucket por host.
+
+    Retorna:
+        (cards, html, error): tarjetas extraídas, HTML de la página (para la paginación)
+        y None si la página se procesó (aunque no tenga tarjetas), o el motivo por el
+        que no se pudo (NO_PERMITIDA por robots.txt, bloqueo, error de red o del navegador).
     """
-    driver = init_driver(HEADLESS)
-    all_data = []
     try:
-        # Página 1
-        print(f"[Navegando] {URL}")
-        driver.get(URL)
-        data_page1 = extract_cards_on_page(driver)
-        print(f"[Info] Extraídos de página 1: {len(data_page1)}")
-        all_data.extend(data_page1)
-
-        # Intentar click en 'Siguiente' y raspar página 2
-        if click_next_page(driver):
-            # asegurar que cargó
-            time.sleep(1.5)
-            data_page2 = extract_cards_on_page(driver)
-            print(f"[Info] Extraídos de página 2: {len(data_page2)}")
-            all_data.extend(data_page2)
+        return _scrape_page(url, session, drivers, politica)
+    except Exception as e:
+        print(f"[Advertencia] {url}: error al extraer la página: {e}")
+        return [], "", f"error: {e}"
+
+
+def _scrape_page(url, session, drivers, politica):
+    if politica is not None and not politica.permitido(url):
+        print(f"[Advertencia] {url}: {NO_PERMITIDA}, se omite la página")
+        return [], "", NO_PERMITIDA
+
+    if session is not None:
+        if politica:
+            politica.esperar(url)
+        html, bloqueo, error = fetch_page_http(session, url)
+        if error:
+            # El navegador no arregla un 404 ni un error del servidor
+            print(f"[Advertencia] {url}: {error}, se omite la página")
+            return [], html or "", error
+        if bloqueo is None:
+            with instrumentacion.span("parsear tarjetas", "parseo"):
+                cards = parse_cards(html, url)
+            if cards:
+                print(f"[HTTP] {url}: {len(cards)} tarjetas")
+                return cards, html, None
+            # Respuesta normal sin avisos: la página existe pero está vacía
+            print(f"[Advertencia] {url}: no se encontraron tarjetas en el HTML")
+            return [], html, None
+        if drivers is None:
+            print(f"[Advertencia] {url}: {bloqueo} (modo http, se omite la página)")
+            return [], html, bloqueo
+        print(f"[Fallback] {url}: {bloqueo} → Selenium")
+
+    with drivers.driver() as driver:
+        if politica:
+            politica.esperar(url)
+        with instrumentacion.span("driver.get", "selenium", url=url):
+            driver.get(url)
+        with instrumentacion.span("extraer tarjetas", "selenium"):
+            cards = extract_cards_on_page(driver)
+        html = driver.page_source
+        if not cards:
+            # El navegador también puede caer en un challenge / CAPTCHA
+            motivo = detectar_bloqueo(200, {}, html)
+            if motivo:
+                print(f"[Advertencia] {url}: {motivo} (Selenium), se omite la página")
+                return [], html, motivo
+        print(f"[Selenium] {url}: {len(cards)} tarjetas ({formatear_metricas(metricas_pagina(driver))})")
+        return cards, html, None
+
+
+def build_page_url(search_url, pagina):
+    """URL de la página N de una búsqueda (la primera es la URL base)."""
+    if pagina == 1:
+        return search_url
+    separador = "&" if "?" in search_url else "?"
+    return f"{search_url}{separador}pagina-{pagina}"
+
+
+def build_page_url_orden(search_url):
+    """Agrega el orden por más recientes a la URL de búsqueda (si está configurado)."""
+    if not ORDEN_RECIENTES or ORDEN_RECIENTES in search_url:
+        return search_url
+    separador = "&" if "?" in search_url else "?"
+    return f"{search_url}{separador}{ORDEN_RECIENTES}"
+
+
+def clave_aviso(card):
+    """Clave para detectar avisos repetidos: id de aviso o, si no tiene, URL de detalle."""
+    return listing_id(card.get("detalle_url")) or card.get("detalle_url")
+
+
+def dedupe_cards(cards):
+    """Elimina avisos repetidos (por id de aviso o, si no tiene, por URL de detalle)."""
+    vistos = {}
+    for card in cards:
+        vistos.setdefault(clave_aviso(card) or id(card), card)
+    return list(vistos.values())
+
+
+def emitir_unicos(emitir, conteo):
+    """
+    Envuelve 'emitir' para que cada aviso se emita una sola vez en la corrida.
+    En streaming no se guardan las tarjetas: solo el conjunto de claves ya emitidas
+    y los totales en 'conteo' (brutos / unicos).
+    """
+    vistos = set()
+    lock = threading.Lock()
+
+    def _emitir(cards, al_confirmar=None):
+        unicas = []
+        with lock:
+            for card in cards:
+                clave = clave_aviso(card)
+                if clave is not None:
+                    if clave in vistos:
+                        continue
+                    vistos.add(clave)
+                unicas.append(card)
+            conteo["brutos"] += len(cards)
+            conteo["unicos"] += len(unicas)
+        emitir(unicas, al_confirmar)
+
+    return _emitir
+
+
+def guardar_csv(cards, columnas):
+    """Descarta avisos repetidos y guarda las tarjetas en CSV_OUTPUT."""
+    import pandas as pd
+
+    total_bruto = len(cards)
+    cards = dedupe_cards(cards)
+    print(f"[Info] Avisos únicos: {len(cards)} (descartados {total_bruto - len(cards)} repetidos)")
+    df = pd.DataFrame(cards, columns=columnas)
+    df.to_csv(CSV_OUTPUT, index=False, encoding="utf-8")
+    print(f"[OK] Guardado CSV -> {CSV_OUTPUT} (Filas: {len(df)})")
+    print(df.head(10))
+
+
+class Confirmaciones:
+    """
+    Páginas de cambios emitidas cuyo guardado (CSV o carga en la base) todavía no se
+    confirmó. Los avisos nuevos/modificados se registran en el índice recién cuando
+    su página quedó guardada: si la escritura falla o el proceso se corta, en la
+    próxima corrida vuelven a aparecer como nuevos/modificados.
+    """
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.pendientes = 0
+        self.guardadas = []        # (search_url, cards) ya confirmadas, sin registrar
+        self.fallidas = set()      # búsquedas con alguna página que no se pudo guardar
+
+    def nueva(self, search_url, cards):
+        """Callback al_confirmar(ok) para una página emitida (lo llama quien la guarda)."""
+        with self.cond:
+            self.pendientes += 1
+
+        def al_confirmar(ok):
+            with self.cond:
+                self.pendientes -= 1
+                if ok:
+                    self.guardadas.append((search_url, cards))
+                else:
+                    self.fallidas.add(search_url)
+                self.cond.notify_all()
+
+        return al_confirmar
+
+    def registrar(self, indice, esperar=False):
+        """Registra en el índice las páginas ya confirmadas (con esperar, todas las emitidas)."""
+        with self.cond:
+            if esperar:
+                self.cond.wait_for(lambda: self.pendientes == 0)
+            guardadas, self.guardadas = self.guardadas, []
+        for search_url, cards in guardadas:
+            indice.registrar(cards, search_url)
+
+
+def scrape_selenium(driver, url=URL, max_paginas=MAX_PAGINAS, emitir=None, politica=None):
+    """
+    Recorrido con el navegador: abre la URL y avanza con el botón 'Siguiente'.
+    Si se pasa 'emitir', se llama con las tarjetas de cada página apenas se extraen
+    (y no se acumulan: se devuelve una lista vacía).
+    Con 'politica', cada navegación (la inicial y cada 'Siguiente') respeta robots.txt
+    y toma turno del mismo token bucket por host que los workers HTTP.
+    """
+    all_data = []
+    if politica is not None:
+        if not politica.permitido(url):
+            print(f"[Advertencia] {url}: {NO_PERMITIDA}, se omite la búsqueda")
+            return all_data
+        politica.esperar(url)
+    print(f"[Navegando] {url}")
+    with instrumentacion.span("driver.get", "selenium", url=url):
+        driver.get(url)
+    pagina = 1
+    while True:
+        with instrumentacion.span("extraer tarjetas", "selenium"):
+            data_page = extract_cards_on_page(driver)
+        print(f"[Info] Extraídos de página {pagina}: {len(data_page)} ({formatear_metricas(metricas_pagina(driver))})")
+        if emitir:
+            emitir(data_page)
         else:
-            print("[Info] No se pudo avanzar a la segunda página.")
+            all_data.extend(data_page)
+        if max_paginas and pagina >= max_paginas:
+            break
+        if not click_next_page(driver, politica):
+            print("[Info] No hay más páginas.")
+            break
+        pagina += 1
+    return all_data
 
-        # limitar a 40 si quedaron más (por seguridad)
-        if len(all_data) > 40:
-            all_data = all_data[:40]
 
-        # Guardar resultados en CSV
-        df = pd.DataFrame(all_data)
-        df.to_csv(CSV_OUTPUT, index=False, encoding="utf-8")
-        print(f"[OK] Guardado CSV -> {CSV_OUTPUT} (Filas: {len(df)})")
-        print(df.head(10))
+def crawl_search(search_url, executor, session_factory, drivers, politica, max_paginas=MAX_PAGINAS,
+                 emitir=None):
+    """
+    Recorre todas las páginas de una búsqueda: baja la primera, lee del paginador
+    la cantidad total de páginas y descarga el resto en paralelo.
+    Si se pasa 'emitir', se llama con las tarjetas de cada página a medida que terminan
+    (y no se acumulan: se devuelve una lista vacía).
+    """
+    cards, html, _ = scrape_page(search_url, session_factory(), drivers, politica)
+    if emitir:
+        emitir(cards)
+        cards = []
+    total = find_total_pages(html) if html else 1
+    if max_paginas:
+        total = min(total, max_paginas)
+    print(f"[Info] {search_url}: {total} páginas")
+
+    futures = {
+        executor.submit(
+            lambda u: scrape_page(u, session_factory(), drivers, politica)[0],
+            build_page_url(search_url, n)
+        ): n
+        for n in range(2, total + 1)
+    }
+    por_pagina = {1: cards}
+    for future in as_completed(futures):
+        try:
+            page_cards = future.result()
+        except Exception as e:
+            print(f"[Advertencia] Error en una página de {search_url}: {e}")
+            continue
+        if emitir:
+            emitir(page_cards)
+        else:
+            por_pagina[futures[future]] = page_cards
+    # Resultado en el orden de las páginas, aunque hayan terminado en otro orden
+    return [card for n in sorted(por_pagina) for card in por_pagina[n]]
+
+
+def crawl_search_incremental(search_url, executor, session_factory, drivers, politica,
+                             indice, confirmaciones, emitir, workers=WORKERS, max_paginas=MAX_PAGINAS):
+    """
+    Recorre una búsqueda ordenada por más recientes comparando cada aviso contra
+    el índice local. Avanza de a 'workers' páginas en paralelo y corta cuando
+    encuentra CORTE_CONOCIDOS avisos seguidos sin cambios.
+    Los avisos nuevos/modificados de cada página se pasan a emitir(cambios, al_confirmar)
+    y se registran en el índice cuando quien los guarda llama al_confirmar(True); los
+    avisos sin cambios se registran enseguida (no hay nada que guardar).
+
+    Retorna:
+        bool: si se recorrió la búsqueda completa (solo así se pueden calcular bajas).
+    """
+    url_base = build_page_url_orden(search_url)
+    cards, html, error = scrape_page(url_base, session_factory(), drivers, politica)
+    if error:
+        # Sin la primera página no se conoce el paginador ni qué avisos siguen publicados
+        print(f"[Advertencia] {search_url}: falló la primera página ({error}), recorrido parcial")
+        return False
+    total = find_total_pages(html) if html else 1
+    limitado = bool(max_paginas) and total > max_paginas
+    if limitado:
+        total = max_paginas
+
+    fallidas = []
+    conocidos_seguidos = 0
+    pagina = 1
+    pendientes = [(1, cards, None)]
+    while True:
+        for numero, page_cards, error in pendientes:
+            if error:
+                # Una página que no se pudo leer: sus avisos no se vieron, así que
+                # no se calculan bajas y se reinicia la racha de conocidos
+                fallidas.append(numero)
+                conocidos_seguidos = 0
+                continue
+            cambios_pagina, sin_cambios = [], []
+            for card, estado in zip(page_cards, indice.clasificar(page_cards)):
+                if estado == SIN_CAMBIOS:
+                    conocidos_seguidos += 1
+                    sin_cambios.append(card)
+                else:
+                    conocidos_seguidos = 0
+                    cambios_pagina.append({**card, "estado": estado})
+            indice.registrar(sin_cambios, search_url)
+            if cambios_pagina:
+                emitir(cambios_pagina, confirmaciones.nueva(search_url, cambios_pagina))
+            if ORDEN_RECIENTES and CORTE_CONOCIDOS and conocidos_seguidos >= CORTE_CONOCIDOS:
+                print(f"[Info] {search_url}: {conocidos_seguidos} avisos conocidos seguidos en "
+                      f"la página {numero}, se corta la paginación")
+                return False
+        # Lo que ya se guardó mientras tanto
+        confirmaciones.registrar(indice)
+        if pagina >= total:
+            if fallidas:
+                print(f"[Advertencia] {search_url}: fallaron las páginas {fallidas}, recorrido parcial")
+            return not limitado and not fallidas
+        siguientes = range(pagina + 1, min(pagina + workers, total) + 1)
+        pendientes = [
+            (n, page_cards, error)
+            for n, (page_cards, _, error) in zip(siguientes, executor.map(
+                lambda n: scrape_page(build_page_url(url_base, n), session_factory(), drivers, politica),
+                siguientes
+            ))
+        ]
+        pagina = siguientes[-1]
+
+
+def run_incremental(search_urls, executor, session_factory, drivers, politica, workers, max_paginas,
+                    columnas, emitir=None):
+    """
+    Scraping incremental contra el índice local: guarda los avisos nuevos y
+    modificados en CSV_OUTPUT (o los emite, si se pasa 'emitir') y escribe en
+    CSV_BAJAS los que dejaron de aparecer.
+    Los cambios se registran en el índice recién cuando quedaron guardados, y las
+    bajas se calculan después de eso y solo para las búsquedas recorridas completas
+    y sin páginas que no se pudieron guardar.
+
+    Retorna:
+        Counter con la cantidad de avisos por estado (nuevo / modificado).
+    """
+    import pandas as pd
+
+    inicio = datetime.now().isoformat(timespec="seconds")
+    indice = IndiceListados()
+    confirmaciones = Confirmaciones()
+    estados = Counter()
+    streaming = emitir is not None
+    cambios, al_guardar_csv = [], []
+    if streaming:
+        emitir_destino = emitir
+
+        def emitir(cambios_pagina, al_confirmar):
+            estados.update(c["estado"] for c in cambios_pagina)
+            emitir_destino(cambios_pagina, al_confirmar)
+    else:
+        # Sin streaming, las páginas se confirman cuando se guarda el CSV
+        def emitir(cambios_pagina, al_confirmar):
+            estados.update(c["estado"] for c in cambios_pagina)
+            cambios.extend(cambios_pagina)
+            al_guardar_csv.append(al_confirmar)
+
+    bajas = []
+    try:
+        completas = [
+            search_url for search_url in search_urls
+            if crawl_search_incremental(search_url, executor, session_factory, drivers, politica,
+                                        indice, confirmaciones, emitir, workers, max_paginas)
+        ]
+        if not streaming:
+            guardar_csv(cambios, columnas + ["estado"])
+            for al_confirmar in al_guardar_csv:
+                al_confirmar(True)
+        # Espera a que se guarden (o fallen) todas las páginas emitidas antes de calcular bajas
+        confirmaciones.registrar(indice, esperar=True)
+        for search_url in search_urls:
+            if search_url in completas and search_url not in confirmaciones.fallidas:
+                bajas.extend(indice.marcar_bajas(search_url, inicio))
+            elif search_url in confirmaciones.fallidas:
+                print(f"[Info] {search_url}: no se pudieron guardar algunas páginas, no se calculan bajas")
+            else:
+                print(f"[Info] {search_url}: recorrido parcial, no se calculan bajas")
+    finally:
+        indice.close()
+
+    nuevos = estados[NUEVO]
+    print(f"[Info] Incremental: {nuevos} nuevos, {sum(estados.values()) - nuevos} modificados, "
+          f"{len(bajas)} bajas")
+    pd.DataFrame(bajas, columns=["listing_id", "detalle_url", "ultima_vez"]).to_csv(
+        CSV_BAJAS, index=False, encoding="utf-8"
+    )
+    print(f"[OK] Guardado CSV de bajas -> {CSV_BAJAS} (Filas: {len(bajas)})")
+    return estados
+
+
+def main(modo=MODO, search_urls=None, workers=WORKERS, max_paginas=MAX_PAGINAS, incremental=False,
+         db=False, spool=None):
+    """
+    Función principal:
+        - Recorre todas las páginas de cada búsqueda configurada.
+        - Elimina avisos repetidos (por id de aviso).
+        - Guarda resultados en un CSV (o, con db/spool, los emite página por página).
+        - En modo incremental guarda solo avisos nuevos/modificados (columna 'estado').
+
+    Parámetros:
+        modo (str): 'auto' (HTTP con fallback a Selenium), 'http' o 'selenium'.
+        search_urls (list[str]): URLs de búsqueda (por defecto SEARCH_URLS).
+        workers (int): Páginas descargadas en paralelo.
+        max_paginas (int): Límite de páginas por búsqueda (0 = todas).
+        incremental (bool): Comparar contra el índice local de avisos ya vistos.
+        db (bool): Cargar cada página a la base a medida que se extrae (sin CSV intermedio).
+        spool (str | None): Archivo append-only (.csv o directorio .parquet) con las páginas extraídas.
+    """
+    instrumentacion.iniciar("scraping")
+    search_urls = search_urls or SEARCH_URLS
+    columnas = ["precio", "moneda", "ubicacion", "titulo", "detalle_url"]
+    if incremental and modo == "selenium":
+        print("[Advertencia] El modo incremental requiere --modo auto o http; se hace un recorrido completo.")
+        incremental = False
+    drivers = DriverPool() if modo != "http" else None
+    all_data = []
+
+    # Carga en streaming: el loader se importa solo si se usa (SQLAlchemy, psycopg2, .env)
+    carga = None
+    if db or spool:
+        if __package__:
+            from .carga_streaming import CargaStreaming
+        else:  # ejecutado como script desde la carpeta del ejercicio
+            from carga_streaming import CargaStreaming
+        carga = CargaStreaming(cargar_db=db, spool=spool).iniciar()
+    # En streaming las tarjetas no se juntan en memoria: se descartan repetidos por id al emitir
+    conteo = Counter()
+    emitir = emitir_unicos(carga.emitir, conteo) if carga else None
+
+    exito = False
+    try:
+        # Una sola política para todos los caminos (HTTP, fallback y recorrido con el navegador)
+        politica = PoliticaCrawl()
+        if modo == "selenium":
+            with drivers.driver() as driver:
+                for search_url in search_urls:
+                    all_data.extend(scrape_selenium(driver, search_url, max_paginas, emitir, politica))
+        else:
+            # Una sesión por hilo (requests.Session no garantiza ser thread-safe)
+            local = threading.local()
+
+            def session_factory():
+                if not hasattr(local, "session"):
+                    local.session = init_session(workers)
+                return local.session
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                if incremental:
+                    # Guarda su propio CSV de cambios (o los emite) antes de registrar el índice
+                    run_incremental(search_urls, executor, session_factory, drivers,
+                                    politica, workers, max_paginas, columnas, emitir)
+                else:
+                    for search_url in search_urls:
+                        all_data.extend(crawl_search(search_url, executor, session_factory,
+                                                     drivers, politica, max_paginas, emitir))
+
+        if carga is not None:
+            # En streaming ya se guardaron página por página
+            print(f"[Info] Avisos únicos: {conteo['unicos']} "
+                  f"(descartados {conteo['brutos'] - conteo['unicos']} repetidos)")
+        elif not incremental:
+            guardar_csv(all_data, columnas)
+        exito = True
 
     finally:
-        driver.quit()
+        if drivers is not None:
+            drivers.quit()
+        if carga is not None:
+            carga.cerrar(exito)
+
+
+def cli(argv=None):
+    """Punto de entrada de línea de comandos (también como console script)."""
+    parser = argparse.ArgumentParser(description="Scraper de terrenos en Argenprop")
+    parser.add_argument("--modo", choices=["auto", "http", "selenium"], default=MODO)
+    parser.add_argument("--url", action="append", dest="urls",
+                        help="URL de búsqueda (se puede repetir); por defecto SCRAPING_URLS")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--max-paginas", type=int, default=MAX_PAGINAS,
+                        help="Límite de páginas por búsqueda (0 = todas)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Emitir solo avisos nuevos, modificados y dados de baja (índice local)")
+    parser.add_argument("--db", action="store_true",
+                        help="Cargar cada página a Supabase/Postgres a medida que se extrae (sin CSV)")
+    parser.add_argument("--spool", help="Spool append-only de las páginas extraídas (.csv o .parquet)")
+    args = parser.parse_args(argv)
+    main(args.modo, args.urls, args.workers, args.max_paginas, args.incremental, args.db, args.spool)
 
 
 if __name__ == "__main__":
-    main()
+    cli()
@@ -0,0 +1,150 @@
+# Benchmark del tiempo de arranque de cada punto de entrada
+# Importa cada script en un proceso nuevo con `python -X importtime` y reporta cuánto
+# tarda la carga de módulos (y el proceso completo), junto con los imports más pesados.
+# Como importar un módulo ya no ejecuta nada (la lógica está en main()), el número mide
+# exactamente el costo de arranque que paga cada corrida del cron / orquestador.
+#
+# Con --guardar se guarda una línea base en .importtime.json; con --comparar se informa
+# la diferencia contra ella y se sale con código 1 si alguna entrada empeoró más que --umbral.
+#
+# Uso:
+#   python benchmark_importtime.py
+#   python benchmark_importtime.py --repeticiones 5 --guardar
+#   python benchmark_importtime.py --comparar --umbral 20
+#   python benchmark_importtime.py --solo scraping --detalle 10
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+BASE_DEFAULT = os.path.join(script_dir, ".importtime.json")
+
+# (nombre, carpeta, módulo): el módulo se importa desde su carpeta, como al correr el script
+ENTRADAS = [
+    ("create_db", "Ejercicio 1", "create_db"),
+    ("csv_to_DB", "Ejercicio 1", "csv_to_DB"),
+    ("dim_date", "Ejercicio 1", "dim_date"),
+    ("replicate", "Ejercicio 1", "replicate"),
+    ("data_historica", "Ejercicio 2", "data_historica"),
+    ("incremental", "Ejercicio 2", "incremental"),
+    ("permite_scrap", "Ejercicio 3", "permite_scrap"),
+    ("bloqueos_tecnicos", "Ejercicio 3", "bloqueos_tecnicos"),
+    ("scraping", "Ejercicio 3", "scraping"),
+    ("enriquecimiento", "Ejercicio 3", "enriquecimiento"),
+    ("csv_to_db_supabase", "Ejercicio 3", "csv_to_db_supabase"),
+    ("normalizacion_moneda", "Ejercicio 3", "normalizacion_moneda"),
+    ("orquestador", "", "orquestador"),
+]
+
+# "import time:      self [us] |  cumulative | imported package"
+LINEA_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def medir_una(carpeta, modulo):
+    """
+    Importa el módulo en un proceso nuevo.
+
+    Retorna:
+        (imports_ms, proceso_ms, paquetes): tiempo total de imports, tiempo del proceso
+        completo y {paquete raíz: ms propios sumando todos sus submódulos}.
+    """
+    cwd = os.path.join(script_dir, carpeta)
+    inicio = time.perf_counter()
+    res = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=cwd, capture_output=True, text=True,
+    )
+    proceso_ms = (time.perf_counter() - inicio) * 1000
+    if res.returncode != 0:
+        salida = [l for l in res.stderr.splitlines() if l.strip() and not l.startswith("import time:")]
+        raise RuntimeError(salida[-1] if salida else f"código {res.returncode}")
+
+    total_us = 0
+    paquetes = {}
+    for linea in res.stderr.splitlines():
+        m = LINEA_RE.match(linea)
+        if not m:
+            continue
+        propio, acumulado = int(m.group(1)), int(m.group(2))
+        sangria, nombre = len(m.group(3)), m.group(4)
+        # Sangría 1 = import de primer nivel (los anidados tienen 2 espacios más por nivel)
+        if sangria <= 1:
+            total_us += acumulado
+        # El tiempo propio se atribuye al paquete raíz (pandas, numpy, sqlalchemy...)
+        raiz = nombre.split(".")[0]
+        paquetes[raiz] = paquetes.get(raiz, 0) + propio / 1000
+    return total_us / 1000, proceso_ms, paquetes
+
+
+def medir(carpeta, modulo, repeticiones):
+    """Mediana de varias corridas (la primera suele pagar la caché de disco / .pyc)."""
+    corridas = [medir_una(carpeta, modulo) for _ in range(repeticiones)]
+    imports_ms = statistics.median(c[0] for c in corridas)
+    proceso_ms = statistics.median(c[1] for c in corridas)
+    # Paquetes más pesados de la corrida mediana
+    paquetes = sorted(corridas, key=lambda c: c[0])[len(corridas) // 2][2]
+    return {"imports_ms": round(imports_ms, 1), "proceso_ms": round(proceso_ms, 1),
+            "pesados": sorted(paquetes.items(), key=lambda p: p[1], reverse=True)}
+
+
+def cargar_base(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("entradas", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque (imports) de cada punto de entrada")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--solo", action="append", help="Medir solo esta entrada (se puede repetir)")
+    parser.add_argument("--detalle", type=int, default=3, help="Imports más pesados a mostrar por entrada")
+    parser.add_argument("--base", default=BASE_DEFAULT, help="Archivo de línea base")
+    parser.add_argument("--guardar", action="store_true", help="Guardar los resultados como línea base")
+    parser.add_argument("--comparar", action="store_true", help="Comparar contra la línea base")
+    parser.add_argument("--umbral", type=float, default=20.0,
+                        help="Con --comparar, %% de empeoramiento de imports que se considera regresión")
+    args = parser.parse_args()
+
+    entradas = [e for e in ENTRADAS if not args.solo or e[0] in args.solo]
+    base = cargar_base(args.base) if args.comparar else {}
+    resultados = {}
+    regresiones = []
+
+    print(f"{'entrada':<22} {'imports ms':>10} {'proceso ms':>10} {'vs base':>9}  más pesados")
+    for nombre, carpeta, modulo in entradas:
+        try:
+            r = medir(carpeta, modulo, args.repeticiones)
+        except RuntimeError as e:
+            print(f"{nombre:<22} {'error':>10} {'':>10} {'':>9}  {e}")
+            continue
+        resultados[nombre] = r
+
+        delta = ""
+        anterior = base.get(nombre, {}).get("imports_ms")
+        if anterior:
+            cambio = (r["imports_ms"] - anterior) / anterior * 100
+            delta = f"{cambio:+.0f}%"
+            if cambio > args.umbral:
+                regresiones.append(nombre)
+        pesados = ", ".join(f"{p} {ms:.0f}" for p, ms in r["pesados"][:args.detalle])
+        print(f"{nombre:<22} {r['imports_ms']:>10.1f} {r['proceso_ms']:>10.1f} {delta:>9}  {pesados}")
+
+    if args.guardar:
+        with open(args.base, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "entradas": resultados}, f, indent=2)
+        print(f"\n[OK] Línea base guardada en {args.base}")
+    if regresiones:
+        print(f"\n[Advertencia] Regresiones de más de {args.umbral:.0f}%: {', '.join(regresiones)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
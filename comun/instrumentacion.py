@@ -0,0 +1,358 @@
+# Instrumentación opcional: spans, perfil de CPU y de memoria
+# Capa común a los scripts de los tres ejercicios para saber en qué se va el tiempo de
+# una corrida (red, base, pandas o Selenium). Todo se activa por variables de entorno;
+# desactivada, span() devuelve un context manager vacío compartido y instrumentar()
+# devuelve la función original, así que el costo es despreciable.
+#
+# Variables de entorno:
+#   INSTRUMENTACION=1                          spans de HTTP, SQL, Selenium y etapas
+#   INSTRUMENTACION_PERFIL=cprofile,tracemalloc perfil de CPU (.prof) y/o de memoria
+#   INSTRUMENTACION_DIR=trazas                 carpeta de salida (por defecto trazas/ en la raíz)
+#   INSTRUMENTACION_TOP=15                     filas del resumen de spans
+#   INSTRUMENTACION_MAX_EVENTOS=100000         spans en memoria (se descartan los más viejos)
+#
+# Al terminar el proceso se escriben en INSTRUMENTACION_DIR:
+#   <script>_<fecha>.trace.json   formato Chrome trace (chrome://tracing, Perfetto o speedscope)
+#   <script>_<fecha>.prof         con cprofile (python -m pstats, snakeviz)
+# y se imprime una tabla con los spans que más tiempo acumularon. Los procesos que no
+# terminan (incremental.py --daemon) llaman volcar() en cada ciclo: escribe una traza con
+# los spans del ciclo y los libera.
+#
+# Uso:
+#   from comun import instrumentacion
+#   instrumentacion.iniciar("scraping")
+#   with instrumentacion.span("limpiar bloque", "pandas", filas=len(df)):
+#       ...
+#   engine = instrumentacion.instrumentar_engine(create_engine(...))
+#   session = instrumentacion.instrumentar_sesion(requests.Session())
+#
+#   INSTRUMENTACION=1 INSTRUMENTACION_PERFIL=cprofile python scraping.py --modo http
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from datetime import datetime
+from urllib.parse import urlsplit
+
+_PERFILES = {p.strip().lower() for p in os.getenv("INSTRUMENTACION_PERFIL", "").split(",") if p.strip()}
+ACTIVO = os.getenv("INSTRUMENTACION", "0").lower() not in ("", "0", "false", "no") or bool(_PERFILES)
+DIRECTORIO = os.getenv(
+    "INSTRUMENTACION_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "trazas")
+)
+TOP = int(os.getenv("INSTRUMENTACION_TOP", "15"))
+MAX_EVENTOS = int(os.getenv("INSTRUMENTACION_MAX_EVENTOS", "100000"))
+
+# Largo máximo del SQL guardado en cada span
+MAX_SQL = 200
+
+_NULO = nullcontext()
+_T0 = time.perf_counter_ns()
+# Buffer circular: un proceso largo no acumula spans sin límite
+_eventos = deque(maxlen=MAX_EVENTOS)
+_hilos = {}
+_estado = {"nombre": None, "perfil": None}
+
+
+def activo():
+    """True si la instrumentación está habilitada por entorno."""
+    return ACTIVO
+
+
+def registrar(nombre, categoria, inicio_ns, duracion_ns, args=None):
+    """Agrega un span ya medido (tiempos de time.perf_counter_ns)."""
+    hilo = threading.current_thread()
+    _hilos.setdefault(hilo.ident, hilo.name)
+    # deque.append es atómico con el GIL: no hace falta lock entre hilos
+    _eventos.append((nombre, categoria, inicio_ns, duracion_ns, hilo.ident, args))
+
+
+class _Span:
+    __slots__ = ("nombre", "categoria", "args", "inicio")
+
+    def __init__(self, nombre, categoria, args):
+        self.nombre = nombre
+        self.categoria = categoria
+        self.args = args
+
+    def __enter__(self):
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        if tipo is not None:
+            self.args = dict(self.args or {}, error=tipo.__name__)
+        registrar(self.nombre, self.categoria, self.inicio, time.perf_counter_ns() - self.inicio, self.args)
+        return False
+
+
+def span(nombre, categoria="etapa", **args):
+    """
+    Context manager que mide un bloque como un span.
+
+    Parámetros:
+        nombre (str): Nombre del span (se agrupa por nombre en el resumen).
+        categoria (str): 'http', 'sql', 'selenium', 'pandas', 'etapa', ...
+        **args: Datos extra que se guardan en la traza (filas, url, tabla...).
+    """
+    if not ACTIVO:
+        return _NULO
+    return _Span(nombre, categoria, args or None)
+
+
+def instrumentar(nombre=None, categoria="etapa"):
+    """Decorador: mide cada llamada a la función como un span (no-op si está desactivada)."""
+    def decorador(func):
+        if not ACTIVO:
+            return func
+        etiqueta = nombre or func.__name__
+
+        @functools.wraps(func)
+        def envoltura(*a, **kw):
+            with _Span(etiqueta, categoria, None):
+                return func(*a, **kw)
+        return envoltura
+    return decorador
+
+
+def _sql_corto(sentencia):
+    sentencia = " ".join(str(sentencia).split())
+    return sentencia if len(sentencia) <= MAX_SQL else sentencia[:MAX_SQL] + "…"
+
+
+def _nombre_sql(sentencia):
+    """Nombre agrupable de una sentencia: verbo + tabla ('INSERT terrenos_posadas')."""
+    palabras = str(sentencia).split()
+    if not palabras:
+        return "SQL"
+    verbo = palabras[0].upper()
+    claves = {"SELECT": "FROM", "DELETE": "FROM", "INSERT": "INTO", "COPY": None, "UPDATE": None}
+    if verbo in claves:
+        resto = [p.strip('"(;') for p in palabras[1:]]
+        clave = claves[verbo]
+        if clave is None:
+            return f"{verbo} {resto[0]}" if resto else verbo
+        mayus = [p.upper() for p in resto]
+        if clave in mayus and mayus.index(clave) + 1 < len(resto):
+            return f"{verbo} {resto[mayus.index(clave) + 1]}"
+    return verbo
+
+
+def instrumentar_engine(engine):
+    """
+    Registra un span 'sql' por cada sentencia que ejecuta el engine de SQLAlchemy
+    (eventos before/after_cursor_execute). Devuelve el mismo engine.
+    """
+    if not ACTIVO:
+        return engine
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("_instr_inicios", []).append(time.perf_counter_ns())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _despues(conn, cursor, statement, parameters, context, executemany):
+        inicios = conn.info.get("_instr_inicios")
+        if inicios:
+            inicio = inicios.pop()
+            registrar(_nombre_sql(statement), "sql", inicio, time.perf_counter_ns() - inicio,
+                      {"sql": _sql_corto(statement), "filas": cursor.rowcount})
+
+    @event.listens_for(engine, "handle_error")
+    def _error(contexto):
+        inicios = contexto.connection.info.get("_instr_inicios") if contexto.connection is not None else None
+        if inicios:
+            inicios.pop()
+
+    return engine
+
+
+def cursor_psycopg2():
+    """
+    cursor_factory para psycopg2.connect que mide execute, executemany y copy_expert.
+    Devuelve None (cursor por defecto) si la instrumentación está desactivada.
+    """
+    if not ACTIVO:
+        return None
+    from psycopg2.extensions import cursor
+
+    class CursorInstrumentado(cursor):
+        def execute(self, query, vars=None):
+            with _Span(_nombre_sql(query), "sql", {"sql": _sql_corto(query)}) as s:
+                resultado = super().execute(query, vars)
+                s.args["filas"] = self.rowcount
+                return resultado
+
+        def executemany(self, query, vars_list):
+            with _Span(_nombre_sql(query), "sql", {"sql": _sql_corto(query)}) as s:
+                resultado = super().executemany(query, vars_list)
+                s.args["filas"] = self.rowcount
+                return resultado
+
+        def copy_expert(self, sql, file, size=8192):
+            with _Span(_nombre_sql(sql), "sql", {"sql": _sql_corto(sql)}) as s:
+                resultado = super().copy_expert(sql, file, size)
+                s.args["filas"] = self.rowcount
+                return resultado
+
+    return CursorInstrumentado
+
+
+def instrumentar_sesion(session):
+    """
+    Registra un span 'http' por cada respuesta de una requests.Session (hook 'response').
+    La duración es la que informa requests (hasta recibir los encabezados). Devuelve la sesión.
+    """
+    if not ACTIVO:
+        return session
+
+    def _respuesta(resp, *a, **kw):
+        fin = time.perf_counter_ns()
+        duracion = int(resp.elapsed.total_seconds() * 1e9)
+        partes = urlsplit(resp.url)
+        registrar(f"{resp.request.method} {partes.netloc}", "http", fin - duracion, duracion,
+                  {"url": resp.url, "status": resp.status_code, "bytes": len(resp.content)})
+        return resp
+
+    session.hooks["response"].append(_respuesta)
+    return session
+
+
+def iniciar(nombre):
+    """
+    Prepara la captura para el script 'nombre' (cprofile / tracemalloc según el entorno)
+    y registra finalizar() al salir del proceso. No hace nada si está desactivada.
+    """
+    if not ACTIVO or _estado["nombre"] is not None:
+        return
+    _estado["nombre"] = nombre
+    if "tracemalloc" in _PERFILES:
+        import tracemalloc
+        tracemalloc.start(10)
+    if "cprofile" in _PERFILES:
+        import cProfile
+        # cProfile mide solo el hilo que lo habilita (el principal)
+        _estado["perfil"] = cProfile.Profile()
+        _estado["perfil"].enable()
+    atexit.register(finalizar)
+
+
+def resumen(eventos=None, top=TOP):
+    """Agrupa los spans por (categoría, nombre): cantidad, total, promedio y máximo en ms."""
+    grupos = {}
+    for nombre, categoria, _, duracion, _, _ in (_eventos if eventos is None else eventos):
+        g = grupos.setdefault((categoria, nombre), [0, 0, 0])
+        g[0] += 1
+        g[1] += duracion
+        g[2] = max(g[2], duracion)
+    filas = [
+        {"categoria": c, "nombre": n, "cantidad": k, "total_ms": t / 1e6, "promedio_ms": t / k / 1e6, "max_ms": m / 1e6}
+        for (c, n), (k, t, m) in grupos.items()
+    ]
+    filas.sort(key=lambda f: f["total_ms"], reverse=True)
+    return filas[:top]
+
+
+def imprimir_resumen(filas):
+    if not filas:
+        print("[Instrumentación] Sin spans registrados.")
+        return
+    ancho = min(60, max(len(f["nombre"]) for f in filas))
+    print(f"\n[Instrumentación] Spans con más tiempo acumulado")
+    print(f"  {'categoría':<9} {'span':<{ancho}} {'n':>7} {'total ms':>11} {'prom ms':>9} {'máx ms':>9}")
+    for f in filas:
+        print(f"  {f['categoria']:<9} {f['nombre'][:ancho]:<{ancho}} {f['cantidad']:>7} "
+              f"{f['total_ms']:>11.1f} {f['promedio_ms']:>9.2f} {f['max_ms']:>9.1f}")
+
+
+def traza_chrome(eventos=None):
+    """Eventos en formato Chrome trace ('X' = evento completo, tiempos en microsegundos)."""
+    pid = os.getpid()
+    salida = [{"name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+               "args": {"name": _estado["nombre"] or "python"}}]
+    salida += [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": nombre}}
+               for tid, nombre in list(_hilos.items())]
+    for nombre, categoria, inicio, duracion, tid, args in (_eventos if eventos is None else eventos):
+        evento = {"name": nombre, "cat": categoria, "ph": "X", "pid": pid, "tid": tid,
+                  "ts": (inicio - _T0) / 1000, "dur": duracion / 1000}
+        if args:
+            evento["args"] = args
+        salida.append(evento)
+    return salida
+
+
+def _tomar_eventos():
+    """Saca del buffer los spans registrados hasta ahora (popleft es atómico, como append)."""
+    eventos = []
+    try:
+        while True:
+            eventos.append(_eventos.popleft())
+    except IndexError:
+        return eventos
+
+
+def _base_salida():
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    base = os.path.join(DIRECTORIO, f"{_estado['nombre']}_{datetime.now():%Y%m%d_%H%M%S}")
+    # Dos volcados en el mismo segundo no se pisan
+    n = 1
+    while os.path.exists(f"{base}.trace.json" if n == 1 else f"{base}_{n}.trace.json"):
+        n += 1
+    return base if n == 1 else f"{base}_{n}"
+
+
+def _escribir_traza(base, eventos, otros):
+    filas = resumen(eventos)
+    otros["resumen"] = filas
+    with open(base + ".trace.json", "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": traza_chrome(eventos), "displayTimeUnit": "ms", "otherData": otros}, f)
+    print(f"[Instrumentación] Traza ({len(eventos)} spans) -> {base}.trace.json")
+    imprimir_resumen(filas)
+
+
+def volcar():
+    """
+    Escribe la traza de los spans registrados desde el último volcado y los libera.
+    Para procesos que no terminan (el daemon de incremental.py la llama en cada ciclo).
+    """
+    if _estado["nombre"] is None:
+        return
+    eventos = _tomar_eventos()
+    if eventos:
+        _escribir_traza(_base_salida(), eventos, {})
+
+
+def finalizar():
+    """Escribe la traza y los perfiles, e imprime el resumen. Se llama sola al salir."""
+    if _estado["nombre"] is None:
+        return
+    base = _base_salida()
+    otros = {}
+
+    if _estado["perfil"] is not None:
+        _estado["perfil"].disable()
+        _estado["perfil"].dump_stats(base + ".prof")
+        print(f"[Instrumentación] Perfil de CPU -> {base}.prof")
+
+    if "tracemalloc" in _PERFILES:
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            actual, pico = tracemalloc.get_traced_memory()
+            lineas = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            tracemalloc.stop()
+            otros["memoria"] = {
+                "actual_mb": round(actual / 2**20, 1), "pico_mb": round(pico / 2**20, 1),
+                "top_lineas": [f"{s.traceback[0].filename}:{s.traceback[0].lineno} {s.size / 2**20:.2f} MB"
+                               for s in lineas],
+            }
+            print(f"[Instrumentación] Memoria Python: pico {pico / 2**20:.1f} MB")
+            for linea in otros["memoria"]["top_lineas"][:5]:
+                print(f"    {linea}")
+
+    _escribir_traza(base, _tomar_eventos(), otros)
+    _estado["nombre"] = None
@@ -0,0 +1,338 @@
+# Orquestador local de los tres ejercicios
+# Declara los pasos nocturnos como un grafo de dependencias y ejecuta en paralelo las ramas
+# independientes (p. ej. la replicación del Ejercicio 1, el incremental del BCRA y el
+# scraping corren a la vez; dentro del Ejercicio 3 se respeta
+# permite_scrap → bloqueos_tecnicos → scraping → csv_to_db_supabase).
+#
+# - Cada paso es un script de los ejercicios, ejecutado con el mismo intérprete en su carpeta.
+# - Si un paso declara entradas (archivos) y ni ellas ni el script cambiaron desde su última
+#   ejecución exitosa, se omite. Los pasos sin entradas declaradas (dependen de bases o APIs
+#   externas) se ejecutan siempre.
+# - Los pasos que fallan se reintentan con backoff exponencial; si se agotan los intentos,
+#   los pasos que dependen de él no se ejecutan.
+# - Se registra el tiempo de cada paso y al final se informa el camino crítico: la cadena de
+#   dependencias que determina el tiempo total de la corrida.
+#
+# Uso:
+#   python orquestador.py                      # corre todo el grafo
+#   python orquestador.py --plan               # muestra el grafo por niveles sin ejecutar
+#   python orquestador.py --solo carga_terrenos --forzar
+#   python orquestador.py --workers 2 --reintentos 3
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+ESTADO_DEFAULT = os.path.join(script_dir, ".orquestador_estado.json")
+LOGS_DIR = os.path.join(script_dir, "logs_orquestador")
+
+WORKERS = int(os.getenv("ORQUESTADOR_WORKERS", "4"))
+REINTENTOS = int(os.getenv("ORQUESTADOR_REINTENTOS", "2"))         # reintentos por paso
+BACKOFF_BASE = float(os.getenv("ORQUESTADOR_BACKOFF_BASE", "10"))  # segundos (se duplica en cada reintento)
+
+OK = "ok"
+OMITIDO = "omitido"          # entradas sin cambios
+FALLIDO = "fallido"
+BLOQUEADO = "bloqueado"      # una dependencia falló
+
+
+class Paso:
+    """
+    Un paso del grafo.
+
+    Parámetros:
+        nombre (str): Identificador del paso.
+        carpeta (str): Carpeta del ejercicio (relativa a la raíz del repo).
+        comando (list[str]): Script y argumentos (se ejecuta con sys.executable).
+        depende (list[str]): Pasos que tienen que terminar bien antes.
+        entradas (list[str]): Archivos (relativos a la carpeta) que definen si hay algo nuevo.
+    """
+
+    def __init__(self, nombre, carpeta, comando, depende=(), entradas=()):
+        self.nombre = nombre
+        self.carpeta = os.path.join(script_dir, carpeta)
+        self.comando = list(comando)
+        self.depende = list(depende)
+        self.entradas = list(entradas)
+
+    def huella(self):
+        """
+        Hash del comando, del script y de las entradas declaradas; None si el paso no
+        declara entradas (se ejecuta siempre).
+        """
+        if not self.entradas:
+            return None
+        h = hashlib.sha256(json.dumps(self.comando).encode("utf-8"))
+        for relativo in [self.comando[0]] + self.entradas:
+            path = os.path.join(self.carpeta, relativo)
+            h.update(relativo.encode("utf-8"))
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    for bloque in iter(lambda: f.read(1 << 20), b""):
+                        h.update(bloque)
+            else:
+                h.update(b"<no existe>")
+        return h.hexdigest()
+
+
+# Grafo de la corrida nocturna
+PASOS = [
+    Paso("replicacion", "Ejercicio 1", ["replicate.py"]),
+    Paso("bcra_incremental", "Ejercicio 2", ["incremental.py"]),
+    Paso("permite_scrap", "Ejercicio 3", ["permite_scrap.py"]),
+    Paso("bloqueos_tecnicos", "Ejercicio 3", ["bloqueos_tecnicos.py"], depende=["permite_scrap"]),
+    Paso("scraping", "Ejercicio 3", ["scraping.py"], depende=["bloqueos_tecnicos"]),
+    Paso("carga_terrenos", "Ejercicio 3", ["csv_to_db_supabase.py", "--sin-normalizar"], depende=["scraping"],
+         entradas=["terrenos_posadas.csv"]),
+    # Necesita los avisos cargados y las cotizaciones al día
+    Paso("normalizacion", "Ejercicio 3", ["normalizacion_moneda.py"], depende=["carga_terrenos", "bcra_incremental"]),
+    Paso("enriquecimiento", "Ejercicio 3", ["enriquecimiento.py"], depende=["scraping"],
+         entradas=["terrenos_posadas.csv"]),
+]
+
+
+def validar_grafo(pasos):
+    """Verifica que las dependencias existan y que no haya ciclos."""
+    nombres = {p.nombre: p for p in pasos}
+    for p in pasos:
+        faltantes = [d for d in p.depende if d not in nombres]
+        if faltantes:
+            raise ValueError(f"El paso '{p.nombre}' depende de pasos inexistentes: {faltantes}")
+    niveles(pasos)
+
+
+def niveles(pasos):
+    """Agrupa los pasos por nivel (los de un mismo nivel pueden correr a la vez)."""
+    pendientes = {p.nombre: set(p.depende) for p in pasos}
+    resultado = []
+    hechos = set()
+    while pendientes:
+        listos = sorted(n for n, deps in pendientes.items() if deps <= hechos)
+        if not listos:
+            raise ValueError(f"Ciclo de dependencias entre: {sorted(pendientes)}")
+        resultado.append(listos)
+        hechos.update(listos)
+        for n in listos:
+            del pendientes[n]
+    return resultado
+
+
+def seleccionar(pasos, solo):
+    """Los pasos pedidos más todas sus dependencias (transitivas)."""
+    if not solo:
+        return pasos
+    por_nombre = {p.nombre: p for p in pasos}
+    desconocidos = [n for n in solo if n not in por_nombre]
+    if desconocidos:
+        raise ValueError(f"Pasos desconocidos: {desconocidos}")
+    elegidos, pila = set(), list(solo)
+    while pila:
+        n = pila.pop()
+        if n not in elegidos:
+            elegidos.add(n)
+            pila.extend(por_nombre[n].depende)
+    return [p for p in pasos if p.nombre in elegidos]
+
+
+def cargar_estado(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"huellas": {}}
+
+
+def guardar_estado(path, estado):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(estado, f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def ejecutar_paso(paso, reintentos, backoff_base, inicio_corrida):
+    """
+    Ejecuta el script del paso (con reintentos y backoff) guardando su salida en
+    logs_orquestador/<paso>.log.
+
+    Retorna:
+        dict con estado, intentos, inicio y fin (segundos desde el inicio de la corrida).
+    """
+    os.makedirs(LOGS_DIR, exist_ok=True)
+    log_path = os.path.join(LOGS_DIR, f"{paso.nombre}.log")
+    inicio = time.monotonic() - inicio_corrida
+    intento = 0
+    with open(log_path, "w", encoding="utf-8") as log:
+        while True:
+            intento += 1
+            log.write(f"===== intento {intento} ({datetime.now().isoformat(timespec='seconds')}) =====\n")
+            log.flush()
+            codigo = subprocess.run(
+                [sys.executable] + paso.comando, cwd=paso.carpeta,
+                stdout=log, stderr=subprocess.STDOUT,
+                env={**os.environ, "PYTHONUNBUFFERED": "1", "PYTHONIOENCODING": "utf-8"},
+            ).returncode
+            if codigo == 0 or intento > reintentos:
+                break
+            espera = backoff_base * 2 ** (intento - 1)
+            print(f"[Reintento] {paso.nombre}: salió con código {codigo}, reintento en {espera:.0f} s")
+            log.write(f"----- código {codigo}, reintento en {espera:.0f} s -----\n")
+            log.flush()
+            time.sleep(espera)
+    return {
+        "estado": OK if codigo == 0 else FALLIDO,
+        "codigo": codigo,
+        "intentos": intento,
+        "inicio": inicio,
+        "fin": time.monotonic() - inicio_corrida,
+        "log": log_path,
+    }
+
+
+def camino_critico(pasos, resultados):
+    """
+    Cadena de dependencias con mayor duración acumulada entre los pasos ejecutados:
+    es la que determina el tiempo total de la corrida.
+    """
+    duracion = {n: r["fin"] - r["inicio"] for n, r in resultados.items() if "fin" in r}
+    acumulado, previo = {}, {}
+    for nivel in niveles(pasos):
+        for nombre in nivel:
+            paso = next(p for p in pasos if p.nombre == nombre)
+            mejor = max(paso.depende, key=lambda d: acumulado.get(d, 0), default=None)
+            acumulado[nombre] = acumulado.get(mejor, 0) + duracion.get(nombre, 0)
+            previo[nombre] = mejor
+    if not acumulado:
+        return [], 0
+    actual = max(acumulado, key=acumulado.get)
+    total = acumulado[actual]
+    cadena = []
+    while actual is not None:
+        cadena.append(actual)
+        actual = previo[actual]
+    return cadena[::-1], total
+
+
+def imprimir_resumen(pasos, resultados, total):
+    print("\n📊 Resumen de la corrida")
+    print(f"{'paso':<20}{'estado':<11}{'intentos':>9}{'inicio':>9}{'duración':>10}")
+    for p in pasos:
+        r = resultados[p.nombre]
+        if "fin" in r:
+            print(f"{p.nombre:<20}{r['estado']:<11}{r['intentos']:>9}{r['inicio']:>8.1f}s"
+                  f"{r['fin'] - r['inicio']:>9.1f}s")
+        else:
+            print(f"{p.nombre:<20}{r['estado']:<11}{'-':>9}{'-':>9}{'-':>10}")
+    suma = sum(r["fin"] - r["inicio"] for r in resultados.values() if "fin" in r)
+    cadena, critico = camino_critico(pasos, resultados)
+    print(f"\n⏱️  Tiempo total: {total:.1f} s (suma de pasos: {suma:.1f} s)")
+    if cadena:
+        print(f"   Camino crítico ({critico:.1f} s): {' → '.join(cadena)}")
+
+
+def run(pasos, workers=WORKERS, reintentos=REINTENTOS, backoff_base=BACKOFF_BASE,
+        forzar=False, estado_path=ESTADO_DEFAULT):
+    """
+    Ejecuta el grafo: lanza cada paso apenas terminan bien sus dependencias, hasta
+    'workers' pasos a la vez.
+
+    Retorna:
+        dict {paso: resultado}.
+    """
+    validar_grafo(pasos)
+    estado = cargar_estado(estado_path)
+    pendientes = {p.nombre: p for p in pasos}
+    resultados = {}
+    en_curso = {}
+    inicio_corrida = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        while pendientes or en_curso:
+            # Lanzar (u omitir / bloquear) todo lo que ya tiene sus dependencias resueltas
+            avanzo = True
+            while avanzo:
+                avanzo = False
+                for nombre, paso in list(pendientes.items()):
+                    estados_deps = [resultados.get(d, {}).get("estado") for d in paso.depende]
+                    if any(e in (FALLIDO, BLOQUEADO) for e in estados_deps):
+                        resultados[nombre] = {"estado": BLOQUEADO}
+                        print(f"[Bloqueado] {nombre}: falló una dependencia")
+                    elif all(e in (OK, OMITIDO) for e in estados_deps):
+                        huella = paso.huella()
+                        if not forzar and huella is not None and estado["huellas"].get(nombre) == huella:
+                            ahora = time.monotonic() - inicio_corrida
+                            resultados[nombre] = {"estado": OMITIDO, "intentos": 0, "inicio": ahora, "fin": ahora}
+                            print(f"[Omitido] {nombre}: entradas sin cambios")
+                        else:
+                            print(f"[Inicio] {nombre}")
+                            en_curso[executor.submit(ejecutar_paso, paso, reintentos, backoff_base,
+                                                     inicio_corrida)] = (paso, huella)
+                    else:
+                        continue
+                    del pendientes[nombre]
+                    avanzo = True
+
+            if not en_curso:
+                break
+            hechos, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+            for future in hechos:
+                paso, huella = en_curso.pop(future)
+                resultado = future.result()
+                resultados[paso.nombre] = resultado
+                duracion = resultado["fin"] - resultado["inicio"]
+                if resultado["estado"] == OK:
+                    print(f"[OK] {paso.nombre} en {duracion:.1f} s")
+                    if huella is not None:
+                        # La huella se toma antes de ejecutar: si el paso cambia sus propias
+                        # entradas, en la próxima corrida vuelve a ejecutarse
+                        estado["huellas"][paso.nombre] = huella
+                else:
+                    print(f"[Error] {paso.nombre}: código {resultado['codigo']} tras {resultado['intentos']} "
+                          f"intentos (ver {resultado['log']})")
+
+    total = time.monotonic() - inicio_corrida
+    estado["ultima_corrida"] = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "total_seg": round(total, 2),
+        "pasos": resultados,
+    }
+    guardar_estado(estado_path, estado)
+    imprimir_resumen(pasos, resultados, total)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Orquestador de los pipelines de los ejercicios")
+    parser.add_argument("--solo", action="append", help="Ejecutar solo este paso y sus dependencias (repetible)")
+    parser.add_argument("--forzar", action="store_true", help="Ejecutar aunque las entradas no hayan cambiado")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--reintentos", type=int, default=REINTENTOS)
+    parser.add_argument("--backoff", type=float, default=BACKOFF_BASE, help="Espera base entre reintentos (seg.)")
+    parser.add_argument("--estado", default=ESTADO_DEFAULT, help="Archivo de estado (huellas y última corrida)")
+    parser.add_argument("--plan", action="store_true", help="Mostrar el grafo por niveles y salir")
+    args = parser.parse_args()
+
+    pasos = seleccionar(PASOS, args.solo)
+    if args.plan:
+        validar_grafo(pasos)
+        por_nombre = {p.nombre: p for p in pasos}
+        for i, nivel in enumerate(niveles(pasos), start=1):
+            print(f"Nivel {i}:")
+            for nombre in nivel:
+                p = por_nombre[nombre]
+                deps = f" (después de {', '.join(p.depende)})" if p.depende else ""
+                print(f"   {nombre}: {os.path.basename(p.carpeta)}/{' '.join(p.comando)}{deps}")
+        return 0
+
+    resultados = run(pasos, args.workers, args.reintentos, args.backoff, args.forzar, args.estado)
+    return 1 if any(r["estado"] in (FALLIDO, BLOQUEADO) for r in resultados.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
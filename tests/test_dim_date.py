@@ -0,0 +1,43 @@
+# Generación de la dimensión calendario (dim_date.generar_dim_date): numeración y días ISO
+
+import calendar
+from datetime import date
+
+import dim_date
+
+
+def test_date_id_de_la_numeracion_original():
+    assert dim_date.id_de_fecha("2019-03-09") == 1
+    assert dim_date.id_de_fecha(date(2020, 2, 21)) == 350
+    assert dim_date.fecha_de_id(0) == date(2019, 3, 8)
+    assert dim_date.id_de_fecha(dim_date.fecha_de_id(-400)) == -400
+
+
+def test_dias_de_la_semana_iso():
+    filas = dim_date.generar_dim_date(-800, 2000)
+
+    fechas = [date.fromisoformat(f) for f in filas["date"]]
+    assert fechas[0] == dim_date.fecha_de_id(-800)
+    # Lunes = 1 ... domingo = 7, con los nombres en inglés como en el CSV original
+    assert filas["week_day"].tolist() == [f.isoweekday() for f in fechas]
+    assert filas["week_day_name"].tolist() == [calendar.day_name[f.weekday()] for f in fechas]
+    # 2019-03-09 (id 1) es sábado: el DimDate.csv original lo tenía como domingo
+    primero = filas.loc[filas["date_id"] == 1].iloc[0]
+    assert (primero["week_day"], primero["week_day_name"]) == (6, "Saturday")
+
+
+def test_columnas_de_calendario():
+    filas = dim_date.generar_dim_date(1, 400).set_index("date_id")
+
+    assert list(filas.reset_index().columns) == dim_date.COLUMNAS
+    fila = filas.loc[dim_date.id_de_fecha("2019-11-30")]
+    assert (fila["year"], fila["quarter"], fila["quarter_name"]) == (2019, 4, "Q4")
+    assert (fila["month"], fila["month_name"], fila["day"]) == (11, "November", 30)
+
+
+def test_filas_de_ids_sueltos_iguales_al_rango():
+    rango = dim_date.generar_dim_date(1, 50).set_index("date_id")
+    sueltas = dim_date.generar_filas([40, 3, 17]).set_index("date_id")
+
+    assert sueltas.equals(rango.loc[[40, 3, 17]])
+    assert dim_date.generar_dim_date(5, 4).empty
@@ -0,0 +1,70 @@
+# Paginación y división de rangos de utils.fetch_range contra el mock local de la API del BCRA
+
+from datetime import date
+
+import pytest
+
+import utils
+from mock_bcra_api import MockBCRA, start_server
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """Levanta un MockBCRA con la configuración pedida y apunta utils a él."""
+    servidores = []
+
+    def _api(**kwargs):
+        mock = MockBCRA(**kwargs)
+        server, api_base = start_server(mock)
+        servidores.append(server)
+        monkeypatch.setattr(utils, "API_BASE", api_base)
+        return mock
+
+    monkeypatch.setattr(utils, "SESSION", None)
+    yield _api
+    for server in servidores:
+        server.shutdown()
+
+
+def fechas_servidas(mock, desde, hasta):
+    return [f.isoformat() for f in mock.fechas if desde <= f <= hasta]
+
+
+def test_pagina_hasta_el_count_sin_request_extra(api):
+    mock = api()
+    desde, hasta = date(2020, 1, 1), date(2020, 3, 31)
+    esperadas = fechas_servidas(mock, desde, hasta)
+
+    filas = utils.fetch_range(desde, hasta, limit=10)
+
+    assert sorted(f["fecha"] for f in filas) == esperadas
+    # Una request por página: con el count informado no hace falta una página vacía al final
+    assert mock.stats["requests"] == -(-len(esperadas) // 10)
+
+
+def test_rango_mayor_al_maximo_se_divide(api):
+    mock = api(max_rango_dias=30)
+    desde, hasta = date(2019, 1, 1), date(2019, 12, 31)
+
+    filas = utils.fetch_range(desde, hasta)
+
+    fechas = [f["fecha"] for f in filas]
+    assert sorted(fechas) == fechas_servidas(mock, desde, hasta)
+    assert len(fechas) == len(set(fechas))
+    assert mock.stats["400"] > 0
+
+
+def test_fechas_antes_de_la_serie_son_sin_datos(api, capsys):
+    mock = api(error_400_antes_de_serie=True)
+    desde, hasta = date(1990, 1, 1), date(1992, 3, 31)
+
+    filas = utils.fetch_range(desde, hasta, ventana_minima=7)
+
+    fechas = {f["fecha"] for f in filas}
+    # Solo se puede perder la ventana mínima que arranca antes de la serie
+    assert fechas <= set(fechas_servidas(mock, desde, hasta))
+    assert fechas >= set(fechas_servidas(mock, date(1992, 1, 9), hasta))
+    # La división se corta en ventanas de 7 días: sin bajar a días sueltos, sin reintentos
+    # ni avisos por día (a lo sumo dos requests por ventana mínima)
+    assert mock.stats["requests"] <= 2 * ((hasta - desde).days // 7 + 1)
+    assert "⚠" not in capsys.readouterr().out
@@ -0,0 +1,58 @@
+# Índice local del scraping incremental: clasificación de tarjetas y bajas
+
+import pytest
+
+from indice_listados import MODIFICADO, NUEVO, SIN_CAMBIOS, IndiceListados
+
+BUSQUEDA = "https://www.argenprop.com/terrenos/venta/posadas"
+ANTES = "2024-01-01T00:00:00"
+INICIO = "2024-01-02T00:00:00"
+
+
+def card(n, precio="100.000"):
+    return {"precio": precio, "moneda": "USD", "ubicacion": f"Calle {n}", "titulo": "Terreno",
+            "detalle_url": f"https://www.argenprop.com/terreno-en-venta--{n}"}
+
+
+@pytest.fixture
+def indice(tmp_path):
+    indice = IndiceListados(str(tmp_path / "indice.sqlite"))
+    yield indice
+    indice.close()
+
+
+def test_clasificar(indice):
+    indice.registrar([card(1), card(2)], BUSQUEDA, visto_en=ANTES)
+    sin_id = dict(card(9), detalle_url="https://www.argenprop.com/sin-id")
+
+    estados = indice.clasificar([card(1), card(2, precio="90.000"), card(3), sin_id])
+
+    assert estados == [SIN_CAMBIOS, MODIFICADO, NUEVO, NUEVO]
+
+
+def test_marcar_bajas_solo_los_no_vistos(indice):
+    indice.registrar([card(1), card(2), card(3)], BUSQUEDA, visto_en=ANTES)
+    indice.registrar([card(1), card(3)], BUSQUEDA, visto_en=INICIO)
+
+    bajas = indice.marcar_bajas(BUSQUEDA, INICIO)
+
+    assert [b["listing_id"] for b in bajas] == ["2"]
+    assert bajas[0]["ultima_vez"] == ANTES
+    # Ya quedó inactivo: no se vuelve a informar
+    assert indice.marcar_bajas(BUSQUEDA, INICIO) == []
+
+
+def test_marcar_bajas_por_busqueda(indice):
+    indice.registrar([card(1)], BUSQUEDA, visto_en=ANTES)
+    indice.registrar([card(2)], "otra-busqueda", visto_en=ANTES)
+
+    assert [b["listing_id"] for b in indice.marcar_bajas(BUSQUEDA, INICIO)] == ["1"]
+
+
+def test_reaparecido_vuelve_a_activo(indice):
+    indice.registrar([card(1)], BUSQUEDA, visto_en=ANTES)
+    indice.marcar_bajas(BUSQUEDA, INICIO)
+    indice.registrar([card(1)], BUSQUEDA, visto_en="2024-01-03T00:00:00")
+
+    assert indice.marcar_bajas(BUSQUEDA, "2024-01-03T00:00:00") == []
+    assert indice.marcar_bajas(BUSQUEDA, "2024-01-04T00:00:00")[0]["listing_id"] == "1"
@@ -0,0 +1,47 @@
+# Limpieza de las tarjetas crudas antes de cargarlas (csv_to_db_supabase.limpiar_bloque)
+
+import pandas as pd
+
+from csv_to_db_supabase import COLUMNAS_CSV, leer_bloques, limpiar_bloque, nuevo_reporte
+from fixtures_argenprop import CSV_DEFAULT
+
+
+def bloque(filas):
+    return pd.DataFrame(filas, columns=COLUMNAS_CSV).astype("string")
+
+
+def test_limpiar_bloque_transformaciones():
+    stats = nuevo_reporte()
+    df = limpiar_bloque(bloque([
+        ["140.000", " USD ", "A", "T", "https://www.argenprop.com/terreno--100"],
+        ["Consultar precio", "USD", "B", "T", "https://www.argenprop.com/terreno--101"],
+        ["50.000", None, "C", "T", "https://www.argenprop.com/terreno--102"],
+        ["60.000", "Missing value", "D", "T", "https://www.argenprop.com/terreno--103"],
+        ["70.000", "USD", "E", "T", "https://www.argenprop.com/sin-id"],
+        ["80.000", "USD", "F1", "T", "https://www.argenprop.com/terreno--104"],
+        ["85.000", "USD", "F2", "T", "https://www.argenprop.com/terreno--104"],
+    ]), stats)
+
+    assert df["listing_id"].tolist() == [100, 101, 104]
+    assert df["precio"].tolist()[0] == 140000
+    assert pd.isna(df["precio"].tolist()[1])
+    assert df["moneda"].tolist() == ["USD", "USD", "USD"]
+    # Aviso repetido: queda la última aparición
+    assert df.loc[df["listing_id"] == 104, "ubicacion"].item() == "F2"
+    assert stats["filas_leidas"] == 7
+    assert stats["filas_descartadas"] == 2
+    assert stats["precios_invalidos"] == 1
+    assert stats["sin_listing_id"] == 1
+    assert stats["duplicados"] == 1
+
+
+def test_limpiar_bloque_csv_guardado():
+    stats = nuevo_reporte()
+    limpios = pd.concat([limpiar_bloque(b, stats) for b in leer_bloques(CSV_DEFAULT, chunksize=15)])
+    crudo = pd.read_csv(CSV_DEFAULT, dtype=str)
+
+    assert stats["bloques"] == 3
+    assert stats["filas_leidas"] == len(crudo)
+    assert len(limpios) == crudo["moneda"].notna().sum()
+    assert limpios["listing_id"].notna().all()
+    assert limpios["precio"].dropna().gt(0).all()
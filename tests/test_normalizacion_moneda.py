@@ -0,0 +1,55 @@
+# Join as-of de precios con la cotización del BCRA (normalizacion_moneda), sin base
+
+import numpy as np
+import pandas as pd
+
+from normalizacion_moneda import cotizacion_asof, normalizar
+
+FECHAS_TC = np.array(["2024-01-02", "2024-01-03", "2024-01-05"], dtype="datetime64[D]")
+VALORES_TC = np.array([800.0, 810.0, 820.0])
+
+
+def fechas(*valores):
+    return np.array(valores, dtype="datetime64[D]")
+
+
+def test_ultima_cotizacion_anterior_o_del_mismo_dia():
+    fecha_cot, tipo_cambio = cotizacion_asof(
+        FECHAS_TC, VALORES_TC, fechas("2024-01-02", "2024-01-04", "2024-01-05", "2024-02-01")
+    )
+
+    assert fecha_cot.tolist() == fechas("2024-01-02", "2024-01-03", "2024-01-05", "2024-01-05").tolist()
+    assert tipo_cambio.tolist() == [800.0, 810.0, 820.0, 820.0]
+
+
+def test_sin_cotizacion_anterior_es_nulo():
+    fecha_cot, tipo_cambio = cotizacion_asof(FECHAS_TC, VALORES_TC, fechas("2024-01-01", "2024-01-03"))
+
+    assert np.isnat(fecha_cot[0]) and np.isnan(tipo_cambio[0])
+    assert tipo_cambio[1] == 810.0
+
+
+def test_serie_vacia():
+    fecha_cot, tipo_cambio = cotizacion_asof(fechas(), np.array([]), fechas("2024-01-03", "2024-01-04"))
+
+    assert np.isnat(fecha_cot).all() and np.isnan(tipo_cambio).all()
+
+
+def test_normalizar_por_moneda_y_fecha_local():
+    df = pd.DataFrame({
+        "listing_id": [1, 2, 3, 4],
+        "precio": [1000, 820000, 500, 700],
+        "moneda": ["USD", " $ ", "EUR", "u$s"],
+        # 02:00 UTC del 5 de enero todavía es el 4 en Buenos Aires: usa la del 3
+        "fecha_scrape": ["2024-01-05T12:00:00Z", "2024-01-05T12:00:00Z",
+                         "2024-01-05T12:00:00Z", "2024-01-05T02:00:00Z"],
+    })
+
+    salida = normalizar(df, FECHAS_TC, VALORES_TC)
+
+    assert salida["tipo_cambio"].tolist() == [820.0, 820.0, 820.0, 810.0]
+    assert salida["precio_usd"].tolist()[:2] == [1000.0, 1000.0]
+    assert salida["precio_ars"].tolist()[:2] == [820000.0, 820000.0]
+    # Moneda no reconocida -> NULL
+    assert salida[["precio_usd", "precio_ars"]].iloc[2].isna().all()
+    assert salida["precio_ars"].tolist()[3] == 700 * 810.0
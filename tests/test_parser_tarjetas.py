@@ -0,0 +1,62 @@
+# Extracción de tarjetas y paginación sobre las páginas generadas desde terrenos_posadas.csv
+
+import pytest
+
+from fixtures_argenprop import POR_PAGINA, build_pages, load_rows, page_path, render_listing_page
+from parser_tarjetas import find_total_pages, listing_id, parse_cards
+
+BASE = "https://www.argenprop.com"
+
+
+@pytest.fixture(scope="module")
+def rows():
+    return load_rows()
+
+
+def test_parse_cards_extrae_todos_los_campos(rows):
+    pages = build_pages(rows)
+    cards = parse_cards(pages[page_path(1)], BASE)
+
+    assert len(cards) == POR_PAGINA
+    for card, row in zip(cards, rows):
+        assert card["precio"] == row["precio"]
+        assert (card["moneda"] or "") == row["moneda"]
+        assert card["ubicacion"] == row["ubicacion"]
+        assert card["titulo"] == row["titulo"]
+        assert card["detalle_url"] == row["detalle_url"]
+
+
+def test_parse_cards_recorre_todas_las_paginas(rows):
+    pages = build_pages(rows)
+    cards = [c for html in pages.values() for c in parse_cards(html, BASE)]
+    assert [c["detalle_url"] for c in cards] == [r["detalle_url"] for r in rows]
+
+
+def test_parse_cards_pagina_sin_tarjetas():
+    assert parse_cards("<html><body><p>Sin resultados</p></body></html>", BASE) == []
+
+
+def test_find_total_pages(rows):
+    pages = build_pages(load_rows(repetir=3))
+    assert len(pages) == 6
+    assert find_total_pages(pages[page_path(1)]) == 6
+    assert find_total_pages(pages[page_path(4)]) == 6
+
+
+def test_find_total_pages_sin_paginador(rows):
+    html = render_listing_page(rows[:3], 1, 1)
+    assert find_total_pages(html) == 1
+    assert find_total_pages("<html></html>") == 1
+
+
+@pytest.mark.parametrize("url, esperado", [
+    ("https://www.argenprop.com/terreno-en-venta-en-posadas--17780048", "17780048"),
+    ("https://www.argenprop.com/terreno-en-venta-en-posadas--17780048?foto=2", "17780048"),
+    ("/terreno-en-venta-en-posadas--16049462/", "16049462"),
+    ("https://www.argenprop.com/terrenos/venta/posadas", None),
+    ("https://www.argenprop.com/terreno--123abc", None),
+    ("", None),
+    (None, None),
+])
+def test_listing_id(url, esperado):
+    assert listing_id(url) == esperado
@@ -0,0 +1,76 @@
+# Hash de contenido de las cotizaciones y upsert con auditoría de revisiones (utils.insert_data_to_db).
+# Los tests contra Postgres corren solo con una base local de pruebas (BENCH_DB_*, como
+# benchmark_ingesta.py) y trabajan en un esquema propio que se borra al terminar.
+
+import os
+
+import pytest
+
+import utils
+from benchmark_ingesta import conectar_base_pruebas
+
+
+def test_hash_normaliza_el_valor_a_4_decimales():
+    base = utils.hash_contenido("Dólar", 812.5, "BCRA")
+
+    assert utils.hash_contenido("Dólar", "812.5000", "BCRA") == base
+    assert utils.hash_contenido("Dólar", 812.50004, "BCRA") == base
+    # Redondeo half-up como NUMERIC(10,4)
+    assert utils.hash_contenido("Dólar", 812.50005, "BCRA") == utils.hash_contenido("Dólar", 812.5001, "BCRA")
+    assert utils.hash_contenido("Dólar", 812.5001, "BCRA") != base
+    assert utils.hash_contenido("Dólar", 812.5, "otra fuente") != base
+
+
+def cotizacion(fecha, valor):
+    return {"fecha": fecha, "detalle": [{"tipoCotizacion": valor}]}
+
+
+@pytest.fixture
+def conn():
+    if not os.getenv("BENCH_DB_HOST"):
+        pytest.skip("sin base local de pruebas (BENCH_DB_*)")
+    utils.configurar_entorno()
+    conn = conectar_base_pruebas()
+    esquema = f"prueba_revisiones_{os.getpid()}"
+    with conn.cursor() as cur:
+        cur.execute(f"CREATE SCHEMA {esquema}")
+        cur.execute(f"SET search_path TO {esquema}")
+    utils.create_table(conn)
+    yield conn
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA {esquema} CASCADE")
+    conn.close()
+
+
+def filas(conn, consulta):
+    with conn.cursor() as cur:
+        cur.execute(consulta)
+        return cur.fetchall()
+
+
+def test_upsert_inserta_revisa_y_no_toca_lo_igual(conn):
+    assert utils.insert_data_to_db(conn, [cotizacion("2024-01-02", 800.0), cotizacion("2024-01-03", 810.0)]) == (2, 0)
+    txid_antes = dict(filas(conn, "SELECT fecha::text, txid_cambio FROM cotizaciones"))
+
+    # Re-backfill: una fecha revisada por el BCRA, otra igual y una nueva
+    nuevas, revisadas = utils.insert_data_to_db(conn, [
+        cotizacion("2024-01-02", 805.0), cotizacion("2024-01-03", 810.0), cotizacion("2024-01-04", 820.0),
+    ])
+
+    assert (nuevas, revisadas) == (1, 1)
+    assert [(str(f), float(a), float(n)) for f, a, n in filas(
+        conn, "SELECT fecha, tipo_cambio_anterior, tipo_cambio_nuevo FROM cotizaciones_revisiones"
+    )] == [("2024-01-02", 800.0, 805.0)]
+    txid = dict(filas(conn, "SELECT fecha::text, txid_cambio FROM cotizaciones"))
+    assert txid["2024-01-02"] > txid_antes["2024-01-02"]
+    assert txid["2024-01-03"] == txid_antes["2024-01-03"]
+
+
+def test_hash_de_sql_coincide_con_python(conn):
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO cotizaciones (fecha, moneda, tipo_cambio, fuente) VALUES ('2024-01-02', 'Dólar', 812.5, 'BCRA')")
+    # create_table completa el hash de las filas cargadas antes de que existiera
+    utils.create_table(conn)
+
+    assert filas(conn, "SELECT hash_contenido FROM cotizaciones") == [(utils.hash_contenido("Dólar", 812.5, "BCRA"),)]
+    assert utils.insert_data_to_db(conn, [cotizacion("2024-01-02", 812.5)]) == (0, 0)
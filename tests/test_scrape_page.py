@@ -0,0 +1,60 @@
+# Cuándo scrape_page pasa de HTTP a Selenium: solo ante un bloqueo detectado
+
+import pytest
+
+import scraping
+from fixtures_argenprop import PATH_LISTADO, build_pages, load_rows, page_path, start_fixture_server
+
+CAPTCHA = "<html><head><title>Just a moment...</title></head><body>cf-challenge</body></html>"
+VACIA = "<html><body><div class='listing__items'></div></body></html>"
+
+
+class PoolSinNavegador:
+    """Registra los pedidos de navegador en lugar de abrir uno."""
+
+    def __init__(self):
+        self.pedidos = 0
+
+    def driver(self):
+        self.pedidos += 1
+        raise RuntimeError("sin navegador en los tests")
+
+
+@pytest.fixture
+def servidor():
+    pages = build_pages(load_rows())
+    server, base = start_fixture_server(pages)
+    yield pages, base
+    server.shutdown()
+
+
+def scrape(url):
+    drivers = PoolSinNavegador()
+    cards, _, error = scraping.scrape_page(url, scraping.init_session(1), drivers)
+    return cards, error, drivers.pedidos
+
+
+def test_pagina_normal_no_usa_selenium(servidor):
+    _, base = servidor
+    cards, error, pedidos = scrape(base + PATH_LISTADO)
+    assert len(cards) == 20 and error is None and pedidos == 0
+
+
+def test_404_es_error_sin_selenium(servidor):
+    _, base = servidor
+    cards, error, pedidos = scrape(base + page_path(99))
+    assert cards == [] and error == "HTTP 404" and pedidos == 0
+
+
+def test_pagina_sin_tarjetas_es_vacia_sin_selenium(servidor):
+    pages, base = servidor
+    pages[PATH_LISTADO] = VACIA
+    cards, error, pedidos = scrape(base + PATH_LISTADO)
+    assert cards == [] and error is None and pedidos == 0
+
+
+def test_bloqueo_pasa_a_selenium(servidor):
+    pages, base = servidor
+    pages[PATH_LISTADO] = CAPTCHA
+    cards, error, pedidos = scrape(base + PATH_LISTADO)
+    assert cards == [] and error is not None and pedidos == 1
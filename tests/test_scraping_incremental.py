@@ -0,0 +1,137 @@
+# Recorrido incremental contra el servidor de fixtures: las bajas solo se calculan
+# cuando la búsqueda se recorrió completa y los cambios se guardaron
+
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import indice_listados
+import scraping
+from fixtures_argenprop import PATH_LISTADO, build_pages, load_rows, page_path, start_fixture_server
+from parser_tarjetas import listing_id
+
+CAPTCHA = "<html><head><title>Just a moment...</title></head><body>cf-challenge</body></html>"
+ANTES = "2000-01-01T00:00:00"
+
+
+@pytest.fixture
+def rows():
+    return load_rows(repetir=3)
+
+
+@pytest.fixture
+def servidor(rows):
+    """Páginas servidas desde un dict: cada test puede cambiarlas antes de correr."""
+    pages = build_pages(rows)
+    server, base = start_fixture_server(pages)
+    yield pages, base + PATH_LISTADO
+    server.shutdown()
+
+
+@pytest.fixture
+def entorno(tmp_path, monkeypatch, rows, servidor):
+    """Índice y CSVs temporales, con todos los avisos ya vistos en una corrida anterior."""
+    _, url = servidor
+    path = str(tmp_path / "indice.sqlite")
+    indice = indice_listados.IndiceListados(path)
+    indice.registrar(rows, url, visto_en=ANTES)
+    indice.close()
+    monkeypatch.setattr(scraping, "IndiceListados", functools.partial(indice_listados.IndiceListados, path))
+    monkeypatch.setattr(scraping, "CSV_OUTPUT", str(tmp_path / "cambios.csv"))
+    monkeypatch.setattr(scraping, "CSV_BAJAS", str(tmp_path / "bajas.csv"))
+    monkeypatch.setattr(scraping, "ORDEN_RECIENTES", "")
+    return path
+
+
+COLUMNAS = ["precio", "moneda", "ubicacion", "titulo", "detalle_url"]
+
+
+def correr(url, emitir=None):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        scraping.run_incremental([url], executor, lambda: scraping.init_session(2), None, None, 2, 0,
+                                 COLUMNAS, emitir)
+    return pd.read_csv(scraping.CSV_BAJAS, dtype=str)
+
+
+def estados(path, cards):
+    indice = indice_listados.IndiceListados(path)
+    try:
+        return indice.clasificar(cards)
+    finally:
+        indice.close()
+
+
+def activos(path):
+    indice = indice_listados.IndiceListados(path)
+    try:
+        return indice.conn.execute("SELECT count(*) FROM listados WHERE activo = 1").fetchone()[0]
+    finally:
+        indice.close()
+
+
+def test_recorrido_completo_sin_cambios(entorno, servidor, rows):
+    _, url = servidor
+    assert correr(url).empty
+    assert activos(entorno) == len(rows)
+
+
+def test_avisos_que_desaparecen_son_bajas(entorno, servidor, rows):
+    pages, url = servidor
+    pages.clear()
+    pages.update(build_pages(rows[:-5]))
+
+    bajas = correr(url)
+
+    assert sorted(bajas["detalle_url"]) == sorted(r["detalle_url"] for r in rows[-5:])
+    assert activos(entorno) == len(rows) - 5
+
+
+def test_pagina_bloqueada_no_genera_bajas(entorno, servidor, rows):
+    pages, url = servidor
+    pages[PATH_LISTADO] = CAPTCHA
+
+    assert correr(url).empty
+    assert activos(entorno) == len(rows)
+
+
+def test_pagina_intermedia_caida_no_genera_bajas(entorno, servidor, rows):
+    pages, url = servidor
+    del pages[page_path(2)]
+
+    assert correr(url).empty
+    assert activos(entorno) == len(rows)
+
+
+def test_cambios_se_registran_despues_de_guardar_el_csv(entorno, servidor, rows):
+    pages, url = servidor
+    editado = {**rows[0], "titulo": "Terreno con precio rebajado"}
+    pages.clear()
+    pages.update(build_pages([editado] + rows[1:]))
+
+    correr(url)
+
+    cambios = pd.read_csv(scraping.CSV_OUTPUT, dtype=str)
+    assert [listing_id(u) for u in cambios["detalle_url"]] == [listing_id(editado["detalle_url"])]
+    assert list(cambios["estado"]) == [indice_listados.MODIFICADO]
+    assert estados(entorno, [editado]) == [indice_listados.SIN_CAMBIOS]
+
+
+def test_escritura_fallida_no_registra_ni_genera_bajas(entorno, servidor, rows):
+    pages, url = servidor
+    editado = {**rows[0], "titulo": "Terreno con precio rebajado"}
+    pages.clear()
+    pages.update(build_pages([editado] + rows[1:-5]))
+    emitidas = []
+
+    def emitir_fallido(cards, al_confirmar):
+        # Como el escritor en streaming cuando falla el commit de la página
+        emitidas.extend(cards)
+        al_confirmar(False)
+
+    assert correr(url, emitir_fallido).empty
+    assert [listing_id(c["detalle_url"]) for c in emitidas] == [listing_id(editado["detalle_url"])]
+    # En la próxima corrida el aviso vuelve a salir como modificado
+    assert estados(entorno, [editado]) == [indice_listados.MODIFICADO]
+    assert activos(entorno) == len(rows)
@@ -0,0 +1,54 @@
+# Validación en memoria de la tabla de hechos antes del COPY (csv_to_DB.validar_bloque)
+
+import pandas as pd
+
+from csv_to_DB import validar_bloque
+
+CLAVES = {"date_id": pd.Index([1, 2, 3]), "product_id": pd.Index([10, 20])}
+
+
+def bloque(filas):
+    return pd.DataFrame(filas, columns=["sales_id", "date_id", "product_id", "quantity_sold"])
+
+
+def test_filas_validas_pasan_y_se_recuerdan():
+    ids_vistos = set()
+    validos, cuarentena = validar_bloque(bloque([[1, 1, 10, 5], [2, "3", 20, 1]]), CLAVES, "sales_id", ids_vistos)
+
+    assert validos["sales_id"].tolist() == [1, 2]
+    assert validos["date_id"].tolist() == [1, 3]
+    assert cuarentena.empty
+    assert ids_vistos == {"1", "2"}
+
+
+def test_motivos_de_cuarentena():
+    ids_vistos = {"7"}
+    validos, cuarentena = validar_bloque(bloque([
+        [1, 1, 10, 5],
+        [2, 9, 10, 1],        # fecha inexistente
+        [3, "x", 20, 1],      # fecha no numérica
+        [4, None, 30, 1],     # fecha nula y producto inexistente
+        [7, 1, 10, 1],        # ya cargado en la base
+        [1, 2, 20, 1],        # repetido en el archivo
+    ]), CLAVES, "sales_id", ids_vistos)
+
+    assert validos["sales_id"].tolist() == [1]
+    motivos = dict(zip(cuarentena.index, cuarentena["motivo"]))
+    assert motivos == {
+        1: "date_id inexistente en la dimensión",
+        2: "date_id nulo o no numérico",
+        3: "date_id nulo o no numérico; product_id inexistente en la dimensión",
+        4: "sales_id duplicado (ya cargado)",
+        5: "sales_id duplicado en el archivo",
+    }
+    # Solo las válidas se agregan a las PKs vistas
+    assert ids_vistos == {"7", "1"}
+
+
+def test_duplicado_entre_bloques():
+    ids_vistos = set()
+    validar_bloque(bloque([[1, 1, 10, 5]]), CLAVES, "sales_id", ids_vistos)
+    validos, cuarentena = validar_bloque(bloque([[1, 2, 20, 1]]), CLAVES, "sales_id", ids_vistos)
+
+    assert validos.empty
+    assert cuarentena["motivo"].tolist() == ["sales_id duplicado (ya cargado)"]